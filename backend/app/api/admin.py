@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Query
+from opensearchpy import AsyncOpenSearch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.auth import require_admin_key
+from backend.app.config import settings
+from backend.app.database import async_engine, get_async_db, get_opensearch_client
+from backend.app.services.ctr import run_ctr_maintenance
+from backend.app.services.document_ingest import document_ingest
+from backend.app.services.index_generation import index_generation
+from backend.app.services.search_cache import all_caches, clear_index_caches
+from backend.app.services.warmup import run_warmup
+from backend.app.api.error_handlers import handle_search_errors
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"], dependencies=[Depends(require_admin_key)])
+
+
+@router.post("/warmup")
+@handle_search_errors
+async def warmup(
+    top_n: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    opensearch: AsyncOpenSearch = Depends(get_opensearch_client),
+):
+    return await run_warmup(db, opensearch, async_engine, top_n)
+
+
+@router.get("/caches")
+async def get_cache_stats():
+    return {"caches": [cache.stats() for cache in all_caches()]}
+
+
+@router.post("/ctr/maintenance")
+@handle_search_errors
+async def ctr_maintenance(db: AsyncSession = Depends(get_async_db)):
+    return await run_ctr_maintenance(db)
+
+
+@router.get("/index")
+async def get_index_generation():
+    return {"alias": settings.opensearch_index, "generation": index_generation.get()}
+
+
+@router.post("/index/refresh")
+@handle_search_errors
+async def refresh_index_generation(opensearch: AsyncOpenSearch = Depends(get_opensearch_client)):
+    swapped = await index_generation.refresh(opensearch)
+    if swapped:
+        clear_index_caches()
+    return {"alias": settings.opensearch_index, "generation": index_generation.get(), "swapped": swapped}
+
+
+@router.get("/ingest")
+async def get_ingest_stats():
+    return document_ingest.stats()
@@ -0,0 +1,70 @@
+from collections import Counter
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from backend.app.config import settings
+from backend.app.core.auth import require_ingest_key
+from backend.app.core.documents import prepare_document
+from backend.app.core.exceptions import IngestBackpressureError
+from backend.app.schemas.documents import BulkDocumentIngestRequest, DocumentIngestRequest
+from backend.app.services.document_ingest import document_ingest
+
+router = APIRouter(prefix="/api/v1/documents", tags=["documents"], dependencies=[Depends(require_ingest_key)])
+
+
+def _submit(docs: List[Dict[str, Any]]) -> int:
+    try:
+        return document_ingest.submit(docs)
+    except IngestBackpressureError as e:
+        raise HTTPException(
+            status_code=429,
+            detail={"code": e.code, "message": e.message},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@router.post("", status_code=202)
+async def ingest_document(ingest_request: DocumentIngestRequest):
+    try:
+        doc, validation = prepare_document(ingest_request.document, ingest_request.source, Counter())
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_DOCUMENT", "message": f"{type(e).__name__}: {e}"}
+        )
+    if doc is None:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_DOCUMENT", "message": ", ".join(validation.errors)}
+        )
+    pending = _submit([doc])
+    return {"status": "accepted", "document_id": doc["document_id"], "warnings": validation.warnings,
+            "pending": pending}
+
+
+@router.post("/bulk", status_code=202)
+async def ingest_documents(ingest_request: BulkDocumentIngestRequest):
+    if len(ingest_request.documents) > settings.document_ingest_max_batch:
+        raise HTTPException(
+            status_code=413,
+            detail={"code": "BATCH_TOO_LARGE",
+                    "message": f"At most {settings.document_ingest_max_batch} documents per request"}
+        )
+
+    accepted, errors = [], []
+    dropped = Counter()
+    for index, raw in enumerate(ingest_request.documents):
+        try:
+            doc, validation = prepare_document(raw, ingest_request.source, dropped)
+        except Exception as e:
+            errors.append({"index": index, "errors": [f"{type(e).__name__}: {e}"]})
+            continue
+        if doc is None:
+            errors.append({"index": index, "errors": validation.errors})
+            continue
+        accepted.append(doc)
+
+    pending = _submit(accepted) if accepted else document_ingest.pending()
+    return {"status": "accepted", "accepted": len(accepted), "rejected": len(errors), "errors": errors,
+            "pending": pending}
@@ -9,7 +9,7 @@ from opensearchpy.exceptions import NotFoundError as OpenSearchNotFoundError
 from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
-from backend.app.core.exceptions import UserNotFoundError
+from backend.app.core.exceptions import HalfLifeOverrideError, UserNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +19,8 @@ def handle_search_errors(func: Callable):
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
+        except HTTPException:
+            raise
         except OpenSearchConnectionError:
             raise HTTPException(
                 status_code=503,
@@ -29,6 +31,11 @@ def handle_search_errors(func: Callable):
                 status_code=404,
                 detail={"code": "INDEX_NOT_FOUND", "message": f"Search index not found: {str(e)}"}
             )
+        except HalfLifeOverrideError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={"code": e.code, "message": e.message}
+            )
         except UserNotFoundError as e:
             raise HTTPException(
                 status_code=404,
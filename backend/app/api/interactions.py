@@ -1,6 +1,6 @@
 import logging
 
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
 from opensearchpy import AsyncOpenSearch, OpenSearchException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, Dict, Optional
@@ -9,6 +9,8 @@ from backend.app.database import get_async_db, get_opensearch_client
 from backend.app.services.async_search_engine import AsyncSearchEngine
 from backend.app.services.ctr import get_total_stats
 from backend.app.schemas.search import ClickEvent, ImpressionsEvent, FilterOptionsRequest
+from backend.app.services.event_ingest import parse_events
+from backend.app.core.exceptions import EventBatchTooLargeError, InvalidEventBatchError
 from backend.app.api.error_handlers import handle_search_errors
 
 logger = logging.getLogger(__name__)
@@ -28,15 +30,31 @@ router = APIRouter(prefix="/api/v1/search", tags=["search"])
 @router.post("/click")
 @handle_search_errors
 async def register_click(click: ClickEvent, db: AsyncSession = Depends(get_async_db), opensearch: AsyncOpenSearch = Depends(get_opensearch_client)):
-    await AsyncSearchEngine(db, opensearch).register_click(click.query, click.user_id, click.document_id, click.position, click.session_id, click.dwell_time)
-    return {"status": "ok"}
+    stored = await AsyncSearchEngine(db, opensearch).register_click(click.query, click.user_id, click.document_id, click.position, click.session_id, click.dwell_time)
+    return {"status": "ok", "dropped": stored["dropped"]}
 
 
 @router.post("/impressions")
 @handle_search_errors
 async def register_impressions(event: ImpressionsEvent, db: AsyncSession = Depends(get_async_db), opensearch: AsyncOpenSearch = Depends(get_opensearch_client)):
-    await AsyncSearchEngine(db, opensearch).register_impressions(event.query, event.user_id, event.document_ids, event.session_id)
-    return {"status": "ok", "total_impressions": (await get_total_stats(db))["total_impressions"]}
+    stored = await AsyncSearchEngine(db, opensearch).register_impressions(event.query, event.user_id, event.document_ids, event.session_id)
+    return {"status": "ok", "dropped": stored["dropped"],
+            "total_impressions": (await get_total_stats(db))["total_impressions"]}
+
+
+@router.post("/events")
+@handle_search_errors
+async def register_events(request: Request, db: AsyncSession = Depends(get_async_db), opensearch: AsyncOpenSearch = Depends(get_opensearch_client)):
+    try:
+        batch = parse_events(await request.body(), request.headers.get("content-encoding"))
+    except EventBatchTooLargeError as e:
+        raise HTTPException(status_code=413, detail={"code": e.code, "message": e.message})
+    except InvalidEventBatchError as e:
+        raise HTTPException(status_code=400, detail={"code": e.code, "message": e.message})
+
+    stored = await AsyncSearchEngine(db, opensearch).register_events(batch.clicks, batch.impressions)
+    return {"status": "ok", "accepted": batch.accepted, "rejected": batch.rejected, "dropped": stored["dropped"],
+            "errors": batch.errors}
 
 
 @router.get("/filters")
@@ -1,12 +1,21 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from opensearchpy import AsyncOpenSearch
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.config import settings
+from backend.app.core.auth import require_batch_key
 from backend.app.database import get_async_db, get_opensearch_client
 from backend.app.services.async_search_engine import AsyncSearchEngine
-from backend.app.core.rate_limit import limiter
-from backend.app.schemas.search import SearchRequest
+from backend.app.services.batch_search import BatchSearchEngine
+from backend.app.core.rate_limit import api_key_or_remote_address, limiter
+from backend.app.schemas.search import BatchSearchRequest, BatchSearchSpec, CompareRequest, SearchRequest
+from backend.app.schemas.settings import WeightPreset
+from backend.app.services.settings import settings_service
 from backend.app.api.error_handlers import handle_search_errors
 
 router = APIRouter(prefix="/api/v1/search", tags=["search"])
@@ -33,9 +42,118 @@ async def search_documents(
         user_id=search_request.user_id,
         page=search_request.page,
         per_page=search_request.per_page,
+        candidate_pool=search_request.candidate_pool,
         enable_personalization=search_request.enable_personalization,
         filters=search_request.filters,
         search_field=search_request.search_field,
         sort_by=search_request.sort_by,
+        exact_total=search_request.exact_total,
         weights_override=search_request.weights_override,
     )
+
+
+@router.post("/compare")
+@limiter.limit("30/minute")
+@handle_search_errors
+async def compare_presets(
+    request: Request,
+    compare_request: CompareRequest,
+    db: AsyncSession = Depends(get_async_db),
+    opensearch: AsyncOpenSearch = Depends(get_opensearch_client)
+):
+    if not compare_request.query.strip():
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "EMPTY_QUERY", "message": "Search query cannot be empty"}
+        )
+
+    presets = compare_request.presets
+    if not presets and not compare_request.weight_sets:
+        presets = [p.value for p in WeightPreset]
+
+    weight_sets = {}
+    for name in presets:
+        try:
+            # Presets rank under the global half-life: the decayed counters are stored for that one rate.
+            weight_sets[name] = settings_service.resolve_preset(name).model_dump(exclude={"ctr_half_life_days"})
+        except KeyError:
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "UNKNOWN_PRESET", "message": f"Unknown preset: {name}"}
+            )
+    weight_sets.update(compare_request.weight_sets)
+
+    engine = AsyncSearchEngine(db, opensearch)
+    return await engine.compare(
+        query=compare_request.query,
+        weight_sets=weight_sets,
+        user_id=compare_request.user_id,
+        per_page=compare_request.per_page,
+        candidate_pool=compare_request.candidate_pool,
+        enable_personalization=compare_request.enable_personalization,
+        filters=compare_request.filters,
+        search_field=compare_request.search_field,
+        sort_by=compare_request.sort_by,
+    )
+
+
+async def _stream_batch(engine: BatchSearchEngine, specs: List[BatchSearchSpec], concurrency: int) -> AsyncIterator[str]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    @handle_search_errors
+    async def _search(spec: BatchSearchSpec) -> Dict[str, Any]:
+        if not spec.query.strip():
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "EMPTY_QUERY", "message": "Search query cannot be empty"}
+            )
+        return await engine.search(
+            query=spec.query,
+            user_id=spec.user_id,
+            page=spec.page,
+            per_page=spec.per_page,
+            candidate_pool=spec.candidate_pool,
+            enable_personalization=spec.enable_personalization,
+            filters=spec.filters,
+            search_field=spec.search_field,
+            sort_by=spec.sort_by,
+            exact_total=spec.exact_total,
+            weights_override=spec.weights_override,
+        )
+
+    async def _run(index: int, spec: BatchSearchSpec) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return {"index": index, "id": spec.id, "status": 200, "response": await _search(spec)}
+            except HTTPException as e:
+                return {"index": index, "id": spec.id, "status": e.status_code, "error": e.detail}
+
+    tasks = [asyncio.ensure_future(_run(i, spec)) for i, spec in enumerate(specs)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield json.dumps(await next_done, ensure_ascii=False, default=str) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/batch", dependencies=[Depends(require_batch_key)])
+@limiter.limit(settings.batch_rate_limit, key_func=api_key_or_remote_address)
+async def search_batch(
+    request: Request,
+    batch_request: BatchSearchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    opensearch: AsyncOpenSearch = Depends(get_opensearch_client)
+):
+    if len(batch_request.specs) > settings.batch_max_specs:
+        raise HTTPException(
+            status_code=413,
+            detail={"code": "BATCH_TOO_LARGE", "message": f"At most {settings.batch_max_specs} specs per batch"}
+        )
+
+    concurrency = min(batch_request.concurrency or settings.batch_concurrency, settings.batch_concurrency)
+    engine = BatchSearchEngine(db, opensearch)
+    return StreamingResponse(
+        _stream_batch(engine, batch_request.specs, concurrency),
+        media_type="application/x-ndjson",
+    )
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.database import get_async_db
 from backend.app.schemas.settings import RankingWeights, WeightPreset, WEIGHT_PRESETS
+from backend.app.services.ctr import CTRServiceError, apply_ctr_half_life
 from backend.app.services.settings import settings_service
 
 router = APIRouter(prefix="/api/v1/settings", tags=["settings"])
@@ -11,14 +17,33 @@ class CustomPresetCreate(BaseModel):
     weights: RankingWeights
 
 
+async def _sync_half_life(previous: RankingWeights, previous_preset: Optional[str], db: AsyncSession) -> None:
+    # Stored decayed counters are rebuilt before the response, so they never mix two half-lives.
+    if settings_service.get_weights().ctr_half_life_days == previous.ctr_half_life_days:
+        return
+    try:
+        await apply_ctr_half_life(db)
+    except CTRServiceError:
+        if previous_preset is not None:
+            settings_service.apply_preset(previous_preset)
+        else:
+            settings_service.set_weights(previous)
+        raise HTTPException(
+            status_code=503,
+            detail={"code": "CTR_REBUILD_FAILED", "message": "Could not rebuild CTR counters for the new half-life"}
+        )
+
+
 @router.get("/weights", response_model=RankingWeights)
 async def get_weights():
     return settings_service.get_weights()
 
 
 @router.put("/weights", response_model=RankingWeights)
-async def set_weights(weights: RankingWeights):
+async def set_weights(weights: RankingWeights, db: AsyncSession = Depends(get_async_db)):
+    previous, previous_preset = settings_service.get_weights(), settings_service.get_preset()
     settings_service.set_weights(weights)
+    await _sync_half_life(previous, previous_preset, db)
     return settings_service.get_weights()
 
 
@@ -39,11 +64,14 @@ async def get_presets():
 
 
 @router.post("/presets/{preset_name}", response_model=RankingWeights)
-async def apply_preset(preset_name: str):
+async def apply_preset(preset_name: str, db: AsyncSession = Depends(get_async_db)):
+    previous, previous_preset = settings_service.get_weights(), settings_service.get_preset()
     try:
-        return settings_service.apply_preset(preset_name)
+        weights = settings_service.apply_preset(preset_name)
     except (KeyError, ValueError):
         raise HTTPException(status_code=400, detail=f"Unknown preset: {preset_name}")
+    await _sync_half_life(previous, previous_preset, db)
+    return weights
 
 
 @router.post("/custom-presets", response_model=RankingWeights, status_code=201)
@@ -64,5 +92,8 @@ async def delete_custom_preset(preset_name: str):
 
 
 @router.post("/reset", response_model=RankingWeights)
-async def reset_weights():
-    return settings_service.reset()
+async def reset_weights(db: AsyncSession = Depends(get_async_db)):
+    previous, previous_preset = settings_service.get_weights(), settings_service.get_preset()
+    weights = settings_service.reset()
+    await _sync_half_life(previous, previous_preset, db)
+    return weights
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from backend.app.database import get_db
+from backend.app.database import get_async_db
 from backend.app.models import User, Click
+from backend.app.services.profile_cache import publish_profile_change, store_profile, user_to_profile
 from backend.app.schemas.user import (
     UserResponse,
     UserStatsResponse,
@@ -11,42 +13,68 @@ from backend.app.schemas.user import (
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
+MAX_BATCH_IDS = 200
+
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(role: Optional[str] = None, offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=200), db: Session = Depends(get_db)):
-    query = db.query(User)
+async def get_users(
+    role: Optional[str] = None,
+    after_id: Optional[int] = Query(None, ge=0, description="Return users with user_id greater than this (keyset cursor)"),
+    offset: int = Query(0, ge=0, deprecated=True, description="Deprecated, use after_id; removed in the next release"),
+    limit: int = Query(50, ge=1, le=200),
+    ids: Optional[List[int]] = Query(None, description="Fetch exactly these users in one round trip"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = select(User)
+    if ids:
+        if len(ids) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+        stmt = stmt.where(User.user_id.in_(set(ids)))
     if role:
-        query = query.filter(User.role == role)
-    return query.offset(offset).limit(limit).all()
+        stmt = stmt.where(User.role == role)
+    if after_id is not None:
+        stmt = stmt.where(User.user_id > after_id)
+    stmt = stmt.order_by(User.user_id)
+    if not ids:
+        stmt = stmt.offset(offset or None).limit(limit)
+    result = await db.execute(stmt)
+    return result.scalars().all()
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).where(User.user_id == user_id))
+    user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.get("/{user_id}/stats", response_model=UserStatsResponse)
-async def get_user_stats(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    total_clicks = select(func.count(Click.click_id)).where(Click.user_id == User.user_id).scalar_subquery()
+    result = await db.execute(select(User, total_clicks).where(User.user_id == user_id))
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="User not found")
-    return UserStatsResponse(user_id=user.user_id, username=user.username, total_clicks=db.query(Click).filter(Click.user_id == user_id).count(), role=user.role, specialization=user.specialization)
+    user, clicks = row
+    return UserStatsResponse(user_id=user.user_id, username=user.username, total_clicks=clicks or 0, role=user.role, specialization=user.specialization)
 
 
 @router.patch("/{user_id}/interests", response_model=UserResponse)
 async def update_user_interests(
     user_id: int,
     payload: UserInterestsUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.user_id == user_id).first()
+    result = await db.execute(select(User).where(User.user_id == user_id))
+    user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user.interests = payload.interests
-    db.commit()
-    db.refresh(user)
+    await publish_profile_change(db, user_id)
+    await db.commit()
+    await db.refresh(user)
+    store_profile(user_to_profile(user))
     return user
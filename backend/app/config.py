@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -24,6 +24,50 @@ class Settings(BaseSettings):
     cors_allow_methods: List[str] = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     cors_allow_headers: List[str] = ["*"]
 
+    admin_api_key: Optional[str] = None
+    batch_api_keys: List[str] = []
+    ingest_api_keys: List[str] = []
+
+    batch_max_specs: int = 1000
+    batch_concurrency: int = 8
+    batch_rate_limit: str = "20/minute"
+
+    max_candidate_pool: int = 1000
+
+    search_cache_ttl_seconds: int = 300
+    candidate_cache_size: int = 1000
+    facet_cache_size: int = 500
+    page_cache_size: int = 2000
+    page_cache_staleness_seconds: int = 60
+
+    profile_cache_size: int = 10000
+    profile_cache_ttl_seconds: int = 300
+    profile_notify_channel: Optional[str] = None
+
+    ctr_maintenance_interval_seconds: int = 300
+    ctr_rollup_lookback_days: int = 2
+    event_retention_months: int = 6
+    event_partition_months_ahead: int = 2
+
+    counter_flush_interval_seconds: int = 5
+    counter_reconcile_interval_seconds: int = 3600
+    counter_reconcile_exact: bool = False
+    counter_drift_tolerance: float = 0.05
+
+    events_max_batch: int = 500
+    events_max_body_bytes: int = 1_048_576
+
+    index_generation_poll_seconds: int = 30
+
+    document_ingest_max_batch: int = 1000
+    document_ingest_flush_seconds: float = 1.0
+    document_ingest_flush_size: int = 500
+    document_ingest_max_pending: int = 10000
+
+    warmup_on_startup: bool = True
+    warmup_top_queries: int = 100
+    warmup_concurrency: int = 4
+
     @property
     def cors_origins_list(self) -> List[str]:
         if self.app_env == "development":
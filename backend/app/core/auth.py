@@ -0,0 +1,39 @@
+
+import secrets
+from typing import List, Optional
+
+from fastapi import Header, HTTPException
+
+from backend.app.config import settings
+
+
+async def require_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=403,
+            detail={"code": "ADMIN_DISABLED", "message": "Admin API key is not configured"}
+        )
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.admin_api_key):
+        raise HTTPException(
+            status_code=401,
+            detail={"code": "UNAUTHORIZED", "message": "Invalid or missing admin key"}
+        )
+
+
+def _check_api_key(x_api_key: Optional[str], keys: List[str]) -> str:
+    allowed = [key for key in [*keys, settings.admin_api_key] if key]
+    if not x_api_key or not any(secrets.compare_digest(x_api_key, key) for key in allowed):
+        raise HTTPException(
+            status_code=401,
+            detail={"code": "UNAUTHORIZED", "message": "Invalid or missing API key"}
+        )
+    return x_api_key
+
+
+async def require_batch_key(x_api_key: Optional[str] = Header(None)) -> str:
+    return _check_api_key(x_api_key, settings.batch_api_keys)
+
+
+async def require_ingest_key(x_api_key: Optional[str] = Header(None)) -> str:
+    # Batch keys are read-only; catalogue writes need an ingest key or the admin key.
+    return _check_api_key(x_api_key, settings.ingest_api_keys)
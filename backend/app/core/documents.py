@@ -0,0 +1,325 @@
+
+import hashlib
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class ValidationResult:
+    is_valid: bool
+    errors: list
+    warnings: list
+
+
+def validate_document(doc: dict, source: str) -> ValidationResult:
+    errors = []
+    warnings = []
+
+    doc_id = doc.get("document_id", "unknown")
+
+    if not doc.get("document_id"):
+        errors.append("missing document_id")
+
+    title = doc.get("title")
+    if not title:
+        errors.append("missing title")
+    elif isinstance(title, list):
+        if not any(t.strip() for t in title if t):
+            errors.append("empty title list")
+
+    authors = doc.get("authors", [])
+    if isinstance(authors, str):
+        authors = [authors]
+    if not authors or not any(a.strip() for a in authors if a):
+        warnings.append("missing authors")
+
+    year = doc.get("year")
+    if year is not None:
+        if isinstance(year, int):
+            if year < 1800 or year > 2030:
+                warnings.append(f"suspicious year: {year}")
+        else:
+            warnings.append(f"invalid year type: {type(year).__name__}")
+
+    subjects = doc.get("subjects", [])
+    if isinstance(subjects, str):
+        subjects = [subjects]
+    if not subjects:
+        warnings.append("missing subjects")
+
+    return ValidationResult(
+        is_valid=len(errors) == 0,
+        errors=errors,
+        warnings=warnings
+    )
+
+
+def _text_field():
+    return {"type": "text", "analyzer": "russian_analyzer"}
+
+
+# Kept in _source for display only: no inverted index, no doc values.
+DISPLAY_FIELD = {"type": "keyword", "index": False, "doc_values": False}
+
+INDEX_PROPERTIES = {
+    "document_id": {"type": "keyword"},
+    "source": {"type": "keyword"},
+    "title": _text_field(),
+    "authors": _text_field(),
+    "subjects": _text_field(),
+    "collection": _text_field(),
+    "knowledge_area": _text_field(),
+    "organization": _text_field(),
+    "publication_info": _text_field(),
+    "year": {"type": "integer"},
+    "document_type": {"type": "keyword"},
+    "language": {"type": "keyword"},
+    # Filter, facet and sort keys computed at load time (see denormalize_keys), so queries
+    # are plain term lookups instead of exists/must_not scans and keyword subfields.
+    "title_sort": {"type": "keyword"},
+    "has_pdf": {"type": "boolean"},
+    "database_key": {"type": "keyword"},
+    "collection_key": {"type": "keyword", "ignore_above": 256},
+    "knowledge_area_key": {"type": "keyword", "ignore_above": 256},
+    "database": DISPLAY_FIELD,
+    "pdf_url": DISPLAY_FIELD,
+    "alt_card_urls": DISPLAY_FIELD,
+    "read_url": DISPLAY_FIELD,
+    "card_url": DISPLAY_FIELD,
+    "url": DISPLAY_FIELD,
+    "cover_url": DISPLAY_FIELD,
+}
+
+
+def count_fields(properties):
+    # Counts multi-fields and nested objects too, as the total_fields limit does.
+    total = 0
+    for spec in properties.values():
+        total += 1 + len(spec.get("fields", {})) + count_fields(spec.get("properties", {}))
+    return total
+
+
+# Raw scraper keys folded into their canonical field when the canonical one is empty.
+FIELD_FALLBACKS = {
+    "collection": ["коллекция"],
+    "organization": ["организация"],
+    "publication_info": ["выходные_сведения"],
+    "language": ["язык"],
+    "cover_url": ["cover"],
+}
+
+
+def _coerce_year(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    try:
+        return int(str(value).strip()[:4])
+    except ValueError:
+        return None
+
+
+TITLE_SORT_LENGTH = 256
+
+# E-library records have no database, so they are filed under this key.
+ELIB_DATABASE_KEY = "ELIB"
+
+
+def filter_key(value):
+    return " ".join(first_text(value).split())
+
+
+def filter_keys(value):
+    # Multi-valued fields get one key per value, so a filter matches any of them.
+    keys = (filter_key(v) for v in (value if isinstance(value, list) else [value]))
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def denormalize_keys(doc):
+    doc["title_sort"] = filter_key(doc.get("title"))[:TITLE_SORT_LENGTH]
+    doc["has_pdf"] = bool(doc.get("pdf_url"))
+    doc["database_key"] = filter_key(doc.get("database")) or ELIB_DATABASE_KEY
+    doc["collection_key"] = filter_keys(doc.get("collection"))
+    doc["knowledge_area_key"] = filter_keys(doc.get("knowledge_area"))
+
+
+def slim_document(doc, dropped):
+    for name, fallbacks in FIELD_FALLBACKS.items():
+        if not doc.get(name):
+            doc[name] = next((doc[raw] for raw in fallbacks if doc.get(raw)), None)
+    denormalize_keys(doc)
+    slim = {}
+    for name, value in doc.items():
+        if value in (None, "", []):
+            continue
+        if name not in INDEX_PROPERTIES:
+            dropped[name] += 1
+            continue
+        if name == "year":
+            value = _coerce_year(value)
+            if value is None:
+                continue
+        elif isinstance(value, dict):
+            value = json.dumps(value, ensure_ascii=False)
+        slim[name] = value
+    return slim
+
+
+def parse_elib_document(raw):
+    record_key = raw.get("record_key", "")
+    if record_key:
+        doc_id = record_key.replace("\\", "_")
+    else:
+        # Stable across processes and runs, unlike hash(), so delta runs keep matching ids.
+        doc_id = f"elib_{hashlib.md5(str(raw.get('title', '')).encode('utf-8')).hexdigest()[:16]}"
+
+    authors = raw.get("authors", [])
+    if isinstance(authors, str):
+        authors = [authors]
+
+    subjects = raw.get("subjects", [])
+    if isinstance(subjects, str):
+        subjects = [subjects]
+
+    doc = {"document_id": doc_id, **raw}
+    doc["authors"] = authors
+    doc["subjects"] = subjects
+    return doc
+
+
+def extract_names_from_responsibility(text):
+    if not text:
+        return set()
+    names = set()
+    patterns = [
+        r'предисл\.\s*([А-ЯЁа-яё\.\s]+?)(?:;|$)',
+        r'послесл\.\s*([А-ЯЁа-яё\.\s]+?)(?:;|$)',
+        r'ред\.\s*([А-ЯЁа-яё\.\s]+?)(?:;|$)',
+        r'сост\.\s*([А-ЯЁа-яё\.\s]+?)(?:;|$)',
+    ]
+    for pattern in patterns:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            name = match.strip()
+            if name:
+                parts = name.split()
+                if parts:
+                    surname = parts[-1].rstrip('.').lower()
+                    if len(surname) > 5:
+                        surname = surname[:6]
+                    names.add(surname)
+    return names
+
+
+def normalize_name(name):
+    if not name:
+        return ""
+    parts = name.replace(",", " ").split()
+    surname = parts[0].lower() if parts else ""
+    if len(surname) > 5:
+        surname = surname[:6]
+    return surname
+
+
+def filter_ruslan_authors(raw):
+    authors = raw.get("authors", [])
+    if isinstance(authors, str):
+        authors = [authors]
+    if not authors:
+        return []
+
+    subject_person = raw.get("personal_name_subject", "")
+    if isinstance(subject_person, list):
+        subject_person = " ".join(subject_person)
+    subject_surname = normalize_name(subject_person)
+
+    subsequent = raw.get("subsequent_responsibility", [])
+    if isinstance(subsequent, str):
+        subsequent = [subsequent]
+    excluded_names = set()
+    for resp in subsequent:
+        excluded_names.update(extract_names_from_responsibility(resp))
+
+    org_keywords = ["университет", "институт", "академия", "библиотека", "центр", "фонд", "музей"]
+    filtered = []
+    seen = set()
+
+    for author in authors:
+        if not author or not isinstance(author, str):
+            continue
+        author_lower = author.lower()
+        if any(kw in author_lower for kw in org_keywords):
+            continue
+        surname = normalize_name(author)
+        if not surname:
+            continue
+        if subject_surname and surname == subject_surname:
+            continue
+        if surname in excluded_names:
+            continue
+        if surname in seen:
+            continue
+        seen.add(surname)
+        filtered.append(author)
+
+    return filtered if filtered else authors[:1]
+
+
+def parse_ruslan_document(raw):
+    authors = filter_ruslan_authors(raw)
+
+    subjects = raw.get("subjects", raw.get("subject_term", []))
+    if isinstance(subjects, str):
+        subjects = [s.strip() for s in subjects.split(";") if s.strip()]
+        if len(subjects) == 1:
+            subjects = [s.strip() for s in subjects[0].split(",") if s.strip()]
+
+    uncontrolled = raw.get("uncontrolled_subject", [])
+    if isinstance(uncontrolled, str):
+        uncontrolled = [uncontrolled]
+
+    doc = {**raw}
+    doc["authors"] = authors
+    doc["subjects"] = subjects if subjects else uncontrolled
+    return doc
+
+
+def first_text(value):
+    if isinstance(value, list):
+        value = next((v for v in value if v), "")
+    return str(value) if value else ""
+
+
+def document_row(doc):
+    # One bad value would abort the whole COPY, so every column is coerced to its type here.
+    doc_id = first_text(doc.get("document_id"))[:50]
+    if not doc_id:
+        return None
+    title = first_text(doc.get("title")) or "No title"
+    authors = doc.get("authors", [])
+    if isinstance(authors, str):
+        authors = [authors]
+    authors = [str(a) for a in authors or [] if a]
+    doc_type = (first_text(doc.get("document_type")) or "Unknown")[:50]
+    year = doc.get("year")
+    if year is not None and (not isinstance(year, int) or isinstance(year, bool)):
+        try:
+            year = int(year)
+        except (ValueError, TypeError):
+            year = None
+    subject = first_text(doc.get("knowledge_area")) or first_text(doc.get("subjects"))
+    subject = subject[:100] if subject else None
+    language = (first_text(doc.get("language")) or "ru")[:10]
+    return doc_id, title, authors, doc_type, year, subject, language
+
+
+DOCUMENT_PARSERS = {"elib": parse_elib_document, "ruslan": parse_ruslan_document}
+
+
+def prepare_document(raw: dict, source: str, dropped: Counter) -> Tuple[Optional[Dict], ValidationResult]:
+    doc = DOCUMENT_PARSERS[source](raw)
+    validation = validate_document(doc, source)
+    if not validation.is_valid:
+        return None, validation
+    return slim_document(doc, dropped), validation
@@ -40,6 +40,15 @@ class InvalidWeightsError(SearchError):
         )
 
 
+class HalfLifeOverrideError(SearchError):
+
+    def __init__(self, value: float, current: float):
+        super().__init__(
+            f"ctr_half_life_days {value} differs from the global half-life {current}; change it in the ranking settings",
+            code="HALF_LIFE_OVERRIDE"
+        )
+
+
 class UserNotFoundError(SearchError):
 
     def __init__(self, user_id: int):
@@ -69,3 +78,25 @@ class RateLimitError(SearchError):
         if retry_after:
             message += f", retry after {retry_after} seconds"
         super().__init__(message, code="RATE_LIMIT_EXCEEDED")
+
+
+class InvalidEventBatchError(SearchError):
+
+    def __init__(self, message: str):
+        super().__init__(message, code="INVALID_EVENT_BATCH")
+
+
+class EventBatchTooLargeError(SearchError):
+
+    def __init__(self, message: str):
+        super().__init__(message, code="BATCH_TOO_LARGE")
+
+
+class IngestBackpressureError(SearchError):
+
+    def __init__(self, pending: int, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Ingest buffer is full ({pending} documents pending), retry after {retry_after} seconds",
+            code="INGEST_BACKPRESSURE"
+        )
@@ -0,0 +1,18 @@
+"""Normalized 64-bit fingerprints for query-keyed tables and caches.
+
+This module is the single source of truth for ``query_fp``: every writer
+(API, seeders, backfill) computes it here, so SQL never has to reproduce
+the canonicalization rules.
+"""
+
+import hashlib
+import unicodedata
+
+
+def canonicalize_query(query: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def query_fingerprint(query: str) -> int:
+    digest = hashlib.md5(canonicalize_query(query).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
@@ -7,6 +7,11 @@ from fastapi.responses import JSONResponse
 limiter = Limiter(key_func=get_remote_address)
 
 
+def api_key_or_remote_address(request: Request) -> str:
+    api_key = request.headers.get("X-API-Key")
+    return f"api-key:{api_key}" if api_key else get_remote_address(request)
+
+
 async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(
         status_code=429,
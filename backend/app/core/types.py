@@ -18,6 +18,7 @@ class RankingWeightsDict(TypedDict):
     beta_ctr: float
     ctr_alpha_prior: float
     ctr_beta_prior: float
+    ctr_half_life_days: float
 
 
 class ScoreBreakdown(TypedDict):
@@ -34,4 +35,6 @@ class ScoreBreakdown(TypedDict):
     final_score: float
     clicks: int
     impressions: int
+    decayed_clicks: float
+    decayed_impressions: float
     weights: RankingWeightsDict
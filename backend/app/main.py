@@ -1,28 +1,160 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from backend.app.api import search, interactions, users
+from backend.app.api import admin, documents, search, interactions, users
 from backend.app.api.settings_weights import router as settings_router
 from backend.app.api.settings_preferences import router as preferences_router
 from backend.app.config import settings as app_settings
 from backend.app.core.logging import setup_logging, get_logger
 from backend.app.core.middleware import RequestIDMiddleware, RequestLoggingMiddleware
 from backend.app.core.rate_limit import limiter, rate_limit_exceeded_handler
-from backend.app.database import OpenSearchClientManager
+from backend.app.database import AsyncSessionLocal, OpenSearchClientManager, async_engine
+from backend.app.services.ctr import load_ctr_half_life, run_ctr_maintenance
+from backend.app.services.document_ingest import document_ingest
+from backend.app.services.event_counters import event_counters
+from backend.app.services.index_generation import index_generation
+from backend.app.services.profile_cache import ProfileChangeListener
+from backend.app.services.search_cache import clear_index_caches
+from backend.app.services.warmup import run_warmup
 
 setup_logging()
 logger = get_logger(__name__)
 
 
+async def _warmup_on_startup() -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await run_warmup(db, OpenSearchClientManager.get_client(), async_engine)
+    except Exception as e:
+        logger.warning(f"Startup cache warm-up failed: {type(e).__name__}: {e}")
+
+
+async def _load_ctr_half_life() -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await load_ctr_half_life(db)
+    except Exception as e:
+        logger.warning(f"Loading the stored CTR half-life failed: {type(e).__name__}: {e}")
+
+
+async def _ctr_maintenance_loop() -> None:
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await run_ctr_maintenance(db)
+        except Exception as e:
+            logger.warning(f"CTR maintenance failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(app_settings.ctr_maintenance_interval_seconds)
+
+
+async def _event_counters_loop() -> None:
+    next_reconcile = 0.0
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                if time.monotonic() >= next_reconcile:
+                    await event_counters.reconcile(db, exact=app_settings.counter_reconcile_exact)
+                    next_reconcile = time.monotonic() + app_settings.counter_reconcile_interval_seconds
+                else:
+                    await event_counters.flush(db)
+        except Exception as e:
+            logger.warning(f"Event counter sync failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(app_settings.counter_flush_interval_seconds)
+
+
+async def _index_generation_loop() -> None:
+    while True:
+        try:
+            if await index_generation.refresh(OpenSearchClientManager.get_client()):
+                clear_index_caches()
+        except Exception as e:
+            logger.warning(f"Index generation check failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(app_settings.index_generation_poll_seconds)
+
+
+async def _resolve_index_generation() -> None:
+    # Resolved before warm-up, so warmed entries are keyed on the generation searches will use.
+    try:
+        await index_generation.refresh(OpenSearchClientManager.get_client())
+    except Exception as e:
+        logger.warning(f"Index generation lookup failed: {type(e).__name__}: {e}")
+
+
+async def _document_ingest_loop() -> None:
+    while True:
+        await asyncio.sleep(app_settings.document_ingest_flush_seconds)
+        if not document_ingest.pending():
+            continue
+        try:
+            async with AsyncSessionLocal() as db:
+                await document_ingest.drain(OpenSearchClientManager.get_client(), db)
+        except Exception as e:
+            logger.warning(f"Document ingest flush failed: {type(e).__name__}: {e}")
+
+
+async def _drain_document_ingest() -> None:
+    if not document_ingest.pending():
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await document_ingest.drain(OpenSearchClientManager.get_client(), db)
+    except Exception as e:
+        logger.warning(f"Final document ingest flush failed: {type(e).__name__}: {e}")
+
+
+async def _flush_event_counters() -> None:
+    if not event_counters.dirty:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await event_counters.flush(db)
+    except Exception as e:
+        logger.warning(f"Final event counter flush failed: {type(e).__name__}: {e}")
+
+
+async def _start_profile_listener() -> Optional[ProfileChangeListener]:
+    if not app_settings.profile_notify_channel:
+        return None
+    listener = ProfileChangeListener(app_settings.profile_notify_channel)
+    try:
+        await listener.start()
+    except Exception as e:
+        logger.warning(f"Profile change listener unavailable: {type(e).__name__}: {e}")
+        return None
+    return listener
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up...")
+    await _load_ctr_half_life()
+    await _resolve_index_generation()
+    warmup_task = asyncio.create_task(_warmup_on_startup()) if app_settings.warmup_on_startup else None
+    profile_listener = await _start_profile_listener()
+    maintenance_task = (
+        asyncio.create_task(_ctr_maintenance_loop()) if app_settings.ctr_maintenance_interval_seconds > 0 else None
+    )
+    counters_task = asyncio.create_task(_event_counters_loop())
+    ingest_task = asyncio.create_task(_document_ingest_loop())
+    generation_task = (
+        asyncio.create_task(_index_generation_loop()) if app_settings.index_generation_poll_seconds > 0 else None
+    )
     yield
     logger.info("Shutting down...")
+    for task in (warmup_task, maintenance_task, counters_task, ingest_task, generation_task):
+        if task is not None and not task.done():
+            task.cancel()
+    await _drain_document_ingest()
+    await _flush_event_counters()
+    if profile_listener is not None:
+        await profile_listener.stop()
     await OpenSearchClientManager.close_client()
 
 
@@ -51,6 +183,8 @@ app.include_router(interactions.router)
 app.include_router(users.router)
 app.include_router(settings_router)
 app.include_router(preferences_router)
+app.include_router(admin.router)
+app.include_router(documents.router)
 
 logger.info("NSU Library Search API started")
 
@@ -65,4 +199,4 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return {"status": "healthy", "index_generation": index_generation.get()}
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, Text, ARRAY, TIMESTAMP, ForeignKey, Float
+from sqlalchemy import Column, BigInteger, Identity, Integer, String, Text, ARRAY, TIMESTAMP, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.app.database import Base
@@ -33,6 +33,7 @@ class Document(Base):
     __tablename__ = "documents"
 
     document_id = Column(String(50), primary_key=True)
+    doc_key = Column(Integer, Identity(), unique=True, nullable=False)
     title = Column(Text, nullable=False)
     authors = Column(ARRAY(Text))
     document_type = Column(String(50), nullable=False)
@@ -58,10 +59,13 @@ class SearchQuery(Base):
 
     query_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), index=True)
-    query_text = Column(Text, nullable=False, index=True)
+    query_text = Column(Text, nullable=False)
+    query_fp = Column(BigInteger, nullable=False)
     results_count = Column(Integer)
     timestamp = Column(TIMESTAMP, server_default=func.now())
-    session_id = Column(String(100), index=True)
+    session_id = Column(String(100))
+
+    __table_args__ = (Index("idx_search_queries_session_fp", "session_id", "query_fp", unique=True),)
 
     user = relationship("User", back_populates="search_queries")
     clicks = relationship("Click", back_populates="search_query", lazy="dynamic")
@@ -74,13 +78,14 @@ class Click(Base):
 
     __tablename__ = "clicks"
 
-    click_id = Column(Integer, primary_key=True, index=True)
+    click_id = Column(BigInteger, primary_key=True, autoincrement=True)
     query_id = Column(Integer, ForeignKey("search_queries.query_id"), index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), index=True)
-    document_id = Column(String(50), ForeignKey("documents.document_id"), index=True)
-    query_text = Column(Text, nullable=False, index=True)
+    doc_key = Column(Integer, ForeignKey("documents.doc_key"), index=True)
+    query_text = Column(Text, nullable=False)
+    query_fp = Column(BigInteger, nullable=False, index=True)
     position = Column(Integer, nullable=False)
-    clicked_at = Column(TIMESTAMP, server_default=func.now())
+    clicked_at = Column(TIMESTAMP, primary_key=True, nullable=False, server_default=func.now())
     dwell_time = Column(Integer)
     session_id = Column(String(100), index=True)
 
@@ -89,24 +94,25 @@ class Click(Base):
     document = relationship("Document", back_populates="clicks")
 
     def __repr__(self) -> str:
-        return f"<Click {self.click_id}: doc={self.document_id} pos={self.position}>"
+        return f"<Click {self.click_id}: doc={self.doc_key} pos={self.position}>"
 
 
 class Impression(Base):
 
     __tablename__ = "impressions"
 
-    impression_id = Column(Integer, primary_key=True, index=True)
+    impression_id = Column(BigInteger, primary_key=True, autoincrement=True)
     query_id = Column(Integer, ForeignKey("search_queries.query_id"), index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), index=True)
-    document_id = Column(String(50), ForeignKey("documents.document_id"), index=True)
-    query_text = Column(Text, nullable=False, index=True)
+    doc_key = Column(Integer, ForeignKey("documents.doc_key"), index=True)
+    query_text = Column(Text, nullable=False)
+    query_fp = Column(BigInteger, nullable=False, index=True)
     position = Column(Integer, nullable=False)
-    shown_at = Column(TIMESTAMP, server_default=func.now())
+    shown_at = Column(TIMESTAMP, primary_key=True, nullable=False, server_default=func.now())
     session_id = Column(String(100), index=True)
 
     user = relationship("User", back_populates="impressions")
     document = relationship("Document", back_populates="impressions")
 
     def __repr__(self) -> str:
-        return f"<Impression {self.impression_id}: doc={self.document_id} pos={self.position}>"
+        return f"<Impression {self.impression_id}: doc={self.doc_key} pos={self.position}>"
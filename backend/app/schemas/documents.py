@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal
+
+
+DocumentSourceType = Literal["elib", "ruslan"]
+
+
+class DocumentIngestRequest(BaseModel):
+    source: DocumentSourceType = Field(..., description="Scraper format of the raw record")
+    document: Dict[str, Any] = Field(..., description="Raw record as written by the scraper")
+
+
+class BulkDocumentIngestRequest(BaseModel):
+    source: DocumentSourceType = Field(..., description="Scraper format of the raw records")
+    documents: List[Dict[str, Any]] = Field(..., min_length=1, description="Raw records as written by the scraper")
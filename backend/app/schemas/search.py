@@ -1,6 +1,6 @@
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Literal
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Annotated, Optional, List, Dict, Any, Literal, Union
 
 
 SearchFieldType = Literal["all", "title", "authors", "subjects", "collection"]
@@ -13,16 +13,76 @@ class SearchRequest(BaseModel):
     enable_personalization: bool = Field(True, description="Enable personalized ranking")
     page: int = Field(1, ge=1, le=2500, description="Page number")
     per_page: int = Field(20, ge=1, le=100, description="Results per page")
+    candidate_pool: Optional[int] = Field(
+        None,
+        ge=1,
+        validation_alias=AliasChoices("candidate_pool", "top_k"),
+        description="Number of candidates reranked before paging (capped by MAX_CANDIDATE_POOL).",
+    )
     filters: Optional[Dict[str, Any]] = Field(None, description="Optional filters")
     session_id: Optional[str] = Field(None, description="Session ID for tracking")
     search_field: SearchFieldType = Field("all", description="Field to search in")
     sort_by: SortByType = Field("relevance", description="Sort order")
+    exact_total: bool = Field(
+        False,
+        description="Count every match for year and title sorts instead of stopping at the result window.",
+    )
     weights_override: Optional[Dict[str, float]] = Field(
         None,
         description="Per-request override of ranking weights (does not persist).",
     )
 
 
+class CompareRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=500, description="Search query")
+    user_id: Optional[int] = Field(None, description="User ID for personalization")
+    enable_personalization: bool = Field(True, description="Enable personalized ranking")
+    per_page: int = Field(20, ge=1, le=100, description="Results per ranking")
+    candidate_pool: Optional[int] = Field(
+        None,
+        ge=1,
+        validation_alias=AliasChoices("candidate_pool", "top_k"),
+        description="Number of candidates reranked before paging (capped by MAX_CANDIDATE_POOL).",
+    )
+    filters: Optional[Dict[str, Any]] = Field(None, description="Optional filters")
+    search_field: SearchFieldType = Field("all", description="Field to search in")
+    sort_by: SortByType = Field("relevance", description="Sort order")
+    presets: List[str] = Field(
+        default_factory=list,
+        max_length=10,
+        description="Built-in or custom preset names to rank under (all built-in presets if nothing is given).",
+    )
+    weight_sets: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description="Named ad-hoc weight overrides ranked alongside the presets.",
+    )
+
+
+class BatchSearchSpec(BaseModel):
+    id: Optional[str] = Field(None, max_length=100, description="Client-side identifier echoed in the result")
+    query: str = Field(..., min_length=1, max_length=500, description="Search query")
+    user_id: Optional[int] = Field(None, description="User ID for personalization")
+    enable_personalization: bool = Field(True, description="Enable personalized ranking")
+    page: int = Field(1, ge=1, le=2500, description="Page number")
+    per_page: int = Field(20, ge=1, le=100, description="Results per page")
+    candidate_pool: Optional[int] = Field(
+        None,
+        ge=1,
+        validation_alias=AliasChoices("candidate_pool", "top_k"),
+        description="Number of candidates reranked before paging (capped by MAX_CANDIDATE_POOL).",
+    )
+    filters: Optional[Dict[str, Any]] = Field(None, description="Optional filters")
+    search_field: SearchFieldType = Field("all", description="Field to search in")
+    sort_by: SortByType = Field("relevance", description="Sort order")
+    exact_total: bool = Field(False, description="Count every match for year and title sorts")
+    weights_override: Optional[Dict[str, float]] = Field(None, description="Per-spec override of ranking weights")
+
+
+class BatchSearchRequest(BaseModel):
+    specs: List[BatchSearchSpec] = Field(..., min_length=1, description="Searches to execute")
+    concurrency: Optional[int] = Field(None, ge=1, le=32, description="Max specs executed at once")
+
+
 class ClickEvent(BaseModel):
     query: str = Field(..., min_length=1, max_length=500, description="Search query")
     user_id: Optional[int] = Field(None, description="User ID (optional for anonymous)")
@@ -39,6 +99,17 @@ class ImpressionsEvent(BaseModel):
     session_id: Optional[str] = Field(None, description="Session ID")
 
 
+class ClickEventItem(ClickEvent):
+    type: Literal["click"]
+
+
+class ImpressionsEventItem(ImpressionsEvent):
+    type: Literal["impressions"]
+
+
+InteractionEvent = Annotated[Union[ClickEventItem, ImpressionsEventItem], Field(discriminator="type")]
+
+
 class FilterOptionsRequest(BaseModel):
     query: Optional[str] = Field(None, max_length=500, description="Optional search query for context")
     filters: Optional[Dict[str, Any]] = Field(None, description="Currently applied filters")
@@ -81,6 +152,7 @@ class UserProfile(BaseModel):
 class SearchResponse(BaseModel):
     query: str
     total: int
+    total_relation: Literal["eq", "gte"] = "eq"
     page: int = 1
     per_page: int = 20
     total_pages: int = 1
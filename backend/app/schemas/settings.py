@@ -12,6 +12,7 @@ class RankingWeights(BaseModel):
 
     ctr_alpha_prior: float = Field(1.0, ge=0, le=10, description="Псевдо-клики")
     ctr_beta_prior: float = Field(10.0, ge=1, le=100, description="Псевдо-показы")
+    ctr_half_life_days: float = Field(30.0, ge=0, le=365, description="Период полураспада CTR, дней (0 — без затухания)")
 
 
 class WeightPreset(str, Enum):
@@ -6,10 +6,18 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.models import User
+from backend.app.schemas.search import ClickEvent, ImpressionsEvent
 from backend.app.config import settings
-from backend.app.services.ranking import apply_ranking_formula
+from backend.app.services.ranking import apply_ranking_formula, pairwise_overlap
 from backend.app.services.search_query_builder import build_search_query, build_aggregations_query, parse_aggregations_response
-from backend.app.services.ctr import get_batch_ctr_data, get_aggregated_ctr_data, register_click as ctr_register_click, register_impressions as ctr_register_impressions, CTRServiceError
+from backend.app.services.preferences import preferences_service
+from backend.app.services.profile_cache import get_cached_profile, store_profile, user_to_profile
+from backend.app.services.search_cache import (
+    candidate_key, cohort_fingerprint, facet_key, facet_cache, get_cached_candidates, page_cache, page_key,
+    store_candidates,
+)
+from backend.app.services.settings import settings_service
+from backend.app.services.ctr import CandidateCTR, check_half_life, get_candidate_ctr_data, register_click as ctr_register_click, register_clicks as ctr_register_clicks, register_events as ctr_register_events, register_impressions as ctr_register_impressions, CTRServiceError
 
 logger = logging.getLogger(__name__)
 
@@ -23,61 +31,142 @@ class AsyncSearchEngine:
 
     async def search(self, query: str, user_id: Optional[int] = None, page: int = 1, per_page: int = 20,
                      enable_personalization: bool = True, filters: Optional[Dict] = None, search_field: str = "all",
-                     sort_by: str = "relevance", weights_override: Optional[Dict] = None) -> Dict[str, Any]:
+                     sort_by: str = "relevance", weights_override: Optional[Dict] = None,
+                     candidate_pool: Optional[int] = None, exact_total: bool = False) -> Dict[str, Any]:
+        check_half_life(weights_override)
         user_profile = await self._get_user_profile(user_id) if user_id and enable_personalization else None
-        search_body = build_search_query(query, filters, search_field, sort_by)
-        response = await self.client.search(index=self.index_name, body=search_body, size=page * per_page, request_timeout=30)
+        personalized = enable_personalization and user_profile is not None
+        window = self._rerank_window(page * per_page, candidate_pool)
+        cache_key = page_key(
+            candidate_key(query, filters, search_field, sort_by, exact_total),
+            cohort_fingerprint(user_profile if personalized else None),
+            settings_service.get_version(), preferences_service.get_version(),
+            weights_override, page, per_page, window,
+        )
+        cached_page = page_cache.get(cache_key)
+        if cached_page is not None:
+            return {"query": query, "total": cached_page["total"], "total_relation": cached_page["total_relation"],
+                    "page": page, "per_page": per_page,
+                    "total_pages": (cached_page["total"] + per_page - 1) // per_page,
+                    "results": list(cached_page["results"]), "personalized": personalized,
+                    "user_profile": user_profile}
 
-        try:
-            ctr_data = await get_batch_ctr_data(self.db, query)
-        except CTRServiceError as e:
-            logger.warning(f"CTR data unavailable: {e}")
-            ctr_data = {}
+        response = await self.fetch_candidates(query, filters, search_field, sort_by, window, exact_total)
+        ctr_rows = await self._get_ctr_data(query, self._candidate_ids(response))
 
         all_results = apply_ranking_formula(
-            response['hits']['hits'], ctr_data, user_profile, enable_personalization,
+            response['hits']['hits'], self._query_ctr(ctr_rows), user_profile, enable_personalization,
             preserve_order=sort_by not in ("relevance", "popularity_desc"),
             weights_override=weights_override,
             sort_by=sort_by,
         )
         total = response['hits']['total']['value']
+        total_relation = response['hits']['total'].get('relation', 'eq')
         start_idx, end_idx = (page - 1) * per_page, page * per_page
         page_results = all_results[start_idx:end_idx]
-        await self._enrich_with_aggregated_ctr(page_results)
+        self._enrich_with_aggregated_ctr(page_results, ctr_rows)
+        page_cache.set(cache_key, {"total": total, "total_relation": total_relation, "results": page_results})
+
+        return {"query": query, "total": total, "total_relation": total_relation, "page": page, "per_page": per_page,
+                "total_pages": (total + per_page - 1) // per_page, "results": list(page_results),
+                "personalized": personalized, "user_profile": user_profile}
+
+    async def compare(self, query: str, weight_sets: Dict[str, Dict[str, float]], user_id: Optional[int] = None,
+                      per_page: int = 20, enable_personalization: bool = True, filters: Optional[Dict] = None,
+                      search_field: str = "all", sort_by: str = "relevance",
+                      candidate_pool: Optional[int] = None) -> Dict[str, Any]:
+        for weights in weight_sets.values():
+            check_half_life(weights)
+        user_profile = await self._get_user_profile(user_id) if user_id and enable_personalization else None
+        response = await self.fetch_candidates(query, filters, search_field, sort_by,
+                                               self._rerank_window(per_page, candidate_pool))
+        ctr_rows = await self._get_ctr_data(query, self._candidate_ids(response))
+        ctr_data = self._query_ctr(ctr_rows)
+
+        rankings: Dict[str, List[Dict]] = {}
+        for name, weights in weight_sets.items():
+            rankings[name] = apply_ranking_formula(
+                response['hits']['hits'], ctr_data, user_profile, enable_personalization,
+                preserve_order=sort_by not in ("relevance", "popularity_desc"),
+                weights_override=weights,
+                sort_by=sort_by,
+            )[:per_page]
+        self._enrich_with_aggregated_ctr([r for results in rankings.values() for r in results], ctr_rows)
 
-        return {"query": query, "total": total, "page": page, "per_page": per_page,
-                "total_pages": (total + per_page - 1) // per_page, "results": page_results,
+        return {"query": query, "total": response['hits']['total']['value'], "per_page": per_page,
+                "rankings": rankings,
+                "overlap": pairwise_overlap({name: [r['document_id'] for r in results]
+                                             for name, results in rankings.items()}),
                 "personalized": enable_personalization and user_profile is not None, "user_profile": user_profile}
 
-    async def _enrich_with_aggregated_ctr(self, results: List[Dict]) -> None:
-        document_ids = [r['document_id'] for r in results]
+    @staticmethod
+    def _rerank_window(needed: int, candidate_pool: Optional[int]) -> int:
+        if not candidate_pool:
+            return needed
+        return max(needed, min(candidate_pool, settings.max_candidate_pool))
+
+    async def fetch_candidates(self, query: str, filters: Optional[Dict], search_field: str, sort_by: str,
+                               size: int, exact_total: bool = False) -> Dict[str, Any]:
+        key = candidate_key(query, filters, search_field, sort_by, exact_total)
+        cached = get_cached_candidates(key, size)
+        if cached is not None:
+            return cached
+        search_body = build_search_query(query, filters, search_field, sort_by, exact_total)
+        response = await self.client.search(index=self.index_name, body=search_body, size=size, request_timeout=30)
+        store_candidates(key, size, response)
+        return response
+
+    @staticmethod
+    def _candidate_ids(response: Dict[str, Any]) -> List[str]:
+        return list(dict.fromkeys(
+            hit['_source']['document_id'] for hit in response['hits']['hits']
+            if hit.get('_source', {}).get('document_id')
+        ))
+
+    @staticmethod
+    def _query_ctr(ctr_rows: Dict[str, CandidateCTR]) -> Dict[str, tuple]:
+        return {doc_id: (row[0], row[1], row[4], row[5]) for doc_id, row in ctr_rows.items()}
+
+    async def _get_ctr_data(self, query: str, document_ids: List[str]) -> Dict[str, CandidateCTR]:
         try:
-            aggregated_ctr = await get_aggregated_ctr_data(self.db, document_ids)
+            return await get_candidate_ctr_data(self.db, query, document_ids)
         except CTRServiceError as e:
-            logger.warning(f"Aggregated CTR data unavailable: {e}")
-            return
+            logger.warning(f"CTR data unavailable: {e}")
+            return {}
+
+    @staticmethod
+    def _enrich_with_aggregated_ctr(results: List[Dict], ctr_rows: Dict[str, CandidateCTR]) -> None:
         for result in results:
-            if result['document_id'] in aggregated_ctr:
-                clicks, impressions = aggregated_ctr[result['document_id']]
+            if result['document_id'] in ctr_rows:
+                _, _, clicks, impressions, *_ = ctr_rows[result['document_id']]
                 result['impressions'], result['clicks'] = impressions, clicks
                 if impressions > 0:
                     result['display_ctr'] = clicks / impressions
 
     async def _get_user_profile(self, user_id: int) -> Optional[Dict]:
+        cached = get_cached_profile(user_id)
+        if cached is not None:
+            return cached
         result = await self.db.execute(select(User).where(User.user_id == user_id))
         user = result.scalar_one_or_none()
         if not user:
             return None
-        return {"user_id": user.user_id, "username": user.username, "role": user.role,
-                "specialization": user.specialization, "faculty": getattr(user, 'faculty', None),
-                "course": user.course, "interests": user.interests or []}
+        profile = user_to_profile(user)
+        store_profile(profile)
+        return profile
 
     async def register_click(self, query: str, user_id: Optional[int], document_id: str, position: int,
-                             session_id: Optional[str] = None, dwell_time: Optional[int] = None) -> None:
-        await ctr_register_click(self.db, query, document_id, user_id, position, session_id, dwell_time)
+                             session_id: Optional[str] = None, dwell_time: Optional[int] = None) -> Dict[str, int]:
+        return await ctr_register_click(self.db, query, document_id, user_id, position, session_id, dwell_time)
+
+    async def register_clicks(self, clicks: List[ClickEvent]) -> Dict[str, int]:
+        return await ctr_register_clicks(self.db, clicks)
+
+    async def register_impressions(self, query: str, user_id: int, document_ids: List[str], session_id: Optional[str] = None) -> Dict[str, int]:
+        return await ctr_register_impressions(self.db, query, user_id, document_ids, session_id)
 
-    async def register_impressions(self, query: str, user_id: int, document_ids: List[str], session_id: Optional[str] = None) -> None:
-        await ctr_register_impressions(self.db, query, user_id, document_ids, session_id)
+    async def register_events(self, clicks: List[ClickEvent], impressions: List[ImpressionsEvent]) -> Dict[str, int]:
+        return await ctr_register_events(self.db, clicks, impressions)
 
     async def get_filter_options(
         self,
@@ -85,6 +174,12 @@ class AsyncSearchEngine:
         filters: Optional[Dict] = None,
         search_field: str = "all",
     ) -> Dict[str, Any]:
+        key = facet_key(query, filters, search_field)
+        cached = facet_cache.get(key)
+        if cached is not None:
+            return cached
         body = build_aggregations_query(query=query, filters=filters, search_field=search_field)
         response = await self.client.search(index=self.index_name, body=body, request_timeout=10)
-        return parse_aggregations_response(response)
+        options = parse_aggregations_response(response)
+        facet_cache.set(key, options)
+        return options
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from opensearchpy import AsyncOpenSearch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.query_fingerprint import query_fingerprint
+from backend.app.services.async_search_engine import AsyncSearchEngine
+from backend.app.services.ctr import CandidateCTR
+from backend.app.services.search_cache import candidate_key
+
+
+class BatchSearchEngine(AsyncSearchEngine):
+    """Search engine whose lookups are shared across the specs of one batch.
+
+    Candidate sets, CTR rows and user profiles are fetched at most once per
+    batch, and all database work is serialized because a single
+    ``AsyncSession`` must not be used concurrently.
+    """
+
+    def __init__(self, db: AsyncSession, client: AsyncOpenSearch):
+        super().__init__(db, client)
+        self._db_lock = asyncio.Lock()
+        self._shared: Dict[Hashable, asyncio.Task] = {}
+
+    async def _once(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._shared.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._shared[key] = task
+        try:
+            return await task
+        except BaseException:
+            # Evict the failure so a later spec in the batch retries instead of re-raising it.
+            if self._shared.get(key) is task:
+                del self._shared[key]
+            raise
+
+    async def _locked(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._db_lock:
+            return await factory()
+
+    async def fetch_candidates(self, query: str, filters: Optional[Dict], search_field: str, sort_by: str,
+                               size: int, exact_total: bool = False) -> Dict[str, Any]:
+        parent = super().fetch_candidates
+        key = ("candidates", candidate_key(query, filters, search_field, sort_by, exact_total), size)
+        return await self._once(key, lambda: parent(query, filters, search_field, sort_by, size, exact_total))
+
+    async def _get_ctr_data(self, query: str, document_ids: List[str]) -> Dict[str, CandidateCTR]:
+        parent = super()._get_ctr_data
+        key = ("ctr", query_fingerprint(query), tuple(document_ids))
+        return await self._once(key, lambda: self._locked(lambda: parent(query, document_ids)))
+
+    async def _get_user_profile(self, user_id: int) -> Optional[Dict]:
+        parent = super()._get_user_profile
+        return await self._once(("user", user_id), lambda: self._locked(lambda: parent(user_id)))
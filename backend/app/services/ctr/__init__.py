@@ -1,15 +1,23 @@
 
+from .ctr_decay import check_half_life, load_ctr_half_life
 from .ctr_exceptions import CTRServiceError, DatabaseConnectionError, CTRDataError
-from .ctr_queries import get_batch_ctr_data, get_aggregated_ctr_data, get_total_stats
-from .ctr_registration import register_click, register_impressions
+from .ctr_queries import CandidateCTR, get_candidate_ctr_data, get_total_stats
+from .ctr_registration import register_click, register_clicks, register_events, register_impressions
+from .ctr_rollup import apply_ctr_half_life, run_ctr_maintenance
 
 __all__ = [
     "CTRServiceError",
     "DatabaseConnectionError",
     "CTRDataError",
-    "get_batch_ctr_data",
-    "get_aggregated_ctr_data",
+    "apply_ctr_half_life",
+    "check_half_life",
+    "load_ctr_half_life",
+    "get_candidate_ctr_data",
+    "CandidateCTR",
     "get_total_stats",
     "register_click",
+    "register_clicks",
+    "register_events",
     "register_impressions",
+    "run_ctr_maintenance",
 ]
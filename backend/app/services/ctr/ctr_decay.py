@@ -0,0 +1,68 @@
+
+import logging
+import math
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.exceptions import HalfLifeOverrideError
+from backend.app.services.settings import settings_service
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+# Expects a preceding "WITH event AS (...)" yielding query_fp, doc_key, ts, clicks, impressions;
+# it can also run as a data-modifying CTE of a statement that returns something else.
+# Stored counters are as of updated_at; both sides are rescaled to the later timestamp.
+DECAYED_UPSERT_SQL = """
+    INSERT INTO ctr_decayed AS k (query_fp, doc_key, clicks, impressions, updated_at)
+    SELECT query_fp, doc_key, clicks, impressions, ts FROM event
+    ON CONFLICT (query_fp, doc_key) DO UPDATE SET
+        clicks = k.clicks * ctr_decay_factor(:decay_rate, k.updated_at, EXCLUDED.updated_at)
+               + EXCLUDED.clicks * ctr_decay_factor(:decay_rate, EXCLUDED.updated_at, k.updated_at),
+        impressions = k.impressions * ctr_decay_factor(:decay_rate, k.updated_at, EXCLUDED.updated_at)
+                    + EXCLUDED.impressions * ctr_decay_factor(:decay_rate, EXCLUDED.updated_at, k.updated_at),
+        updated_at = GREATEST(k.updated_at, EXCLUDED.updated_at)
+"""
+
+
+def decay_rate(half_life_days: Optional[float] = None) -> float:
+    if half_life_days is None:
+        half_life_days = settings_service.get_weights().ctr_half_life_days
+    if half_life_days <= 0:
+        return 0.0
+    return math.log(2) / (half_life_days * SECONDS_PER_DAY)
+
+
+def check_half_life(weights: Optional[Dict[str, Any]]) -> None:
+    # Stored counters decay at one global rate, so a different per-request half-life could not be honoured.
+    if not weights or "ctr_half_life_days" not in weights:
+        return
+    half_life_days = settings_service.get_weights().ctr_half_life_days
+    if weights["ctr_half_life_days"] != half_life_days:
+        raise HalfLifeOverrideError(weights["ctr_half_life_days"], half_life_days)
+
+
+async def stored_half_life(db: AsyncSession) -> Optional[float]:
+    result = await db.execute(text("SELECT half_life_days FROM ctr_decay_state"))
+    return result.scalar()
+
+
+async def load_ctr_half_life(db: AsyncSession) -> Optional[float]:
+    # Workers adopt the half-life the stored counters were built with; only an explicit change rebuilds them.
+    half_life_days = await stored_half_life(db)
+    if half_life_days is not None and half_life_days != settings_service.get_weights().ctr_half_life_days:
+        logger.info(f"Using stored CTR half-life of {half_life_days} days")
+        settings_service.set_ctr_half_life(half_life_days)
+    return half_life_days
+
+
+async def sync_ctr_decay(db: AsyncSession) -> Optional[int]:
+    half_life_days = settings_service.get_weights().ctr_half_life_days
+    if await stored_half_life(db) == half_life_days:
+        return None
+    logger.info(f"Rebuilding decayed CTR counters for half-life {half_life_days} days")
+    result = await db.execute(text("SELECT rebuild_ctr_decayed(:half_life_days)"), {"half_life_days": half_life_days})
+    return int(result.scalar() or 0)
@@ -3,42 +3,60 @@ import logging
 from typing import Dict, List, Tuple
 
 from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.core.query_fingerprint import query_fingerprint
+from backend.app.services.event_counters import event_counters
+
+from .ctr_decay import decay_rate
 from .ctr_exceptions import CTRServiceError, DatabaseConnectionError, CTRDataError
 
 logger = logging.getLogger(__name__)
 
+CandidateCTR = Tuple[int, int, int, int, float, float]
+
+CANDIDATE_CTR_SQL = text("""
+    SELECT d.document_id,
+           COALESCE(SUM(s.clicks) FILTER (WHERE s.query_fp = :query_fp), 0) as query_clicks,
+           COALESCE(SUM(s.impressions) FILTER (WHERE s.query_fp = :query_fp), 0) as query_impressions,
+           COALESCE(SUM(s.clicks), 0) as clicks,
+           COALESCE(SUM(s.impressions), 0) as impressions,
+           COALESCE(MAX(k.clicks * ctr_decay_factor(:decay_rate, k.updated_at, LOCALTIMESTAMP)), 0) as decayed_clicks,
+           COALESCE(MAX(k.impressions * ctr_decay_factor(:decay_rate, k.updated_at, LOCALTIMESTAMP)), 0)
+               as decayed_impressions
+    FROM documents d
+    LEFT JOIN ctr_stats s ON s.doc_key = d.doc_key
+    LEFT JOIN ctr_decayed k ON k.doc_key = d.doc_key AND k.query_fp = :query_fp
+    WHERE d.document_id = ANY(:doc_ids)
+    GROUP BY d.document_id
+    HAVING COUNT(s.doc_key) > 0 OR COUNT(k.doc_key) > 0
+""")
+
+
+async def get_candidate_ctr_data(
+    db: AsyncSession, query: str, document_ids: List[str]
+) -> Dict[str, CandidateCTR]:
+    ctr_data: Dict[str, CandidateCTR] = {}
 
-async def get_batch_ctr_data(
-    db: AsyncSession, query: str
-) -> Dict[str, Tuple[int, int]]:
-    ctr_data: Dict[str, Tuple[int, int]] = {}
+    if not document_ids:
+        return ctr_data
 
     try:
         result = await db.execute(
-            text("""
-                SELECT document_id,
-                       COALESCE(SUM(clicks), 0) as clicks,
-                       COALESCE(SUM(impressions), 0) as impressions
-                FROM ctr_stats
-                WHERE query_text = :query
-                GROUP BY document_id
-            """),
-            {"query": query}
+            CANDIDATE_CTR_SQL,
+            {"query_fp": query_fingerprint(query), "doc_ids": document_ids, "decay_rate": decay_rate()}
         )
         for row in result.fetchall():
-            ctr_data[row[0]] = (int(row[1]), int(row[2]))
+            ctr_data[row[0]] = (
+                int(row[1]), int(row[2]), int(row[3]), int(row[4]), float(row[5]), float(row[6])
+            )
     except OperationalError as e:
-        logger.error(f"Database connection error while fetching CTR data for query '{query}': {e}")
+        logger.error(f"Database connection error while fetching candidate CTR data for query '{query}': {e}")
         raise DatabaseConnectionError(f"Failed to connect to database: {e}") from e
-    except IntegrityError as e:
-        logger.error(f"Data integrity error for query '{query}': {e}")
-        raise CTRDataError(f"Data integrity violation: {e}") from e
     except SQLAlchemyError as e:
-        logger.error(f"Database error while fetching CTR data for query '{query}': {e}")
-        raise CTRDataError(f"Failed to fetch CTR data: {e}") from e
+        logger.error(f"Database error while fetching candidate CTR data for query '{query}': {e}")
+        raise CTRDataError(f"Failed to fetch candidate CTR data: {e}") from e
     except ValueError as e:
         logger.error(f"Invalid CTR data format for query '{query}': {e}")
         raise CTRDataError(f"Invalid CTR data format: {e}") from e
@@ -46,53 +64,15 @@ async def get_batch_ctr_data(
     return ctr_data
 
 
-async def get_aggregated_ctr_data(
-    db: AsyncSession, document_ids: List[str]
-) -> Dict[str, Tuple[int, int]]:
-    ctr_data: Dict[str, Tuple[int, int]] = {}
-
-    if not document_ids:
-        return ctr_data
-
-    try:
-        result = await db.execute(
-            text("""
-                SELECT document_id,
-                       COALESCE(SUM(clicks), 0) as clicks,
-                       COALESCE(SUM(impressions), 0) as impressions
-                FROM ctr_stats
-                WHERE document_id = ANY(:doc_ids)
-                GROUP BY document_id
-            """),
-            {"doc_ids": document_ids}
-        )
-        for row in result.fetchall():
-            ctr_data[row[0]] = (int(row[1]), int(row[2]))
-    except OperationalError as e:
-        logger.error(f"Database connection error while fetching aggregated CTR data: {e}")
-        raise DatabaseConnectionError(f"Failed to connect to database: {e}") from e
-    except SQLAlchemyError as e:
-        logger.error(f"Database error while fetching aggregated CTR data: {e}")
-        raise CTRDataError(f"Failed to fetch aggregated CTR data: {e}") from e
-
-    return ctr_data
-
-
 async def get_total_stats(db: AsyncSession) -> Dict[str, int]:
     try:
-        result = await db.execute(
-            text("SELECT COUNT(*) FROM impressions")
-        )
-        total_impressions = result.scalar() or 0
-
-        result = await db.execute(
-            text("SELECT COUNT(*) FROM clicks")
-        )
-        total_clicks = result.scalar() or 0
+        if not event_counters.loaded:
+            await event_counters.load(db)
+        totals = event_counters.totals()
 
         return {
-            "total_impressions": total_impressions,
-            "total_clicks": total_clicks
+            "total_impressions": totals["impressions"],
+            "total_clicks": totals["clicks"]
         }
     except OperationalError as e:
         logger.error(f"Database connection error while getting total stats: {e}")
@@ -1,26 +1,82 @@
 
 import logging
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 
-from sqlalchemy import text, select
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.app.models import Click, SearchQuery
-from .ctr_exceptions import DatabaseConnectionError
+from backend.app.core.query_fingerprint import query_fingerprint
+from backend.app.schemas.search import ClickEvent, ImpressionsEvent
+from backend.app.services.event_counters import event_counters
+from .ctr_decay import DECAYED_UPSERT_SQL, decay_rate
+from .ctr_exceptions import CTRDataError, DatabaseConnectionError
 
 logger = logging.getLogger(__name__)
 
+CLICKS_SQL = text("""
+    WITH input AS (
+        SELECT *
+        FROM unnest(
+            CAST(:queries AS TEXT[]), CAST(:query_fps AS BIGINT[]), CAST(:doc_ids AS TEXT[]),
+            CAST(:user_ids AS INTEGER[]), CAST(:positions AS INTEGER[]), CAST(:sessions AS TEXT[]),
+            CAST(:dwell_times AS INTEGER[])
+        ) WITH ORDINALITY AS i(query_text, query_fp, document_id, user_id, position, session_id, dwell_time, n)
+    ), q AS (
+        INSERT INTO search_queries (user_id, query_text, query_fp, session_id)
+        SELECT DISTINCT ON (session_id, query_fp) user_id, query_text, query_fp, session_id
+        FROM input
+        ORDER BY session_id, query_fp, n
+        ON CONFLICT (session_id, query_fp) DO UPDATE
+            SET user_id = COALESCE(search_queries.user_id, EXCLUDED.user_id)
+        RETURNING query_id, session_id, query_fp
+    ), clicked AS (
+        INSERT INTO clicks (query_id, user_id, doc_key, query_text, query_fp, position, session_id, dwell_time)
+        SELECT q.query_id, i.user_id, d.doc_key, i.query_text, i.query_fp, i.position, i.session_id, i.dwell_time
+        FROM input i
+        JOIN q ON q.session_id = i.session_id AND q.query_fp = i.query_fp
+        JOIN documents d ON d.document_id = i.document_id
+        RETURNING query_fp, doc_key, clicked_at
+    ), event AS (
+        SELECT query_fp, doc_key, clicked_at AS ts, COUNT(*) AS clicks, 0 AS impressions
+        FROM clicked
+        GROUP BY query_fp, doc_key, clicked_at
+    ), decayed AS (
+""" + DECAYED_UPSERT_SQL + """
+    )
+    SELECT COUNT(*) FROM clicked
+""")
+
+IMPRESSIONS_SQL = text("""
+    WITH input AS (
+        SELECT *
+        FROM unnest(
+            CAST(:queries AS TEXT[]), CAST(:query_fps AS BIGINT[]), CAST(:doc_ids AS TEXT[]),
+            CAST(:user_ids AS INTEGER[]), CAST(:positions AS INTEGER[]), CAST(:sessions AS TEXT[])
+        ) AS i(query_text, query_fp, document_id, user_id, position, session_id)
+    ), shown AS (
+        INSERT INTO impressions (query_text, query_fp, doc_key, user_id, position, session_id)
+        SELECT i.query_text, i.query_fp, d.doc_key, i.user_id, i.position, i.session_id
+        FROM input i
+        JOIN documents d ON d.document_id = i.document_id
+        ON CONFLICT DO NOTHING
+        RETURNING query_fp, doc_key, shown_at
+    ), event AS (
+        SELECT query_fp, doc_key, shown_at AS ts, 0 AS clicks, COUNT(*) AS impressions
+        FROM shown
+        GROUP BY query_fp, doc_key, shown_at
+    ), decayed AS (
+""" + DECAYED_UPSERT_SQL + """
+    )
+    SELECT COUNT(*) FROM shown
+""")
 
-async def _refresh_ctr_stats(db: AsyncSession) -> None:
-    try:
-        await db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY ctr_stats"))
-        await db.commit()
-    except OperationalError as e:
-        logger.warning(f"Database connection error while refreshing CTR stats view: {e}")
-    except SQLAlchemyError as e:
-        logger.warning(f"Failed to refresh CTR stats view: {e}")
+
+def _stored(clicks: int = 0, impressions: int = 0, attempted: int = 0) -> Dict[str, int]:
+    # Events for documents missing from the documents table are dropped, as is a batch whose
+    # write fails. Impressions have no unique key, so repeated ones are stored, not dropped.
+    return {"clicks": clicks, "impressions": impressions, "dropped": attempted - clicks - impressions}
 
 
 async def register_click(
@@ -31,40 +87,61 @@ async def register_click(
     position: int,
     session_id: Optional[str] = None,
     dwell_time: Optional[int] = None
-) -> None:
-    if not session_id:
-        session_id = str(uuid.uuid4())
+) -> Dict[str, int]:
+    return await register_clicks(db, [ClickEvent(
+        query=query, document_id=document_id, user_id=user_id, position=position,
+        session_id=session_id, dwell_time=dwell_time
+    )])
+
+
+def _click_params(clicks: Sequence[ClickEvent]) -> dict:
+    return {
+        "queries": [click.query for click in clicks],
+        "query_fps": [query_fingerprint(click.query) for click in clicks],
+        "doc_ids": [click.document_id for click in clicks],
+        "user_ids": [click.user_id for click in clicks],
+        "positions": [click.position for click in clicks],
+        "sessions": [click.session_id or str(uuid.uuid4()) for click in clicks],
+        "dwell_times": [click.dwell_time for click in clicks],
+        "decay_rate": decay_rate(),
+    }
+
+
+def _impression_params(events: Sequence[ImpressionsEvent]) -> dict:
+    params = {"queries": [], "query_fps": [], "doc_ids": [], "user_ids": [], "positions": [], "sessions": []}
+    for event in events:
+        query_fp = query_fingerprint(event.query)
+        session_id = event.session_id or str(uuid.uuid4())
+        for position, doc_id in enumerate(event.document_ids, 1):
+            params["queries"].append(event.query)
+            params["query_fps"].append(query_fp)
+            params["doc_ids"].append(doc_id)
+            params["user_ids"].append(event.user_id)
+            params["positions"].append(position)
+            params["sessions"].append(session_id)
+    params["decay_rate"] = decay_rate()
+    return params
+
+
+async def register_clicks(db: AsyncSession, clicks: Sequence[ClickEvent]) -> Dict[str, int]:
+    if not clicks:
+        return _stored()
 
-    stmt = select(SearchQuery).where(
-        SearchQuery.query_text == query,
-        SearchQuery.session_id == session_id
-    )
-    result = await db.execute(stmt)
-    query_obj = result.scalar_one_or_none()
-
-    if not query_obj:
-        query_obj = SearchQuery(
-            user_id=user_id,
-            query_text=query,
-            session_id=session_id
-        )
-        db.add(query_obj)
-        await db.flush()
-
-    click = Click(
-        query_id=query_obj.query_id,
-        user_id=user_id,
-        document_id=document_id,
-        query_text=query,
-        position=position,
-        session_id=session_id,
-        dwell_time=dwell_time
-    )
-    db.add(click)
-
-    await db.commit()
+    try:
+        result = await db.execute(CLICKS_SQL, _click_params(clicks))
+        await db.commit()
+    except OperationalError as e:
+        logger.error(f"Database connection error while registering {len(clicks)} clicks: {e}")
+        await db.rollback()
+        raise DatabaseConnectionError(f"Failed to connect to database: {e}") from e
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while registering {len(clicks)} clicks: {e}")
+        await db.rollback()
+        return _stored(attempted=len(clicks))
 
-    await _refresh_ctr_stats(db)
+    clicked = int(result.scalar() or 0)
+    event_counters.record("clicks", clicked)
+    return _stored(clicks=clicked, attempted=len(clicks))
 
 
 async def register_impressions(
@@ -73,29 +150,16 @@ async def register_impressions(
     user_id: Optional[int],
     document_ids: List[str],
     session_id: Optional[str] = None
-) -> None:
-    if not session_id:
-        session_id = str(uuid.uuid4())
-
+) -> Dict[str, int]:
     if not document_ids:
-        return
+        return _stored()
 
     try:
-        values = [
-            {"query": query, "doc_id": doc_id, "user_id": user_id, "position": position, "session": session_id}
-            for position, doc_id in enumerate(document_ids, 1)
-        ]
-
-        await db.execute(
-            text("""
-                INSERT INTO impressions (query_text, document_id, user_id, position, session_id)
-                VALUES (:query, :doc_id, :user_id, :position, :session)
-                ON CONFLICT DO NOTHING
-            """),
-            values
-        )
+        params = _impression_params([ImpressionsEvent(
+            query=query, user_id=user_id, document_ids=document_ids, session_id=session_id
+        )])
+        result = await db.execute(IMPRESSIONS_SQL, params)
         await db.commit()
-        await _refresh_ctr_stats(db)
     except OperationalError as e:
         logger.error(f"Database connection error while registering impressions for query '{query}': {e}")
         await db.rollback()
@@ -103,6 +167,48 @@ async def register_impressions(
     except IntegrityError as e:
         logger.warning(f"Duplicate impression detected for query '{query}': {e}")
         await db.rollback()
+        return _stored(attempted=len(document_ids))
     except SQLAlchemyError as e:
         logger.error(f"Database error while registering impressions for query '{query}': {e}")
         await db.rollback()
+        return _stored(attempted=len(document_ids))
+
+    shown = int(result.scalar() or 0)
+    event_counters.record("impressions", shown)
+    return _stored(impressions=shown, attempted=len(document_ids))
+
+
+async def register_events(
+    db: AsyncSession,
+    clicks: Sequence[ClickEvent],
+    impressions: Sequence[ImpressionsEvent]
+) -> Dict[str, int]:
+    impressions = [event for event in impressions if event.document_ids]
+    if not clicks and not impressions:
+        return _stored()
+
+    shown = clicked = 0
+    try:
+        if impressions:
+            result = await db.execute(IMPRESSIONS_SQL, _impression_params(impressions))
+            shown = int(result.scalar() or 0)
+        if clicks:
+            result = await db.execute(CLICKS_SQL, _click_params(clicks))
+            clicked = int(result.scalar() or 0)
+        await db.commit()
+    except OperationalError as e:
+        logger.error(f"Database connection error while registering an event batch: {e}")
+        await db.rollback()
+        raise DatabaseConnectionError(f"Failed to connect to database: {e}") from e
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while registering an event batch: {e}")
+        await db.rollback()
+        raise CTRDataError(f"Failed to register events: {e}") from e
+
+    # Counted from the rows the inserts returned: events for unknown documents or repeated impressions are not stored.
+    if shown:
+        event_counters.record("impressions", shown)
+    if clicked:
+        event_counters.record("clicks", clicked)
+    attempted = len(clicks) + sum(len(event.document_ids) for event in impressions)
+    return _stored(clicks=clicked, impressions=shown, attempted=attempted)
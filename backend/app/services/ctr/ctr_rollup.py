@@ -0,0 +1,85 @@
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+from .ctr_decay import load_ctr_half_life, sync_ctr_decay
+from .ctr_exceptions import CTRDataError, DatabaseConnectionError
+
+logger = logging.getLogger(__name__)
+
+
+async def ensure_event_partitions(db: AsyncSession, months_ahead: int) -> None:
+    await db.execute(
+        text("SELECT ensure_event_partitions(CURRENT_DATE, :months)"),
+        {"months": months_ahead}
+    )
+
+
+async def rollup_ctr_daily(db: AsyncSession, lookback_days: int) -> int:
+    result = await db.execute(text("SELECT rollup_ctr_daily(:lookback)"), {"lookback": lookback_days})
+    return int(result.scalar() or 0)
+
+
+async def drop_expired_event_partitions(db: AsyncSession, retention_months: int) -> List[str]:
+    result = await db.execute(
+        text("SELECT drop_expired_event_partitions(:months)"),
+        {"months": retention_months}
+    )
+    return [row[0] for row in result.fetchall()]
+
+
+async def refresh_ctr_stats(db: AsyncSession) -> None:
+    await db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY ctr_stats"))
+
+
+async def apply_ctr_half_life(db: AsyncSession) -> Optional[int]:
+    # Recent events are rolled up first, because the rebuild reads ctr_daily only.
+    try:
+        await rollup_ctr_daily(db, settings.ctr_rollup_lookback_days)
+        rebuilt = await sync_ctr_decay(db)
+        await db.commit()
+    except OperationalError as e:
+        await db.rollback()
+        logger.error(f"Database connection error while rebuilding decayed CTR: {e}")
+        raise DatabaseConnectionError(f"Failed to connect to database: {e}") from e
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Decayed CTR rebuild failed: {e}")
+        raise CTRDataError(f"Decayed CTR rebuild failed: {e}") from e
+    return rebuilt
+
+
+async def run_ctr_maintenance(db: AsyncSession) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        await ensure_event_partitions(db, settings.event_partition_months_ahead)
+        rolled_up = await rollup_ctr_daily(db, settings.ctr_rollup_lookback_days)
+        half_life_days = await load_ctr_half_life(db)
+        await db.commit()
+        await refresh_ctr_stats(db)
+        await db.commit()
+        dropped = await drop_expired_event_partitions(db, settings.event_retention_months)
+        await db.commit()
+    except OperationalError as e:
+        await db.rollback()
+        logger.error(f"Database connection error during CTR maintenance: {e}")
+        raise DatabaseConnectionError(f"Failed to connect to database: {e}") from e
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"CTR maintenance failed: {e}")
+        raise CTRDataError(f"CTR maintenance failed: {e}") from e
+
+    summary = {
+        "rolled_up_rows": rolled_up,
+        "dropped_partitions": dropped,
+        "ctr_half_life_days": half_life_days,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    logger.info(f"CTR maintenance finished: {summary}")
+    return summary
@@ -0,0 +1,128 @@
+
+import logging
+import math
+import time
+from collections import Counter
+from threading import Lock
+from typing import Any, Dict, List
+
+from opensearchpy import AsyncOpenSearch
+from opensearchpy.helpers import async_bulk
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+from backend.app.core.documents import document_row
+from backend.app.core.exceptions import IngestBackpressureError
+
+logger = logging.getLogger(__name__)
+
+UPSERT_DOCUMENT_SQL = text("""
+    INSERT INTO documents (document_id, title, authors, document_type, year, subject, language)
+    VALUES (:document_id, :title, :authors, :document_type, :year, :subject, :language)
+    ON CONFLICT (document_id) DO UPDATE SET
+        title = EXCLUDED.title, authors = EXCLUDED.authors, document_type = EXCLUDED.document_type,
+        year = EXCLUDED.year, subject = EXCLUDED.subject, language = EXCLUDED.language
+""")
+
+ROW_COLUMNS = ("document_id", "title", "authors", "document_type", "year", "subject", "language")
+
+
+def _item_status(item: Dict[str, Any]) -> Dict[str, Any]:
+    return next(iter(item.values()))
+
+
+class DocumentIngestBuffer:
+
+    def __init__(self):
+        self._lock = Lock()
+        # Keyed by document_id: a record resubmitted before the flush replaces the queued version.
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._stats = Counter()
+        self._last_flush_ms = 0.0
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, docs: List[Dict[str, Any]]) -> int:
+        with self._lock:
+            incoming = {doc["document_id"] for doc in docs} - self._pending.keys()
+            if len(self._pending) + len(incoming) > settings.document_ingest_max_pending:
+                self._stats["throttled"] += len(docs)
+                raise IngestBackpressureError(len(self._pending), math.ceil(settings.document_ingest_flush_seconds))
+            for doc in docs:
+                self._pending[doc["document_id"]] = doc
+            self._stats["accepted"] += len(docs)
+            return len(self._pending)
+
+    def _take(self, size: int) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            ids = list(self._pending)[:size]
+            return {doc_id: self._pending.pop(doc_id) for doc_id in ids}
+
+    def _requeue(self, docs: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            for doc_id, doc in docs.items():
+                self._pending.setdefault(doc_id, doc)
+            self._stats["requeued"] += len(docs)
+
+    async def flush(self, client: AsyncOpenSearch, db: AsyncSession) -> int:
+        batch = self._take(settings.document_ingest_flush_size)
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        actions = [{"_index": settings.opensearch_index, "_id": doc_id, "_source": doc} for doc_id, doc in batch.items()]
+        try:
+            _, errors = await async_bulk(client, actions, raise_on_error=False)
+        except Exception:
+            self._requeue(batch)
+            raise
+
+        rejected = {}
+        for error in errors:
+            item = _item_status(error)
+            if item.get("status") == 429:
+                rejected[item["_id"]] = batch[item["_id"]]
+            else:
+                self._stats["failed"] += 1
+                logger.warning(f"Document {item.get('_id')} not indexed: {item.get('error')}")
+            batch.pop(item["_id"], None)
+        if rejected:
+            self._requeue(rejected)
+
+        rows = [dict(zip(ROW_COLUMNS, row)) for row in map(document_row, batch.values()) if row]
+        if rows:
+            try:
+                await db.execute(UPSERT_DOCUMENT_SQL, rows)
+                await db.commit()
+            except Exception as e:
+                # The index already has these records; the next loader sync fills the table in.
+                await db.rollback()
+                self._stats["db_failed"] += len(rows)
+                logger.warning(f"Document rows not stored: {type(e).__name__}: {e}")
+
+        if batch:
+            # One refresh per micro-batch instead of one per document. Search caches are left to expire
+            # by TTL, the same on every worker; only an index swap clears them.
+            await client.indices.refresh(index=settings.opensearch_index)
+        self._stats["indexed"] += len(batch)
+        self._stats["flushes"] += 1
+        self._last_flush_ms = (time.perf_counter() - started) * 1000
+        return len(batch)
+
+    async def drain(self, client: AsyncOpenSearch, db: AsyncSession) -> int:
+        flushed = 0
+        while self.pending():
+            before = self.pending()
+            flushed += await self.flush(client, db)
+            if self.pending() >= before:
+                break
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"pending": len(self._pending), **self._stats, "last_flush_ms": round(self._last_flush_ms, 1)}
+
+
+document_ingest = DocumentIngestBuffer()
@@ -0,0 +1,120 @@
+
+import logging
+from threading import Lock
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+COUNTER_TABLES = ("impressions", "clicks")
+
+ESTIMATE_SQL = text("""
+    SELECT p.relname, COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+    FROM pg_class p
+    JOIN pg_inherits i ON i.inhparent = p.oid
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE p.relname IN ('impressions', 'clicks')
+    GROUP BY p.relname
+""")
+
+
+class EventCounters:
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stored: Dict[str, int] = {name: 0 for name in COUNTER_TABLES}
+        self._pending: Dict[str, int] = {name: 0 for name in COUNTER_TABLES}
+        self._in_flight: Dict[str, int] = {name: 0 for name in COUNTER_TABLES}
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        with self._lock:
+            return self._loaded
+
+    @property
+    def dirty(self) -> bool:
+        with self._lock:
+            return any(self._pending.values())
+
+    def record(self, name: str, count: int = 1) -> None:
+        with self._lock:
+            self._pending[name] += count
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                name: self._stored[name] + self._in_flight[name] + self._pending[name] for name in COUNTER_TABLES
+            }
+
+    async def _read_stored(self, db: AsyncSession) -> Dict[str, int]:
+        result = await db.execute(text("SELECT name, value FROM event_counters"))
+        return {name: int(value) for name, value in result.fetchall()}
+
+    def _set_stored(self, values: Dict[str, int]) -> None:
+        with self._lock:
+            self._stored.update(values)
+            self._in_flight = {name: 0 for name in COUNTER_TABLES}
+            self._loaded = True
+
+    async def load(self, db: AsyncSession) -> None:
+        self._set_stored(await self._read_stored(db))
+
+    async def flush(self, db: AsyncSession) -> None:
+        with self._lock:
+            deltas, self._pending = self._pending, {name: 0 for name in COUNTER_TABLES}
+            self._in_flight = dict(deltas)
+        try:
+            for name, delta in deltas.items():
+                if delta:
+                    await db.execute(
+                        text("UPDATE event_counters SET value = value + :delta WHERE name = :name"),
+                        {"name": name, "delta": delta}
+                    )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            with self._lock:
+                for name, delta in deltas.items():
+                    self._pending[name] += delta
+                self._in_flight = {name: 0 for name in COUNTER_TABLES}
+            raise
+        await self.load(db)
+
+    async def reconcile(self, db: AsyncSession, exact: bool = False) -> Dict[str, int]:
+        await self.flush(db)
+        if exact:
+            counts = {}
+            for name in COUNTER_TABLES:
+                result = await db.execute(text(f"SELECT COUNT(*) FROM {name}"))
+                counts[name] = int(result.scalar() or 0)
+        else:
+            result = await db.execute(ESTIMATE_SQL)
+            counts = {name: int(value) for name, value in result.fetchall()}
+
+        stored = self.totals()
+        corrected = {}
+        for name, count in counts.items():
+            # Estimates are 0 before the first ANALYZE and lag autovacuum, so they may only raise a counter.
+            if not exact and count <= stored[name]:
+                continue
+            drift = abs(count - stored[name]) / max(count, stored[name], 1)
+            if exact or drift > settings.counter_drift_tolerance:
+                corrected[name] = count
+        for name, count in corrected.items():
+            await db.execute(
+                text("UPDATE event_counters SET value = :value, reconciled_at = LOCALTIMESTAMP WHERE name = :name"),
+                {"name": name, "value": count}
+            )
+        await db.commit()
+        if corrected:
+            logger.info(f"Event counters reconciled ({'exact' if exact else 'estimate'}): {stored} -> {corrected}")
+        await self.load(db)
+        return self.totals()
+
+
+event_counters = EventCounters()
@@ -0,0 +1,105 @@
+
+import json
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from backend.app.config import settings
+from backend.app.core.exceptions import EventBatchTooLargeError, InvalidEventBatchError
+from backend.app.schemas.search import ClickEventItem, ImpressionsEventItem, InteractionEvent
+
+GZIP_MAGIC = b"\x1f\x8b"
+MAX_REPORTED_ERRORS = 10
+
+_event_adapter = TypeAdapter(InteractionEvent)
+
+
+@dataclass
+class EventBatch:
+    clicks: List[ClickEventItem] = field(default_factory=list)
+    impressions: List[ImpressionsEventItem] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    rejected: int = 0
+
+    @property
+    def accepted(self) -> int:
+        return len(self.clicks) + len(self.impressions)
+
+    def reject(self, index: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "message": message})
+
+
+def decompress(body: bytes, content_encoding: Optional[str] = None) -> bytes:
+    # sendBeacon cannot set Content-Encoding, so gzip is also detected by its magic bytes.
+    if (content_encoding or "").strip().lower() != "gzip" and not body.startswith(GZIP_MAGIC):
+        if len(body) > settings.events_max_body_bytes:
+            raise EventBatchTooLargeError(f"Event batch exceeds {settings.events_max_body_bytes} bytes")
+        return body
+
+    decompressor = zlib.decompressobj(wbits=31)
+    try:
+        raw = decompressor.decompress(body, settings.events_max_body_bytes + 1)
+    except zlib.error as e:
+        raise InvalidEventBatchError(f"Invalid gzip body: {e}") from e
+    if len(raw) > settings.events_max_body_bytes or decompressor.unconsumed_tail:
+        raise EventBatchTooLargeError(f"Decompressed event batch exceeds {settings.events_max_body_bytes} bytes")
+    if not decompressor.eof:
+        raise InvalidEventBatchError("Truncated gzip body")
+    return raw
+
+
+def _split(text: str) -> List[Any]:
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        try:
+            items = json.loads(stripped)
+        except json.JSONDecodeError as e:
+            raise InvalidEventBatchError(f"Invalid JSON array: {e}") from e
+        if not isinstance(items, list):
+            raise InvalidEventBatchError("Expected a JSON array of events")
+        return items
+
+    items = []
+    for line in stripped.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            items.append(e)
+    return items
+
+
+def parse_events(body: bytes, content_encoding: Optional[str] = None) -> EventBatch:
+    try:
+        text = decompress(body, content_encoding).decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise InvalidEventBatchError("Event batch is not valid UTF-8") from e
+
+    items = _split(text)
+    if not items:
+        raise InvalidEventBatchError("Event batch is empty")
+    if len(items) > settings.events_max_batch:
+        raise EventBatchTooLargeError(f"At most {settings.events_max_batch} events per batch")
+
+    batch = EventBatch()
+    for index, item in enumerate(items):
+        if isinstance(item, json.JSONDecodeError):
+            batch.reject(index, f"Invalid JSON: {item.msg}")
+            continue
+        try:
+            event = _event_adapter.validate_python(item)
+        except ValidationError as e:
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            batch.reject(index, f"{location}: {error['msg']}" if location else error["msg"])
+            continue
+        if isinstance(event, ClickEventItem):
+            batch.clicks.append(event)
+        else:
+            batch.impressions.append(event)
+    return batch
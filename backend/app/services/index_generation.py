@@ -0,0 +1,41 @@
+
+import logging
+from threading import Lock
+from typing import Optional
+
+from opensearchpy import AsyncOpenSearch, NotFoundError
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IndexGeneration:
+
+    def __init__(self):
+        self._lock = Lock()
+        self._generation: Optional[str] = None
+
+    def get(self) -> Optional[str]:
+        with self._lock:
+            return self._generation
+
+    async def resolve(self, client: AsyncOpenSearch) -> str:
+        try:
+            aliases = await client.indices.get_alias(name=settings.opensearch_index)
+        except NotFoundError:
+            # Not an alias (yet): a concrete index is its own generation.
+            return settings.opensearch_index
+        return max(aliases)
+
+    async def refresh(self, client: AsyncOpenSearch) -> bool:
+        generation = await self.resolve(client)
+        with self._lock:
+            previous, self._generation = self._generation, generation
+        if previous is None or previous == generation:
+            return False
+        logger.info(f"Index alias '{settings.opensearch_index}' swapped from {previous} to {generation}")
+        return True
+
+
+index_generation = IndexGeneration()
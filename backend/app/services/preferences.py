@@ -95,8 +95,13 @@ class PreferencesService:
                     cls._instance._topic_scores = deepcopy(DEFAULT_TOPIC_SCORES)
                     cls._instance._specialization_topics = deepcopy(DEFAULT_SPECIALIZATION_TOPICS)
                     cls._instance._state_lock = Lock()
+                    cls._instance._version = 0
         return cls._instance
 
+    def get_version(self) -> int:
+        with self._state_lock:
+            return self._version
+
     def get_role_type_matrix(self) -> Dict[str, Dict[str, float]]:
         with self._state_lock:
             return deepcopy(self._role_type_matrix)
@@ -104,6 +109,7 @@ class PreferencesService:
     def set_role_type_matrix(self, matrix: Dict[str, Dict[str, float]]) -> None:
         with self._state_lock:
             self._role_type_matrix = deepcopy(matrix)
+            self._version += 1
 
     def get_topic_scores(self) -> Dict[str, float]:
         with self._state_lock:
@@ -112,6 +118,7 @@ class PreferencesService:
     def set_topic_scores(self, scores: Dict[str, float]) -> None:
         with self._state_lock:
             self._topic_scores = deepcopy(scores)
+            self._version += 1
 
     def get_specialization_topics(self) -> Dict[str, List[str]]:
         with self._state_lock:
@@ -120,6 +127,7 @@ class PreferencesService:
     def set_specialization_topics(self, topics: Dict[str, List[str]]) -> None:
         with self._state_lock:
             self._specialization_topics = deepcopy(topics)
+            self._version += 1
 
     def get_keywords_for_specialization(self, specialization: str) -> List[str]:
         with self._state_lock:
@@ -130,6 +138,7 @@ class PreferencesService:
             self._role_type_matrix = deepcopy(DEFAULT_ROLE_TYPE_MATRIX)
             self._topic_scores = deepcopy(DEFAULT_TOPIC_SCORES)
             self._specialization_topics = deepcopy(DEFAULT_SPECIALIZATION_TOPICS)
+            self._version += 1
 
     def get_f_type(self, doc_type: str, user_role: str) -> float:
         with self._state_lock:
@@ -0,0 +1,75 @@
+
+import logging
+from typing import Any, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.config import settings
+from backend.app.core.cache import TTLCache
+from backend.app.core.types import UserProfileDict
+
+logger = logging.getLogger(__name__)
+
+profile_cache = TTLCache("profiles", settings.profile_cache_size, settings.profile_cache_ttl_seconds)
+
+
+def user_to_profile(user: Any) -> UserProfileDict:
+    return {"user_id": user.user_id, "username": user.username, "role": user.role,
+            "specialization": user.specialization, "faculty": getattr(user, 'faculty', None),
+            "course": user.course, "interests": list(user.interests or [])}
+
+
+def get_cached_profile(user_id: int) -> Optional[UserProfileDict]:
+    profile = profile_cache.get(user_id)
+    if profile is None:
+        return None
+    return {**profile, "interests": list(profile["interests"])}
+
+
+def store_profile(profile: UserProfileDict) -> None:
+    profile_cache.set(profile["user_id"], {**profile, "interests": list(profile["interests"])})
+
+
+def invalidate_profile(user_id: int) -> None:
+    profile_cache.delete(user_id)
+
+
+async def publish_profile_change(db: AsyncSession, user_id: int) -> None:
+    if not settings.profile_notify_channel:
+        return
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": settings.profile_notify_channel, "payload": str(user_id)}
+    )
+
+
+class ProfileChangeListener:
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._conn: Optional[asyncpg.Connection] = None
+
+    async def start(self) -> None:
+        self._conn = await asyncpg.connect(
+            host=settings.postgres_host, port=settings.postgres_port, user=settings.postgres_user,
+            password=settings.postgres_password, database=settings.postgres_db,
+        )
+        await self._conn.add_listener(self.channel, self._on_notify)
+        logger.info(f"Listening for profile changes on '{self.channel}'")
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            invalidate_profile(int(payload))
+        except ValueError:
+            logger.warning(f"Ignoring malformed profile notification: {payload!r}")
+
+    async def stop(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            await self._conn.remove_listener(self.channel, self._on_notify)
+        finally:
+            await self._conn.close()
+            self._conn = None
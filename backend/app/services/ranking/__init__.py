@@ -3,6 +3,7 @@ from .document_helpers import get_field, get_list_field, join_list_field, fix_ca
 from .personalization import calculate_f_type_for_doc, calculate_f_topic_for_doc
 from .score_calculator import bayesian_smoothed_ctr, calculate_scores
 from .ranking_formula import build_result_dict, apply_ranking_formula
+from .overlap import ranking_overlap, pairwise_overlap, spearman_on_intersection
 
 __all__ = [
     "get_field",
@@ -16,4 +17,7 @@ __all__ = [
     "calculate_scores",
     "build_result_dict",
     "apply_ranking_formula",
+    "ranking_overlap",
+    "pairwise_overlap",
+    "spearman_on_intersection",
 ]
@@ -0,0 +1,34 @@
+
+from typing import Dict, List, Optional, Sequence
+
+
+def spearman_on_intersection(left: Sequence[str], right: Sequence[str]) -> Optional[float]:
+    pos_right = {doc_id: idx for idx, doc_id in enumerate(right, 1)}
+    pairs = [(idx, pos_right[doc_id]) for idx, doc_id in enumerate(left, 1) if doc_id in pos_right]
+    if len(pairs) < 2:
+        return None
+    n = len(pairs)
+    sum_d2 = sum((a - b) ** 2 for a, b in pairs)
+    return round(1 - (6 * sum_d2) / (n * (n * n - 1)), 4)
+
+
+def ranking_overlap(left: Sequence[str], right: Sequence[str]) -> Dict:
+    left_ids, right_ids = set(left), set(right)
+    common = len(left_ids & right_ids)
+    union = len(left_ids | right_ids)
+    return {
+        "common": common,
+        "unique_left": len(left_ids) - common,
+        "unique_right": len(right_ids) - common,
+        "jaccard": round(common / union, 4) if union else 0.0,
+        "spearman": spearman_on_intersection(left, right),
+    }
+
+
+def pairwise_overlap(rankings: Dict[str, List[str]]) -> List[Dict]:
+    names = list(rankings)
+    pairs = []
+    for i, left in enumerate(names):
+        for right in names[i + 1:]:
+            pairs.append({"left": left, "right": right, **ranking_overlap(rankings[left], rankings[right])})
+    return pairs
@@ -19,7 +19,7 @@ def calculate_scores(
     bm25_score: float,
     doc: Dict,
     document_id: str,
-    ctr_data: Dict[str, Tuple[int, int]],
+    ctr_data: Dict[str, Tuple[float, ...]],
     user_profile: Optional[UserProfileDict],
     enable_personalization: bool,
     weights
@@ -35,8 +35,12 @@ def calculate_scores(
         f_topic_score = calculate_f_topic_for_doc(doc, user_profile)
         f_user = weights.alpha_type * f_type_score + weights.alpha_topic * f_topic_score
 
-    doc_clicks, doc_impressions = ctr_data.get(document_id, (0, 0))
-    smoothed_ctr = bayesian_smoothed_ctr(doc_clicks, doc_impressions, weights)
+    doc_clicks, doc_impressions, *decayed = ctr_data.get(document_id, (0, 0))
+    decayed_clicks, decayed_impressions = decayed or (doc_clicks, doc_impressions)
+    if weights.ctr_half_life_days > 0:
+        smoothed_ctr = bayesian_smoothed_ctr(decayed_clicks, decayed_impressions, weights)
+    else:
+        smoothed_ctr = bayesian_smoothed_ctr(doc_clicks, doc_impressions, weights)
     ctr_factor = math.log(1 + smoothed_ctr * 10) if smoothed_ctr > 0 else 0.0
 
     user_contrib = weights.w_user * f_user
@@ -58,6 +62,8 @@ def calculate_scores(
         "final_score": round(final_score, 3),
         "clicks": doc_clicks,
         "impressions": doc_impressions,
+        "decayed_clicks": round(decayed_clicks, 2),
+        "decayed_impressions": round(decayed_impressions, 2),
         "weights": {
             "w_user": weights.w_user,
             "alpha_type": weights.alpha_type,
@@ -65,5 +71,6 @@ def calculate_scores(
             "beta_ctr": weights.beta_ctr,
             "ctr_alpha_prior": weights.ctr_alpha_prior,
             "ctr_beta_prior": weights.ctr_beta_prior,
+            "ctr_half_life_days": weights.ctr_half_life_days,
         },
     }
@@ -0,0 +1,71 @@
+
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from backend.app.config import settings
+from backend.app.core.cache import TTLCache, make_cache_key
+from backend.app.core.query_fingerprint import query_fingerprint
+from backend.app.services.index_generation import index_generation
+from backend.app.services.profile_cache import profile_cache
+
+candidate_cache = TTLCache("candidates", settings.candidate_cache_size, settings.search_cache_ttl_seconds)
+facet_cache = TTLCache("facets", settings.facet_cache_size, settings.search_cache_ttl_seconds)
+page_cache = TTLCache("pages", settings.page_cache_size, settings.page_cache_staleness_seconds)
+
+ANONYMOUS_COHORT = "anonymous"
+
+
+def candidate_key(query: str, filters: Optional[Dict], search_field: str, sort_by: str,
+                  exact_total: bool = False) -> str:
+    return make_cache_key(index_generation.get(), query_fingerprint(query), filters or {}, search_field, sort_by,
+                          exact_total)
+
+
+def facet_key(query: Optional[str], filters: Optional[Dict], search_field: str) -> str:
+    return make_cache_key(index_generation.get(), query_fingerprint(query) if query else None, filters or {}, search_field)
+
+
+def cohort_fingerprint(user_profile: Optional[Dict]) -> str:
+    if not user_profile:
+        return ANONYMOUS_COHORT
+    interests = sorted(i.lower() for i in (user_profile.get("interests") or []) if i)
+    payload = make_cache_key(user_profile.get("role") or "", user_profile.get("specialization") or "", interests)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def page_key(candidates: str, cohort: str, weights_version: int, preferences_version: int,
+             weights_override: Optional[Dict], page: int, per_page: int, window: int) -> str:
+    return make_cache_key(candidates, cohort, weights_version, preferences_version,
+                          weights_override or {}, page, per_page, window)
+
+
+def get_cached_candidates(key: str, size: int) -> Optional[Dict[str, Any]]:
+    entry = candidate_cache.get(key)
+    if entry is None:
+        return None
+    fetched_size, response = entry
+    hits = response["hits"]["hits"]
+    if fetched_size < size and len(hits) >= fetched_size:
+        return None
+    return {"hits": {"total": response["hits"]["total"], "hits": hits[:size]}}
+
+
+def store_candidates(key: str, size: int, response: Dict[str, Any]) -> None:
+    entry = candidate_cache.peek(key)
+    if entry is not None and entry[0] >= size:
+        return
+    candidate_cache.set(key, (size, response))
+
+
+def all_caches() -> List[TTLCache]:
+    return [candidate_cache, facet_cache, page_cache, profile_cache]
+
+
+def clear_search_caches() -> None:
+    for cache in all_caches():
+        cache.clear()
+
+
+def clear_index_caches() -> None:
+    for cache in (candidate_cache, facet_cache, page_cache):
+        cache.clear()
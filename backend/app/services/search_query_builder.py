@@ -1,5 +1,7 @@
 from typing import Dict, List, Any, Optional, Set
 
+from backend.app.core.documents import ELIB_DATABASE_KEY, filter_key
+
 
 SEARCH_FIELDS = [
     "title^3",
@@ -23,8 +25,6 @@ FIELD_SPECIFIC_SEARCH: Dict[str, List[str]] = {
 
 HIGHLIGHT_FIELDS = ["title", "authors", "subjects", "collection"]
 
-ELIB_DATABASE_KEY = "ELIB"
-
 FACET_EXCLUDED_KEYS: Dict[str, Set[str]] = {
     "collections": {"collection"},
     "knowledge_areas": {"knowledge_area"},
@@ -37,26 +37,37 @@ FACET_EXCLUDED_KEYS: Dict[str, Set[str]] = {
 }
 
 
+_TITLE_ASC = {"title_sort": {"order": "asc", "missing": "_last"}}
+
 SORT_BY_OS_CLAUSES: Dict[str, List[Dict[str, Any]]] = {
     "relevance": [],
     "year_desc": [{"year": {"order": "desc", "missing": "_last"}}, "_score"],
     "year_asc": [{"year": {"order": "asc", "missing": "_last"}}, "_score"],
-    "title_asc": [{"title.keyword": {"order": "asc", "missing": "_last"}}],
+    "title_asc": [_TITLE_ASC],
     "popularity_desc": [],
 }
 
+# Field sorts that can stop collecting once the page is full by skipping documents whose
+# primary sort value is no longer competitive (year sorts still score, so ties within a
+# year keep their relevance order). Counting every match would defeat the skipping, so
+# their totals are exact only up to the result window.
+EARLY_TERMINATING_SORTS = {"year_desc", "year_asc", "title_asc"}
+SORTED_TOTAL_HITS_THRESHOLD = 10000
+
 
 def build_search_query(
     query: str,
     filters: Optional[Dict] = None,
     search_field: str = "all",
     sort_by: str = "relevance",
+    exact_total: bool = False,
 ) -> Dict[str, Any]:
     must_clauses = [_build_multi_match_clause(query, search_field)]
     filter_clauses = _build_filter_clauses(filters) if filters else []
+    early_terminate = sort_by in EARLY_TERMINATING_SORTS and not exact_total
 
     body: Dict[str, Any] = {
-        "track_total_hits": True,
+        "track_total_hits": SORTED_TOTAL_HITS_THRESHOLD if early_terminate else True,
         "query": {
             "bool": {
                 "must": must_clauses,
@@ -73,6 +84,9 @@ def build_search_query(
     sort_clauses = SORT_BY_OS_CLAUSES.get(sort_by, [])
     if sort_clauses:
         body["sort"] = sort_clauses
+        if "_score" in sort_clauses:
+            # Field-sorted hits carry no score otherwise; the ranking step needs it.
+            body["track_scores"] = True
 
     return body
 
@@ -113,7 +127,7 @@ def _build_filter_clauses(filters: Dict) -> List[Dict[str, Any]]:
     clauses = []
 
     if filters.get("collection"):
-        clauses.append({"term": {"collection.keyword": filters["collection"]}})
+        clauses.append({"term": {"collection_key": filter_key(filters["collection"])}})
 
     if filters.get("language"):
         clauses.append({"term": {"language": filters["language"]}})
@@ -126,7 +140,7 @@ def _build_filter_clauses(filters: Dict) -> List[Dict[str, Any]]:
             clauses.append({"term": {"document_type": doc_types}})
 
     if filters.get("knowledge_area"):
-        clauses.append({"term": {"knowledge_area.keyword": filters["knowledge_area"]}})
+        clauses.append({"term": {"knowledge_area_key": filter_key(filters["knowledge_area"])}})
 
     if filters.get("source"):
         clauses.append({"term": {"source": filters["source"]}})
@@ -135,33 +149,18 @@ def _build_filter_clauses(filters: Dict) -> List[Dict[str, Any]]:
     if databases:
         if isinstance(databases, str):
             databases = [databases]
-        clauses.append(_build_database_clause(databases))
+        clauses.append({"terms": {"database_key": databases}})
 
     year_clause = _build_year_clause(filters.get("year_from"), filters.get("year_to"))
     if year_clause:
         clauses.append(year_clause)
 
-    if filters.get("has_pdf") is True:
-        clauses.append({"exists": {"field": "pdf_url"}})
-    elif filters.get("has_pdf") is False:
-        clauses.append({"bool": {"must_not": {"exists": {"field": "pdf_url"}}}})
+    if isinstance(filters.get("has_pdf"), bool):
+        clauses.append({"term": {"has_pdf": filters["has_pdf"]}})
 
     return clauses
 
 
-def _build_database_clause(databases: List[str]) -> Dict[str, Any]:
-    real_dbs = [d for d in databases if d and d != ELIB_DATABASE_KEY]
-    include_elib = ELIB_DATABASE_KEY in databases
-
-    should: List[Dict[str, Any]] = []
-    if real_dbs:
-        should.append({"terms": {"database.keyword": real_dbs}})
-    if include_elib:
-        should.append({"bool": {"must_not": {"exists": {"field": "database"}}}})
-
-    return {"bool": {"should": should, "minimum_should_match": 1}}
-
-
 def _build_year_clause(year_from: Optional[int], year_to: Optional[int]) -> Optional[Dict[str, Any]]:
     if year_from is None and year_to is None:
         return None
@@ -180,14 +179,14 @@ def _filters_without(filters: Optional[Dict], excluded_keys: Set[str]) -> Dict[s
 
 
 _FACET_BODIES: Dict[str, Dict[str, Any]] = {
-    "collections": {"terms": {"field": "collection.keyword", "size": 50}},
-    "knowledge_areas": {"terms": {"field": "knowledge_area.keyword", "size": 50}},
+    "collections": {"terms": {"field": "collection_key", "size": 50}},
+    "knowledge_areas": {"terms": {"field": "knowledge_area_key", "size": 50}},
     "document_types": {"terms": {"field": "document_type", "size": 30}},
     "languages": {"terms": {"field": "language", "size": 20}},
     "sources": {"terms": {"field": "source", "size": 10}},
-    "databases": {"terms": {"field": "database.keyword", "size": 20, "missing": ELIB_DATABASE_KEY}},
+    "databases": {"terms": {"field": "database_key", "size": 20}},
     "year_stats": {"stats": {"field": "year"}},
-    "has_pdf": {"filter": {"exists": {"field": "pdf_url"}}},
+    "has_pdf": {"filter": {"term": {"has_pdf": True}}},
 }
 
 
@@ -20,8 +20,13 @@ class SettingsService:
                     cls._instance._preset = WeightPreset.DEFAULT
                     cls._instance._custom_presets: Dict[str, RankingWeights] = {}
                     cls._instance._state_lock = Lock()
+                    cls._instance._version = 0
         return cls._instance
 
+    def get_version(self) -> int:
+        with self._state_lock:
+            return self._version
+
     def get_weights(self) -> RankingWeights:
         with self._state_lock:
             return self._weights.model_copy()
@@ -30,6 +35,12 @@ class SettingsService:
         with self._state_lock:
             self._weights = weights
             self._preset = None
+            self._version += 1
+
+    def set_ctr_half_life(self, half_life_days: float) -> None:
+        with self._state_lock:
+            self._weights = self._weights.model_copy(update={"ctr_half_life_days": half_life_days})
+            self._version += 1
 
     def get_preset(self) -> Optional[str]:
         with self._state_lock:
@@ -43,12 +54,14 @@ class SettingsService:
             if isinstance(preset, WeightPreset):
                 self._weights = WEIGHT_PRESETS[preset].model_copy()
                 self._preset = preset
+                self._version += 1
                 return self._weights.model_copy()
 
             try:
                 builtin = WeightPreset(preset)
                 self._weights = WEIGHT_PRESETS[builtin].model_copy()
                 self._preset = builtin
+                self._version += 1
                 return self._weights.model_copy()
             except ValueError:
                 pass
@@ -56,10 +69,23 @@ class SettingsService:
             if preset in self._custom_presets:
                 self._weights = self._custom_presets[preset].model_copy()
                 self._preset = preset
+                self._version += 1
                 return self._weights.model_copy()
 
             raise KeyError(preset)
 
+    def resolve_preset(self, preset: PresetIdentifier) -> RankingWeights:
+        if isinstance(preset, WeightPreset):
+            return WEIGHT_PRESETS[preset].model_copy()
+        try:
+            return WEIGHT_PRESETS[WeightPreset(preset)].model_copy()
+        except ValueError:
+            pass
+        with self._state_lock:
+            if preset in self._custom_presets:
+                return self._custom_presets[preset].model_copy()
+        raise KeyError(preset)
+
     def reset(self) -> RankingWeights:
         return self.apply_preset(WeightPreset.DEFAULT)
 
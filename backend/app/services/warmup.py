@@ -0,0 +1,100 @@
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from opensearchpy import AsyncOpenSearch, OpenSearchException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from backend.app.config import settings
+from backend.app.services.async_search_engine import AsyncSearchEngine
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PAGE_SIZE = 20
+
+
+async def get_top_queries(db: AsyncSession, limit: int) -> List[str]:
+    result = await db.execute(
+        text("""
+            SELECT MIN(query_text)
+            FROM search_queries
+            GROUP BY query_fp
+            ORDER BY COUNT(*) DESC
+            LIMIT :limit
+        """),
+        {"limit": limit}
+    )
+    return [row[0] for row in result.fetchall()]
+
+
+async def warm_db_pool(engine: AsyncEngine, connections: int) -> int:
+    async def _ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(_ping() for _ in range(connections)), return_exceptions=True)
+    return sum(1 for r in results if not isinstance(r, BaseException))
+
+
+async def warm_opensearch_pool(client: AsyncOpenSearch, connections: int) -> int:
+    results = await asyncio.gather(*(client.ping() for _ in range(connections)), return_exceptions=True)
+    return sum(1 for r in results if r is True)
+
+
+async def warm_search_caches(db: AsyncSession, client: AsyncOpenSearch, top_n: int,
+                             concurrency: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        queries = await get_top_queries(db, top_n)
+    except SQLAlchemyError as e:
+        logger.warning(f"Warm-up skipped, query log unavailable: {e}")
+        queries = []
+
+    engine = AsyncSearchEngine(db, client)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    warmed, failed = 0, 0
+
+    async def _warm(query: str) -> bool:
+        async with semaphore:
+            try:
+                await engine.fetch_candidates(query, None, "all", "relevance", WARMUP_PAGE_SIZE)
+                await engine.get_filter_options(query=query)
+                return True
+            except OpenSearchException as e:
+                logger.warning(f"Warm-up failed for query '{query}': {e}")
+                return False
+
+    for ok in await asyncio.gather(*(_warm(q) for q in queries)):
+        if ok:
+            warmed += 1
+        else:
+            failed += 1
+
+    try:
+        await engine.get_filter_options()
+    except OpenSearchException as e:
+        logger.warning(f"Warm-up of default facets failed: {e}")
+
+    return {
+        "queries": len(queries),
+        "warmed": warmed,
+        "failed": failed,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+async def run_warmup(db: AsyncSession, client: AsyncOpenSearch, engine: AsyncEngine,
+                     top_n: Optional[int] = None) -> Dict[str, Any]:
+    top_n = settings.warmup_top_queries if top_n is None else top_n
+    pool_size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    db_connections = await warm_db_pool(engine, pool_size)
+    os_connections = await warm_opensearch_pool(client, settings.warmup_concurrency)
+    summary = await warm_search_caches(db, client, top_n, settings.warmup_concurrency)
+    summary["db_connections"] = db_connections
+    summary["opensearch_connections"] = os_connections
+    logger.info(f"Cache warm-up finished: {summary}")
+    return summary
@@ -11,6 +11,14 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 
 from backend.app.main import app
 from backend.app.database import get_async_db
+from backend.app.services.search_cache import clear_search_caches
+
+
+@pytest.fixture(autouse=True)
+def _clear_search_caches():
+    clear_search_caches()
+    yield
+    clear_search_caches()
 
 
 @pytest.fixture
@@ -73,7 +81,7 @@ def sample_search_hits(sample_document):
 @pytest_asyncio.fixture
 async def mock_async_session():
     session = AsyncMock(spec=AsyncSession)
-    session.execute = AsyncMock()
+    session.execute = AsyncMock(return_value=MagicMock())
     session.commit = AsyncMock()
     session.rollback = AsyncMock()
     session.close = AsyncMock()
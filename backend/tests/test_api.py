@@ -120,6 +120,30 @@ class TestSearchAPI:
         mock_engine.search.assert_called_once()
 
 
+    @patch("backend.app.api.search.AsyncSearchEngine")
+    @patch("backend.app.api.search.get_opensearch_client")
+    @patch("backend.app.api.search.get_async_db")
+    def test_search_accepts_top_k_as_candidate_pool(self, mock_get_db, mock_get_opensearch, mock_engine_class, client):
+        mock_get_db.return_value = AsyncMock()
+        mock_get_opensearch.return_value = MagicMock()
+        mock_engine = MagicMock()
+        mock_engine.search = AsyncMock(return_value={
+            "query": "test", "total": 0, "page": 1, "per_page": 20, "total_pages": 0,
+            "results": [], "personalized": False, "user_profile": None,
+        })
+        mock_engine_class.return_value = mock_engine
+
+        response = client.post("/api/v1/search/", json={"query": "test", "top_k": 100})
+
+        assert response.status_code == 200
+        assert mock_engine.search.call_args.kwargs["candidate_pool"] == 100
+        assert mock_engine.search.call_args.kwargs["per_page"] == 20
+
+    def test_search_rejects_non_positive_candidate_pool(self, client):
+        response = client.post("/api/v1/search/", json={"query": "test", "candidate_pool": 0})
+        assert response.status_code == 422
+
+
 class TestSettingsAPI:
 
     def test_get_weights(self, client):
@@ -197,27 +221,26 @@ class TestUsersAPI:
 
     @pytest.fixture
     def mock_db_session(self):
-        mock_db = MagicMock()
+        mock_db = AsyncMock()
+        mock_db.add = MagicMock()
         return mock_db
 
     @pytest.fixture
     def client_with_mock_db(self, mock_db_session):
-        from backend.app.database import get_db
+        from backend.app.database import get_async_db
 
-        def override_get_db():
+        async def override_get_async_db():
             yield mock_db_session
 
-        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_db] = override_get_async_db
         yield TestClient(app), mock_db_session
         app.dependency_overrides.clear()
 
-    def test_get_users_list(self, client_with_mock_db):
-        client, mock_db = client_with_mock_db
-        mock_query = MagicMock()
+    def _make_user_mock(self, user_id=1):
         mock_user = MagicMock()
-        mock_user.user_id = 1
-        mock_user.username = "test_user"
-        mock_user.email = "test@nsu.ru"
+        mock_user.user_id = user_id
+        mock_user.username = f"test_user_{user_id}"
+        mock_user.email = f"test{user_id}@nsu.ru"
         mock_user.role = "bachelor"
         mock_user.specialization = "Физика"
         mock_user.faculty = "ФФ"
@@ -225,29 +248,74 @@ class TestUsersAPI:
         mock_user.interests = ["физика"]
         mock_user.created_at = None
         mock_user.updated_at = None
-        mock_query.offset.return_value.limit.return_value.all.return_value = [mock_user]
-        mock_db.query.return_value = mock_query
+        return mock_user
+
+    def _returning_users(self, mock_db, users):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = users
+        result.scalar_one_or_none.return_value = users[0] if users else None
+        mock_db.execute.return_value = result
+
+    def _compiled_sql(self, mock_db):
+        stmt = mock_db.execute.await_args.args[0]
+        return str(stmt.compile(compile_kwargs={"literal_binds": True}))
+
+    def test_get_users_list(self, client_with_mock_db):
+        client, mock_db = client_with_mock_db
+        self._returning_users(mock_db, [self._make_user_mock()])
 
         response = client.get("/api/v1/users/")
 
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
+        assert data[0]["user_id"] == 1
+
+    def test_get_users_uses_keyset_cursor(self, client_with_mock_db):
+        client, mock_db = client_with_mock_db
+        self._returning_users(mock_db, [])
+
+        response = client.get("/api/v1/users/?after_id=40&limit=10")
+
+        assert response.status_code == 200
+        sql = self._compiled_sql(mock_db)
+        assert "users.user_id > 40" in sql
+        assert "ORDER BY users.user_id" in sql
+        assert "OFFSET" not in sql
+
+    def test_get_users_still_accepts_offset(self, client_with_mock_db):
+        client, mock_db = client_with_mock_db
+        self._returning_users(mock_db, [])
+
+        response = client.get("/api/v1/users/?offset=20&limit=10")
+
+        assert response.status_code == 200
+        sql = self._compiled_sql(mock_db)
+        assert "ORDER BY users.user_id" in sql
+        assert "OFFSET 20" in sql
+
+    def test_get_users_by_ids(self, client_with_mock_db):
+        client, mock_db = client_with_mock_db
+        self._returning_users(mock_db, [self._make_user_mock(1), self._make_user_mock(2)])
+
+        response = client.get("/api/v1/users/?ids=1&ids=2")
+
+        assert response.status_code == 200
+        assert [u["user_id"] for u in response.json()] == [1, 2]
+        assert mock_db.execute.await_count == 1
+        assert "IN (1, 2)" in self._compiled_sql(mock_db)
+
+    def test_get_users_rejects_too_many_ids(self, client_with_mock_db):
+        client, _ = client_with_mock_db
+        params = "&".join(f"ids={i}" for i in range(201))
+
+        response = client.get(f"/api/v1/users/?{params}")
+
+        assert response.status_code == 400
 
     def test_get_user_by_id(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
-        mock_user = MagicMock()
-        mock_user.user_id = 1
-        mock_user.username = "test_user"
-        mock_user.email = "test@nsu.ru"
-        mock_user.role = "bachelor"
-        mock_user.specialization = "Физика"
-        mock_user.faculty = "ФФ"
-        mock_user.course = 3
-        mock_user.interests = ["физика"]
-        mock_user.created_at = None
-        mock_user.updated_at = None
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        self._returning_users(mock_db, [self._make_user_mock()])
 
         response = client.get("/api/v1/users/1")
 
@@ -255,7 +323,7 @@ class TestUsersAPI:
 
     def test_get_nonexistent_user(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        self._returning_users(mock_db, [])
 
         response = client.get("/api/v1/users/99999")
 
@@ -265,8 +333,8 @@ class TestUsersAPI:
         response = client.get("/api/v1/users/?limit=500")
         assert response.status_code == 422
 
-    def test_get_users_negative_offset(self, client):
-        response = client.get("/api/v1/users/?offset=-1")
+    def test_get_users_negative_cursor(self, client):
+        response = client.get("/api/v1/users/?after_id=-1")
         assert response.status_code == 422
 
     def test_get_users_zero_limit(self, client):
@@ -275,58 +343,41 @@ class TestUsersAPI:
 
     def test_get_users_with_role_filter(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
-        mock_query = MagicMock()
-        mock_query.filter.return_value = mock_query
-        mock_query.offset.return_value.limit.return_value.all.return_value = []
-        mock_db.query.return_value = mock_query
+        self._returning_users(mock_db, [])
 
         response = client.get("/api/v1/users/?role=bachelor")
 
         assert response.status_code == 200
+        assert "users.role = 'bachelor'" in self._compiled_sql(mock_db)
 
     def test_get_user_stats(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
-        mock_user = MagicMock()
-        mock_user.user_id = 1
-        mock_user.username = "test_user"
-        mock_user.role = "bachelor"
-        mock_user.specialization = "Физика"
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
-        mock_db.query.return_value.filter.return_value.count.return_value = 42
+        result = MagicMock()
+        result.one_or_none.return_value = (self._make_user_mock(), 42)
+        mock_db.execute.return_value = result
 
         response = client.get("/api/v1/users/1/stats")
 
         assert response.status_code == 200
         data = response.json()
-        assert "total_clicks" in data
+        assert data["total_clicks"] == 42
         assert "username" in data
+        assert mock_db.execute.await_count == 1
 
     def test_get_stats_nonexistent_user(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        result = MagicMock()
+        result.one_or_none.return_value = None
+        mock_db.execute.return_value = result
 
         response = client.get("/api/v1/users/99999/stats")
 
         assert response.status_code == 404
 
-    def _make_user_mock(self):
-        mock_user = MagicMock()
-        mock_user.user_id = 1
-        mock_user.username = "test_user"
-        mock_user.email = "test@nsu.ru"
-        mock_user.role = "bachelor"
-        mock_user.specialization = "Физика"
-        mock_user.faculty = "ФФ"
-        mock_user.course = 3
-        mock_user.interests = ["физика"]
-        mock_user.created_at = None
-        mock_user.updated_at = None
-        return mock_user
-
     def test_update_interests_replaces_list(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
         mock_user = self._make_user_mock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        self._returning_users(mock_db, [mock_user])
 
         response = client.patch(
             "/api/v1/users/1/interests",
@@ -335,13 +386,13 @@ class TestUsersAPI:
 
         assert response.status_code == 200
         assert mock_user.interests == ["квантовая механика", "нейросети"]
-        mock_db.commit.assert_called_once()
-        mock_db.refresh.assert_called_once_with(mock_user)
+        mock_db.commit.assert_awaited_once()
+        mock_db.refresh.assert_awaited_once_with(mock_user)
 
     def test_update_interests_normalizes_payload(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
         mock_user = self._make_user_mock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        self._returning_users(mock_db, [mock_user])
 
         response = client.patch(
             "/api/v1/users/1/interests",
@@ -354,7 +405,7 @@ class TestUsersAPI:
     def test_update_interests_allows_empty_list(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
         mock_user = self._make_user_mock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        self._returning_users(mock_db, [mock_user])
 
         response = client.patch(
             "/api/v1/users/1/interests",
@@ -376,8 +427,7 @@ class TestUsersAPI:
 
     def test_update_interests_rejects_too_long_value(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
-        mock_user = self._make_user_mock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        self._returning_users(mock_db, [self._make_user_mock()])
 
         response = client.patch(
             "/api/v1/users/1/interests",
@@ -388,7 +438,7 @@ class TestUsersAPI:
 
     def test_update_interests_user_not_found(self, client_with_mock_db):
         client, mock_db = client_with_mock_db
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        self._returning_users(mock_db, [])
 
         response = client.patch(
             "/api/v1/users/99999/interests",
@@ -396,6 +446,7 @@ class TestUsersAPI:
         )
 
         assert response.status_code == 404
+        mock_db.commit.assert_not_awaited()
 
 
 class TestClickAPI:
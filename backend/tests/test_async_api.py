@@ -251,3 +251,52 @@ class TestErrorResponses:
             json={"query": 123}
         )
         assert response.status_code == 422
+
+
+class TestCtrHalfLife:
+
+    @pytest.fixture(autouse=True)
+    def _restore_state(self):
+        from backend.app.core.rate_limit import limiter
+        from backend.app.services.settings import settings_service
+        yield
+        settings_service.reset()
+        limiter.reset()
+
+    async def test_search_rejects_half_life_override(self, client: AsyncClient):
+        response = await client.post(
+            "/api/v1/search/",
+            json={"query": "физика", "weights_override": {"ctr_half_life_days": 7}}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "HALF_LIFE_OVERRIDE"
+
+    async def test_compare_rejects_half_life_in_weight_set(self, client: AsyncClient):
+        response = await client.post(
+            "/api/v1/search/compare",
+            json={"query": "физика", "weight_sets": {"fast": {"ctr_half_life_days": 7}}}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "HALF_LIFE_OVERRIDE"
+
+    async def test_changing_half_life_rebuilds_counters(self, client: AsyncClient):
+        with patch("backend.app.api.settings_weights.apply_ctr_half_life", new=AsyncMock()) as rebuild:
+            response = await client.put("/api/v1/settings/weights", json={"ctr_half_life_days": 7})
+            assert response.status_code == 200
+            rebuild.assert_awaited_once()
+
+            rebuild.reset_mock()
+            await client.put("/api/v1/settings/weights", json={"ctr_half_life_days": 7, "w_user": 2.0})
+            rebuild.assert_not_awaited()
+
+    async def test_failed_rebuild_restores_previous_weights(self, client: AsyncClient):
+        from backend.app.services.ctr import CTRDataError
+
+        with patch("backend.app.api.settings_weights.apply_ctr_half_life",
+                   new=AsyncMock(side_effect=CTRDataError("boom"))):
+            response = await client.put("/api/v1/settings/weights", json={"ctr_half_life_days": 7})
+
+        assert response.status_code == 503
+        assert response.json()["detail"]["code"] == "CTR_REBUILD_FAILED"
+        current = await client.get("/api/v1/settings/weights")
+        assert current.json()["ctr_half_life_days"] == 30.0
@@ -3,10 +3,20 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.exc import OperationalError, IntegrityError, SQLAlchemyError
 
+from backend.app.core.query_fingerprint import query_fingerprint
+from backend.app.schemas.search import ClickEvent, ImpressionsEvent
+from backend.app.services.event_counters import EventCounters
+from backend.app.services.settings import settings_service
+from backend.app.services.ctr.ctr_decay import decay_rate
 from backend.app.services.ctr import (
-    get_batch_ctr_data,
+    apply_ctr_half_life,
+    get_candidate_ctr_data,
+    register_click,
+    register_clicks,
+    register_events,
     register_impressions,
     get_total_stats,
+    run_ctr_maintenance,
     DatabaseConnectionError,
     CTRDataError,
 )
@@ -14,32 +24,37 @@ from backend.app.services.ctr import (
 pytestmark = pytest.mark.asyncio
 
 
-class TestGetBatchCtrData:
+class TestGetCandidateCtrData:
 
-    async def test_returns_empty_dict_when_no_data(self):
+    async def test_skips_query_for_empty_candidates(self):
         mock_session = AsyncMock()
-        mock_result = MagicMock()
-        mock_result.fetchall.return_value = []
-        mock_session.execute.return_value = mock_result
 
-        result = await get_batch_ctr_data(mock_session, "test query")
+        result = await get_candidate_ctr_data(mock_session, "test query", [])
 
         assert result == {}
+        mock_session.execute.assert_not_called()
 
-    async def test_returns_ctr_data_correctly(self):
+    async def test_returns_query_and_global_counts_in_one_statement(self):
         mock_session = AsyncMock()
         mock_result = MagicMock()
         mock_result.fetchall.return_value = [
-            ("doc_1", 5, 100),
-            ("doc_2", 10, 200),
+            ("doc_1", 5, 100, 7, 150, 2.5, 40.0),
+            ("doc_2", 0, 0, 3, 40, 0, 0),
         ]
         mock_session.execute.return_value = mock_result
 
-        result = await get_batch_ctr_data(mock_session, "test query")
+        result = await get_candidate_ctr_data(mock_session, "test query", ["doc_1", "doc_2", "doc_3"])
 
         assert result == {
-            "doc_1": (5, 100),
-            "doc_2": (10, 200),
+            "doc_1": (5, 100, 7, 150, 2.5, 40.0),
+            "doc_2": (0, 0, 3, 40, 0.0, 0.0),
+        }
+        assert mock_session.execute.await_count == 1
+        params = mock_session.execute.await_args.args[1]
+        assert params == {
+            "query_fp": query_fingerprint("test query"),
+            "doc_ids": ["doc_1", "doc_2", "doc_3"],
+            "decay_rate": decay_rate(),
         }
 
     async def test_raises_database_connection_error_on_operational_error(self):
@@ -47,30 +62,119 @@ class TestGetBatchCtrData:
         mock_session.execute.side_effect = OperationalError("", "", None)
 
         with pytest.raises(DatabaseConnectionError):
-            await get_batch_ctr_data(mock_session, "test query")
+            await get_candidate_ctr_data(mock_session, "test query", ["doc_1"])
+
+    async def test_returns_empty_dict_when_no_data(self):
+        mock_session = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.fetchall.return_value = []
+        mock_session.execute.return_value = mock_result
+
+        result = await get_candidate_ctr_data(mock_session, "test query", ["doc_1"])
+
+        assert result == {}
 
     async def test_raises_ctr_data_error_on_integrity_error(self):
         mock_session = AsyncMock()
         mock_session.execute.side_effect = IntegrityError("", "", None)
 
         with pytest.raises(CTRDataError):
-            await get_batch_ctr_data(mock_session, "test query")
+            await get_candidate_ctr_data(mock_session, "test query", ["doc_1"])
 
     async def test_raises_ctr_data_error_on_generic_sqlalchemy_error(self):
         mock_session = AsyncMock()
         mock_session.execute.side_effect = SQLAlchemyError("Generic error")
 
         with pytest.raises(CTRDataError):
-            await get_batch_ctr_data(mock_session, "test query")
+            await get_candidate_ctr_data(mock_session, "test query", ["doc_1"])
 
     async def test_raises_ctr_data_error_on_value_error(self):
         mock_session = AsyncMock()
         mock_result = MagicMock()
-        mock_result.fetchall.return_value = [("doc_1", "invalid", 100)]
+        mock_result.fetchall.return_value = [("doc_1", "invalid", 100, 0, 0, 0, 0)]
         mock_session.execute.return_value = mock_result
 
         with pytest.raises(CTRDataError):
-            await get_batch_ctr_data(mock_session, "test query")
+            await get_candidate_ctr_data(mock_session, "test query", ["doc_1"])
+
+
+class TestRegisterClicks:
+
+    async def test_registers_click_in_one_statement(self):
+        mock_session = AsyncMock()
+        mock_session.execute.return_value = MagicMock()
+
+        await register_click(mock_session, "Test  Query", "doc_1", 7, 3, "sess-1", 1200)
+
+        assert mock_session.execute.await_count == 1
+        mock_session.commit.assert_awaited_once()
+        mock_session.flush.assert_not_called()
+        statement, params = mock_session.execute.await_args.args
+        assert "ON CONFLICT (session_id, query_fp)" in str(statement)
+        assert params["query_fps"] == [query_fingerprint("test query")]
+        assert params["doc_ids"] == ["doc_1"]
+        assert params["sessions"] == ["sess-1"]
+        assert params["dwell_times"] == [1200]
+
+    async def test_batches_clicks_into_arrays(self):
+        mock_session = AsyncMock()
+        mock_session.execute.return_value = MagicMock()
+        clicks = [
+            ClickEvent(query="физика", document_id="doc_1", position=1, session_id="s"),
+            ClickEvent(query="физика", document_id="doc_2", position=4, user_id=3),
+        ]
+
+        await register_clicks(mock_session, clicks)
+
+        assert mock_session.execute.await_count == 1
+        params = mock_session.execute.await_args.args[1]
+        assert params["positions"] == [1, 4]
+        assert params["user_ids"] == [None, 3]
+        assert params["sessions"][0] == "s"
+        assert params["sessions"][1]
+
+    async def test_skips_empty_batch(self):
+        mock_session = AsyncMock()
+
+        await register_clicks(mock_session, [])
+
+        mock_session.execute.assert_not_called()
+
+    async def test_drops_clicks_for_unknown_documents_like_impressions(self):
+        from backend.app.services.ctr.ctr_registration import CLICKS_SQL, IMPRESSIONS_SQL
+
+        assert "LEFT JOIN" not in str(CLICKS_SQL)
+        assert "JOIN documents d" in str(CLICKS_SQL)
+        assert "JOIN documents d" in str(IMPRESSIONS_SQL)
+
+    async def test_reports_dropped_clicks(self):
+        mock_session = AsyncMock()
+        result = MagicMock()
+        result.scalar.return_value = 1
+        mock_session.execute.return_value = result
+        clicks = [ClickEvent(query="a", document_id=doc_id, position=1) for doc_id in ("doc_1", "unknown")]
+
+        stored = await register_clicks(mock_session, clicks)
+
+        assert stored == {"clicks": 1, "impressions": 0, "dropped": 1}
+
+    async def test_raises_database_connection_error_on_operational_error(self):
+        mock_session = AsyncMock()
+        mock_session.execute.side_effect = OperationalError("", "", None)
+
+        with pytest.raises(DatabaseConnectionError):
+            await register_clicks(mock_session, [ClickEvent(query="a", document_id="doc_1", position=1)])
+
+        mock_session.rollback.assert_awaited_once()
+
+    async def test_rolls_back_and_drops_on_generic_sqlalchemy_error(self):
+        mock_session = AsyncMock()
+        mock_session.execute.side_effect = SQLAlchemyError("Generic error")
+
+        stored = await register_clicks(mock_session, [ClickEvent(query="a", document_id="doc_1", position=1)])
+
+        mock_session.rollback.assert_awaited_once()
+        assert stored["dropped"] == 1
 
 
 class TestRegisterImpressions:
@@ -85,13 +189,14 @@ class TestRegisterImpressions:
 
     async def test_registers_impressions_in_batch(self):
         mock_session = AsyncMock()
+        mock_session.execute.return_value = MagicMock()
 
         await register_impressions(
             mock_session, "test query", 1, ["doc_1", "doc_2", "doc_3"]
         )
 
-        assert mock_session.execute.call_count == 2
-        assert mock_session.commit.call_count == 2
+        assert mock_session.execute.call_count == 1
+        assert mock_session.commit.call_count == 1
 
     async def test_raises_database_connection_error_on_operational_error(self):
         mock_session = AsyncMock()
@@ -118,44 +223,113 @@ class TestRegisterImpressions:
 
         mock_session.rollback.assert_called_once()
 
+    async def test_counts_only_inserted_impressions(self):
+        mock_session = AsyncMock()
+        result = MagicMock()
+        result.scalar.return_value = 2
+        mock_session.execute.return_value = result
+        counters = EventCounters()
+
+        with patch("backend.app.services.ctr.ctr_registration.event_counters", counters):
+            await register_impressions(mock_session, "test", 1, ["doc_1", "doc_2", "unknown"])
+
+        assert "RETURNING" in str(mock_session.execute.await_args.args[0])
+        assert counters.totals()["impressions"] == 2
+
     async def test_generates_session_id_if_not_provided(self):
         mock_session = AsyncMock()
+        mock_session.execute.return_value = MagicMock()
 
         await register_impressions(mock_session, "test", 1, ["doc_1"])
 
         first_call = mock_session.execute.call_args_list[0]
         values = first_call[0][1]
-        assert values[0]["session"] is not None
+        assert values["sessions"][0] is not None
 
 
-class TestGetTotalStats:
+class TestRegisterEvents:
 
-    async def test_returns_stats_correctly(self):
+    async def test_writes_each_event_type_with_one_statement_and_one_commit(self):
         mock_session = AsyncMock()
+        mock_session.execute.return_value = MagicMock()
+        clicks = [ClickEvent(query="a", document_id=f"doc_{i}", position=i + 1) for i in range(3)]
+        impressions = [
+            ImpressionsEvent(query="a", document_ids=["doc_1", "doc_2"], session_id="s1"),
+            ImpressionsEvent(query="b", document_ids=["doc_3"]),
+        ]
 
-        mock_result_impressions = MagicMock()
-        mock_result_impressions.scalar.return_value = 1000
+        await register_events(mock_session, clicks, impressions)
 
-        mock_result_clicks = MagicMock()
-        mock_result_clicks.scalar.return_value = 50
+        assert mock_session.execute.await_count == 2
+        mock_session.commit.assert_awaited_once()
+        params = mock_session.execute.await_args_list[0].args[1]
+        assert params["doc_ids"] == ["doc_1", "doc_2", "doc_3"]
+        assert params["positions"] == [1, 2, 1]
+        assert params["sessions"][:2] == ["s1", "s1"]
 
-        mock_session.execute.side_effect = [
-            mock_result_impressions,
-            mock_result_clicks,
-        ]
+    async def test_counts_rows_returned_by_each_insert(self):
+        mock_session = AsyncMock()
+        shown, clicked = MagicMock(), MagicMock()
+        shown.scalar.return_value = 1
+        clicked.scalar.return_value = 0
+        mock_session.execute.side_effect = [shown, clicked]
+        counters = EventCounters()
+
+        with patch("backend.app.services.ctr.ctr_registration.event_counters", counters):
+            stored = await register_events(
+                mock_session,
+                [ClickEvent(query="a", document_id="unknown", position=1)],
+                [ImpressionsEvent(query="a", document_ids=["doc_1", "unknown"])],
+            )
+
+        assert counters.totals() == {"impressions": 1, "clicks": 0}
+        assert stored == {"clicks": 0, "impressions": 1, "dropped": 2}
+
+    async def test_skips_impressions_without_documents(self):
+        mock_session = AsyncMock()
 
-        result = await get_total_stats(mock_session)
+        await register_events(mock_session, [], [ImpressionsEvent(query="a", document_ids=[])])
 
-        assert result == {
-            "total_impressions": 1000,
-            "total_clicks": 50,
-        }
+        mock_session.execute.assert_not_called()
+        mock_session.commit.assert_not_called()
+
+    async def test_raises_ctr_data_error_and_rolls_back(self):
+        mock_session = AsyncMock()
+        mock_session.execute.side_effect = SQLAlchemyError("Generic error")
+
+        with pytest.raises(CTRDataError):
+            await register_events(mock_session, [ClickEvent(query="a", document_id="doc_1", position=1)], [])
+
+        mock_session.rollback.assert_awaited_once()
+
+
+class TestGetTotalStats:
 
-    async def test_returns_zeros_when_null_values(self):
+    @pytest.fixture(autouse=True)
+    def counters(self):
+        counters = EventCounters()
+        with patch("backend.app.services.ctr.ctr_queries.event_counters", counters):
+            yield counters
+
+    async def test_loads_counters_once_then_serves_from_memory(self, counters):
         mock_session = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.fetchall.return_value = [("impressions", 1000), ("clicks", 50)]
+        mock_session.execute.return_value = mock_result
 
+        first = await get_total_stats(mock_session)
+        counters.record("impressions", 3)
+        second = await get_total_stats(mock_session)
+
+        assert first == {"total_impressions": 1000, "total_clicks": 50}
+        assert second == {"total_impressions": 1003, "total_clicks": 50}
+        assert mock_session.execute.await_count == 1
+        assert "COUNT" not in str(mock_session.execute.await_args.args[0])
+
+    async def test_returns_zeros_when_table_empty(self):
+        mock_session = AsyncMock()
         mock_result = MagicMock()
-        mock_result.scalar.return_value = None
+        mock_result.fetchall.return_value = []
         mock_session.execute.return_value = mock_result
 
         result = await get_total_stats(mock_session)
@@ -190,6 +364,7 @@ class TestConcurrentOperations:
             nonlocal call_count
             call_count += 1
             await asyncio.sleep(0.01)
+            return MagicMock()
 
         mock_session.execute = mock_execute
         mock_session.commit = AsyncMock()
@@ -201,4 +376,78 @@ class TestConcurrentOperations:
 
         await asyncio.gather(*tasks)
 
-        assert call_count == 20
+        assert call_count == 10
+
+
+class TestRunCtrMaintenance:
+
+    async def test_rolls_up_refreshes_and_drops_in_order(self):
+        mock_session = AsyncMock()
+        rollup_result = MagicMock()
+        rollup_result.scalar.return_value = 42
+        drop_result = MagicMock()
+        drop_result.fetchall.return_value = [("impressions_2024_01",), ("clicks_2024_01",)]
+        state_result = MagicMock()
+        state_result.scalar.return_value = settings_service.get_weights().ctr_half_life_days
+        mock_session.execute.side_effect = [MagicMock(), rollup_result, state_result, MagicMock(), drop_result]
+
+        summary = await run_ctr_maintenance(mock_session)
+
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        assert "ensure_event_partitions" in statements[0]
+        assert "rollup_ctr_daily" in statements[1]
+        assert "ctr_decay_state" in statements[2]
+        assert "REFRESH MATERIALIZED VIEW" in statements[3]
+        assert "drop_expired_event_partitions" in statements[4]
+        assert mock_session.commit.call_count == 3
+        assert summary["rolled_up_rows"] == 42
+        assert summary["dropped_partitions"] == ["impressions_2024_01", "clicks_2024_01"]
+
+    async def test_adopts_stored_half_life_without_rebuilding(self):
+        mock_session = AsyncMock()
+        previous = settings_service.get_weights()
+        state_result = MagicMock()
+        state_result.scalar.return_value = previous.ctr_half_life_days + 1
+        mock_session.execute.side_effect = [MagicMock(), MagicMock(), state_result, MagicMock(), MagicMock()]
+
+        try:
+            summary = await run_ctr_maintenance(mock_session)
+            assert settings_service.get_weights().ctr_half_life_days == previous.ctr_half_life_days + 1
+        finally:
+            settings_service.set_weights(previous)
+
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        assert not any("rebuild_ctr_decayed" in statement for statement in statements)
+        assert summary["ctr_half_life_days"] == previous.ctr_half_life_days + 1
+
+    async def test_raises_database_connection_error_on_operational_error(self):
+        mock_session = AsyncMock()
+        mock_session.execute.side_effect = OperationalError("", "", None)
+
+        with pytest.raises(DatabaseConnectionError):
+            await run_ctr_maintenance(mock_session)
+
+        mock_session.rollback.assert_called_once()
+
+    async def test_half_life_rebuild_rolls_up_first(self):
+        mock_session = AsyncMock()
+        state_result = MagicMock()
+        state_result.scalar.return_value = settings_service.get_weights().ctr_half_life_days + 1
+        rebuild_result = MagicMock()
+        rebuild_result.scalar.return_value = 3
+        mock_session.execute.side_effect = [MagicMock(), state_result, rebuild_result]
+
+        assert await apply_ctr_half_life(mock_session) == 3
+
+        statements = [str(call.args[0]) for call in mock_session.execute.call_args_list]
+        assert "rollup_ctr_daily" in statements[0]
+        assert "rebuild_ctr_decayed" in statements[2]
+        mock_session.commit.assert_awaited_once()
+
+    async def test_raises_ctr_data_error_on_sqlalchemy_error(self):
+        mock_session = AsyncMock()
+        mock_session.execute.side_effect = SQLAlchemyError("Generic error")
+
+        with pytest.raises(CTRDataError):
+            await run_ctr_maintenance(mock_session)
+
@@ -0,0 +1,119 @@
+
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient
+
+from backend.app.services.batch_search import BatchSearchEngine
+
+pytestmark = pytest.mark.asyncio
+
+
+def _os_response():
+    return {
+        "hits": {
+            "total": {"value": 2},
+            "hits": [
+                {"_score": 5.0, "_source": {"document_id": "doc1", "title": "Doc 1"}},
+                {"_score": 4.0, "_source": {"document_id": "doc2", "title": "Doc 2"}},
+            ],
+        }
+    }
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+class TestBatchSearchEngine:
+
+    async def test_shares_candidates_and_ctr_across_specs(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response())
+        engine = BatchSearchEngine(AsyncMock(), client)
+
+        with patch("backend.app.services.async_search_engine.get_candidate_ctr_data", new=AsyncMock(return_value={})) as ctr:
+            await asyncio.gather(
+                engine.search("физика", weights_override={"w_user": 0.0}),
+                engine.search("физика", weights_override={"beta_ctr": 2.0}),
+                engine.search("физика", weights_override={"w_user": 3.0}),
+            )
+
+        assert client.search.await_count == 1
+        assert ctr.await_count == 1
+
+    async def test_failed_lookup_is_retried_by_later_specs(self):
+        client = MagicMock()
+        client.search = AsyncMock(side_effect=[ConnectionError("timed out"), _os_response()])
+        engine = BatchSearchEngine(AsyncMock(), client)
+
+        with patch("backend.app.services.async_search_engine.get_candidate_ctr_data", new=AsyncMock(return_value={})):
+            with pytest.raises(ConnectionError):
+                await engine.search("физика")
+            results = await engine.search("физика")
+
+        assert client.search.await_count == 2
+        assert [r["document_id"] for r in results["results"]] == ["doc1", "doc2"]
+
+
+class TestBatchEndpoint:
+
+    async def test_requires_api_key(self, client: AsyncClient):
+        response = await client.post("/api/v1/search/batch", json={"specs": [{"query": "физика"}]})
+        assert response.status_code == 401
+
+    @patch("backend.app.api.search.BatchSearchEngine")
+    async def test_streams_one_line_per_spec(self, mock_engine_class, client: AsyncClient):
+        mock_engine = AsyncMock()
+        mock_engine.search = AsyncMock(side_effect=lambda **kw: {"query": kw["query"], "results": []})
+        mock_engine_class.return_value = mock_engine
+
+        with patch("backend.app.core.auth.settings.batch_api_keys", ["k1"]):
+            response = await client.post(
+                "/api/v1/search/batch",
+                json={"specs": [{"id": "a", "query": "физика"}, {"id": "b", "query": "химия"}]},
+                headers={"X-API-Key": "k1"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = sorted(_ndjson(response), key=lambda line: line["index"])
+        assert [line["id"] for line in lines] == ["a", "b"]
+        assert lines[1]["response"]["query"] == "химия"
+
+    @patch("backend.app.api.search.BatchSearchEngine")
+    async def test_spec_errors_do_not_abort_batch(self, mock_engine_class, client: AsyncClient):
+        from opensearchpy.exceptions import ConnectionError as OSConnectionError
+
+        async def _search(**kw):
+            if kw["query"] == "bad":
+                raise OSConnectionError("down")
+            return {"query": kw["query"], "results": []}
+
+        mock_engine = AsyncMock()
+        mock_engine.search = AsyncMock(side_effect=_search)
+        mock_engine_class.return_value = mock_engine
+
+        with patch("backend.app.core.auth.settings.batch_api_keys", ["k1"]):
+            response = await client.post(
+                "/api/v1/search/batch",
+                json={"specs": [{"query": "bad"}, {"query": "good"}, {"query": "   "}]},
+                headers={"X-API-Key": "k1"},
+            )
+
+        lines = {line["index"]: line for line in _ndjson(response)}
+        assert lines[0]["status"] == 503
+        assert lines[0]["error"]["code"] == "OPENSEARCH_UNAVAILABLE"
+        assert lines[1]["status"] == 200
+        assert lines[2]["error"]["code"] == "EMPTY_QUERY"
+
+    async def test_rejects_oversized_batch(self, client: AsyncClient):
+        with patch("backend.app.core.auth.settings.batch_api_keys", ["k1"]), \
+                patch("backend.app.api.search.settings.batch_max_specs", 1):
+            response = await client.post(
+                "/api/v1/search/batch",
+                json={"specs": [{"query": "a"}, {"query": "b"}]},
+                headers={"X-API-Key": "k1"},
+            )
+        assert response.status_code == 413
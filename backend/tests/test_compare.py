@@ -0,0 +1,101 @@
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient
+
+from backend.app.schemas.settings import WEIGHT_PRESETS, WeightPreset
+from backend.app.services.async_search_engine import AsyncSearchEngine
+from backend.app.services.ranking import ranking_overlap, pairwise_overlap
+
+
+class TestRankingOverlap:
+
+    def test_identical_rankings(self):
+        stats = ranking_overlap(["a", "b", "c"], ["a", "b", "c"])
+        assert stats["common"] == 3
+        assert stats["jaccard"] == 1.0
+        assert stats["spearman"] == 1.0
+
+    def test_reversed_rankings(self):
+        stats = ranking_overlap(["a", "b", "c"], ["c", "b", "a"])
+        assert stats["spearman"] == -1.0
+
+    def test_disjoint_rankings(self):
+        stats = ranking_overlap(["a", "b"], ["c", "d"])
+        assert stats["common"] == 0
+        assert stats["unique_left"] == 2
+        assert stats["jaccard"] == 0.0
+        assert stats["spearman"] is None
+
+    def test_pairwise_covers_every_pair(self):
+        pairs = pairwise_overlap({"x": ["a"], "y": ["a"], "z": ["b"]})
+        assert [(p["left"], p["right"]) for p in pairs] == [("x", "y"), ("x", "z"), ("y", "z")]
+
+
+@pytest.mark.asyncio
+class TestEngineCompare:
+
+    async def test_single_retrieval_for_all_weight_sets(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value={
+            "hits": {
+                "total": {"value": 2},
+                "hits": [
+                    {"_score": 5.0, "_source": {"document_id": "doc1", "title": "Doc 1"}},
+                    {"_score": 4.0, "_source": {"document_id": "doc2", "title": "Doc 2"}},
+                ],
+            }
+        })
+        engine = AsyncSearchEngine(AsyncMock(), client)
+        engine._get_ctr_data = AsyncMock(return_value={"doc2": (50, 60, 80, 100, 50.0, 60.0)})
+
+        response = await engine.compare("физика", {
+            "bm25_only": WEIGHT_PRESETS[WeightPreset.BM25_ONLY].model_dump(),
+            "high_ctr": WEIGHT_PRESETS[WeightPreset.HIGH_CTR].model_dump(),
+        })
+
+        assert client.search.await_count == 1
+        engine._get_ctr_data.assert_awaited_once_with("физика", ["doc1", "doc2"])
+        assert [r["document_id"] for r in response["rankings"]["bm25_only"]] == ["doc1", "doc2"]
+        assert [r["document_id"] for r in response["rankings"]["high_ctr"]] == ["doc2", "doc1"]
+        assert response["overlap"][0]["spearman"] == -1.0
+        assert response["rankings"]["high_ctr"][0]["display_ctr"] == 0.8
+
+
+@pytest.mark.asyncio
+class TestCompareEndpoint:
+
+    @patch("backend.app.api.search.AsyncSearchEngine")
+    async def test_defaults_to_builtin_presets(self, mock_engine_class, client: AsyncClient):
+        mock_engine = AsyncMock()
+        mock_engine.compare = AsyncMock(return_value={"rankings": {}, "overlap": []})
+        mock_engine_class.return_value = mock_engine
+
+        response = await client.post("/api/v1/search/compare", json={"query": "физика"})
+
+        assert response.status_code == 200
+        weight_sets = mock_engine.compare.call_args.kwargs["weight_sets"]
+        assert set(weight_sets) == {p.value for p in WeightPreset}
+
+    @patch("backend.app.api.search.AsyncSearchEngine")
+    async def test_presets_and_custom_weight_sets(self, mock_engine_class, client: AsyncClient):
+        mock_engine = AsyncMock()
+        mock_engine.compare = AsyncMock(return_value={"rankings": {}, "overlap": []})
+        mock_engine_class.return_value = mock_engine
+
+        response = await client.post("/api/v1/search/compare", json={
+            "query": "физика",
+            "presets": ["bm25_only"],
+            "weight_sets": {"mine": {"w_user": 2.5}},
+        })
+
+        assert response.status_code == 200
+        weight_sets = mock_engine.compare.call_args.kwargs["weight_sets"]
+        assert weight_sets["bm25_only"]["w_user"] == 0.0
+        assert weight_sets["mine"] == {"w_user": 2.5}
+
+    async def test_unknown_preset_returns_400(self, client: AsyncClient):
+        response = await client.post("/api/v1/search/compare", json={"query": "физика", "presets": ["nope"]})
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "UNKNOWN_PRESET"
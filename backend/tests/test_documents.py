@@ -0,0 +1,195 @@
+import pytest
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient
+
+from backend.app.core.documents import count_fields, prepare_document
+from backend.app.core.exceptions import IngestBackpressureError
+from backend.app.services.document_ingest import DocumentIngestBuffer
+
+pytestmark = pytest.mark.asyncio
+
+HEADERS = {"X-API-Key": "k1"}
+
+
+def _doc(doc_id, title="Квантовая механика"):
+    return {"document_id": doc_id, "title": title, "authors": ["Ландау Л.Д."], "year": 1989}
+
+
+def _client():
+    client = MagicMock()
+    client.indices.refresh = AsyncMock()
+    return client
+
+
+def _db():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
+
+
+@pytest.fixture
+def buffer():
+    with patch("backend.app.api.documents.document_ingest", DocumentIngestBuffer()) as buffer:
+        yield buffer
+
+
+class TestFilterKeys:
+
+    async def test_multi_valued_fields_get_one_key_per_value(self):
+        doc, _ = prepare_document({
+            "record_key": "elib\\1", "title": "Оптика",
+            "collection": ["Учебные  издания", "Научные издания", "Учебные издания"],
+            "knowledge_area": "Физика",
+        }, "elib", Counter())
+
+        assert doc["collection_key"] == ["Учебные издания", "Научные издания"]
+        assert doc["knowledge_area_key"] == ["Физика"]
+
+
+class TestCountFields:
+
+    async def test_counts_multi_fields_and_nested_properties(self):
+        properties = {
+            "title": {"type": "text", "fields": {"raw": {"type": "keyword"}}},
+            "links": {"properties": {"url": {"type": "keyword"}, "label": {"type": "text"}}},
+        }
+
+        assert count_fields(properties) == 5
+
+
+class TestDocumentIngestBuffer:
+
+    async def test_resubmitted_document_replaces_queued_version(self):
+        buffer = DocumentIngestBuffer()
+        buffer.submit([_doc("a", "old")])
+        assert buffer.submit([_doc("a", "new"), _doc("b")]) == 2
+
+    async def test_rejects_submissions_over_max_pending(self):
+        buffer = DocumentIngestBuffer()
+        with patch("backend.app.services.document_ingest.settings.document_ingest_max_pending", 2):
+            buffer.submit([_doc("a"), _doc("b")])
+            buffer.submit([_doc("a")])
+            with pytest.raises(IngestBackpressureError):
+                buffer.submit([_doc("c")])
+        assert buffer.stats()["throttled"] == 1
+
+    async def test_flush_writes_one_bulk_and_one_refresh(self):
+        buffer = DocumentIngestBuffer()
+        buffer.submit([_doc("a"), _doc("b"), _doc("c")])
+        client, db = _client(), _db()
+        with patch("backend.app.services.document_ingest.async_bulk", new=AsyncMock(return_value=(3, []))) as bulk:
+            assert await buffer.flush(client, db) == 3
+
+        actions = bulk.await_args.args[1]
+        assert [action["_id"] for action in actions] == ["a", "b", "c"]
+        assert len(db.execute.await_args.args[1]) == 3
+        client.indices.refresh.assert_awaited_once()
+        assert buffer.pending() == 0
+
+    async def test_flush_respects_micro_batch_size(self):
+        buffer = DocumentIngestBuffer()
+        buffer.submit([_doc(str(i)) for i in range(5)])
+        with patch("backend.app.services.document_ingest.settings.document_ingest_flush_size", 2), \
+                patch("backend.app.services.document_ingest.async_bulk", new=AsyncMock(return_value=(2, []))) as bulk:
+            assert await buffer.drain(_client(), _db()) == 5
+        assert bulk.await_count == 3
+
+    async def test_requeues_documents_rejected_with_429(self):
+        buffer = DocumentIngestBuffer()
+        buffer.submit([_doc("a"), _doc("b"), _doc("c")])
+        errors = [
+            {"index": {"_id": "b", "status": 429, "error": {"type": "es_rejected_execution_exception"}}},
+            {"index": {"_id": "c", "status": 400, "error": {"type": "mapper_parsing_exception"}}},
+        ]
+        db = _db()
+        with patch("backend.app.services.document_ingest.async_bulk", new=AsyncMock(return_value=(1, errors))):
+            assert await buffer.flush(_client(), db) == 1
+
+        assert buffer.pending() == 1
+        assert [row["document_id"] for row in db.execute.await_args.args[1]] == ["a"]
+        stats = buffer.stats()
+        assert stats["requeued"] == 1
+        assert stats["failed"] == 1
+
+    async def test_requeues_batch_when_bulk_fails(self):
+        buffer = DocumentIngestBuffer()
+        buffer.submit([_doc("a"), _doc("b")])
+        with patch("backend.app.services.document_ingest.async_bulk", new=AsyncMock(side_effect=ConnectionError())):
+            with pytest.raises(ConnectionError):
+                await buffer.flush(_client(), _db())
+        assert buffer.pending() == 2
+
+
+class TestDocumentEndpoints:
+
+    async def test_requires_api_key(self, client: AsyncClient):
+        response = await client.post("/api/v1/documents", json={"source": "elib", "document": _doc("a")})
+        assert response.status_code in (401, 403)
+
+    async def test_bulk_accepts_valid_and_reports_invalid(self, client: AsyncClient, buffer):
+        with patch("backend.app.core.auth.settings.ingest_api_keys", ["k1"]):
+            response = await client.post(
+                "/api/v1/documents/bulk",
+                json={"source": "elib", "documents": [
+                    {"record_key": "elib\\1", "title": "Физика", "authors": "Иванов И.И."},
+                    {"record_key": "elib\\2"},
+                ]},
+                headers=HEADERS,
+            )
+        assert response.status_code == 202
+        data = response.json()
+        assert data["accepted"] == 1
+        assert data["rejected"] == 1
+        assert data["errors"][0]["index"] == 1
+        assert data["pending"] == 1
+        assert buffer.pending() == 1
+
+    async def test_single_invalid_document_is_400(self, client: AsyncClient, buffer):
+        with patch("backend.app.core.auth.settings.ingest_api_keys", ["k1"]):
+            response = await client.post(
+                "/api/v1/documents", json={"source": "elib", "document": {"record_key": "x"}}, headers=HEADERS
+            )
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "INVALID_DOCUMENT"
+        assert buffer.pending() == 0
+
+    async def test_batch_key_cannot_write_documents(self, client: AsyncClient, buffer):
+        with patch("backend.app.core.auth.settings.batch_api_keys", ["k1"]):
+            response = await client.post(
+                "/api/v1/documents", json={"source": "elib", "document": _doc("a")}, headers=HEADERS
+            )
+        assert response.status_code == 401
+        assert buffer.pending() == 0
+
+    async def test_single_malformed_document_is_400(self, client: AsyncClient, buffer):
+        with patch("backend.app.core.auth.settings.ingest_api_keys", ["k1"]):
+            response = await client.post(
+                "/api/v1/documents",
+                json={"source": "elib", "document": {"record_key": ["elib", 1], "title": "Физика"}},
+                headers=HEADERS,
+            )
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "INVALID_DOCUMENT"
+
+    async def test_rejects_oversized_bulk(self, client: AsyncClient, buffer):
+        with patch("backend.app.core.auth.settings.ingest_api_keys", ["k1"]), \
+                patch("backend.app.api.documents.settings.document_ingest_max_batch", 1):
+            response = await client.post(
+                "/api/v1/documents/bulk",
+                json={"source": "elib", "documents": [_doc("a"), _doc("b")]},
+                headers=HEADERS,
+            )
+        assert response.status_code == 413
+
+    async def test_backpressure_returns_429_with_retry_after(self, client: AsyncClient, buffer):
+        with patch("backend.app.core.auth.settings.ingest_api_keys", ["k1"]), \
+                patch("backend.app.services.document_ingest.settings.document_ingest_max_pending", 0):
+            response = await client.post(
+                "/api/v1/documents", json={"source": "elib", "document": _doc("a")}, headers=HEADERS
+            )
+        assert response.status_code == 429
+        assert response.json()["detail"]["code"] == "INGEST_BACKPRESSURE"
+        assert "retry-after" in response.headers
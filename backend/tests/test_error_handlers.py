@@ -22,6 +22,16 @@ class TestHandleSearchErrors:
         result = await success_func()
         assert result == {"result": "ok"}
 
+    async def test_passes_through_http_exceptions(self):
+        @handle_search_errors
+        async def raise_http_error():
+            raise HTTPException(status_code=400, detail={"code": "EMPTY_QUERY"})
+
+        with pytest.raises(HTTPException) as exc_info:
+            await raise_http_error()
+
+        assert exc_info.value.status_code == 400
+
     async def test_handles_opensearch_connection_error(self):
         @handle_search_errors
         async def raise_connection_error():
@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.exc import OperationalError
+
+from backend.app.services.event_counters import EventCounters
+
+pytestmark = pytest.mark.asyncio
+
+
+def _rows(*rows):
+    result = MagicMock()
+    result.fetchall.return_value = list(rows)
+    return result
+
+
+class TestEventCounters:
+
+    async def test_record_is_visible_before_flush(self):
+        counters = EventCounters()
+
+        counters.record("impressions", 5)
+        counters.record("clicks")
+
+        assert counters.totals() == {"impressions": 5, "clicks": 1}
+        assert counters.dirty
+
+    async def test_flush_persists_deltas_and_reloads_totals(self):
+        counters = EventCounters()
+        counters.record("impressions", 5)
+        db = AsyncMock()
+        db.execute.side_effect = [MagicMock(), _rows(("impressions", 105), ("clicks", 7))]
+
+        await counters.flush(db)
+
+        update = db.execute.await_args_list[0]
+        assert "value = value + :delta" in str(update.args[0])
+        assert update.args[1] == {"name": "impressions", "delta": 5}
+        db.commit.assert_awaited_once()
+        assert counters.totals() == {"impressions": 105, "clicks": 7}
+        assert not counters.dirty
+
+    async def test_failed_flush_keeps_deltas_pending(self):
+        counters = EventCounters()
+        counters.record("clicks", 2)
+        db = AsyncMock()
+        db.execute.side_effect = OperationalError("", "", None)
+
+        with pytest.raises(OperationalError):
+            await counters.flush(db)
+
+        db.rollback.assert_awaited_once()
+        assert counters.totals()["clicks"] == 2
+        assert counters.dirty
+
+    async def test_estimate_within_tolerance_keeps_counters(self):
+        counters = EventCounters()
+        db = AsyncMock()
+        db.execute.side_effect = [
+            _rows(("impressions", 1000), ("clicks", 100)),
+            _rows(("impressions", 990), ("clicks", 101)),
+            _rows(("impressions", 1000), ("clicks", 100)),
+        ]
+
+        totals = await counters.reconcile(db)
+
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert not any("UPDATE" in statement for statement in statements)
+        assert totals == {"impressions": 1000, "clicks": 100}
+
+    async def test_estimate_outside_tolerance_raises_counters(self):
+        counters = EventCounters()
+        db = AsyncMock()
+        db.execute.side_effect = [
+            _rows(("impressions", 400), ("clicks", 100)),
+            _rows(("impressions", 1000), ("clicks", 100)),
+            MagicMock(),
+            _rows(("impressions", 1000), ("clicks", 100)),
+        ]
+
+        totals = await counters.reconcile(db)
+
+        update = db.execute.await_args_list[2]
+        assert "reconciled_at" in str(update.args[0])
+        assert update.args[1] == {"name": "impressions", "value": 1000}
+        assert totals == {"impressions": 1000, "clicks": 100}
+
+    async def test_estimate_never_lowers_counters(self):
+        counters = EventCounters()
+        db = AsyncMock()
+        db.execute.side_effect = [
+            _rows(("impressions", 1000), ("clicks", 100)),
+            _rows(("impressions", 0), ("clicks", 40)),
+            _rows(("impressions", 1000), ("clicks", 100)),
+        ]
+
+        totals = await counters.reconcile(db)
+
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert not any("UPDATE" in statement for statement in statements)
+        assert totals == {"impressions": 1000, "clicks": 100}
+
+    async def test_exact_reconcile_counts_rows(self):
+        counters = EventCounters()
+        impressions, clicks = MagicMock(), MagicMock()
+        impressions.scalar.return_value = 1001
+        clicks.scalar.return_value = 100
+        db = AsyncMock()
+        db.execute.side_effect = [
+            _rows(("impressions", 1000), ("clicks", 100)),
+            impressions, clicks,
+            MagicMock(), MagicMock(),
+            _rows(("impressions", 1001), ("clicks", 100)),
+        ]
+
+        totals = await counters.reconcile(db, exact=True)
+
+        assert "COUNT(*) FROM impressions" in str(db.execute.await_args_list[1].args[0])
+        assert totals == {"impressions": 1001, "clicks": 100}
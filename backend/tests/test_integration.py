@@ -12,7 +12,7 @@ from testcontainers.opensearch import OpenSearchContainer
 from backend.app.database import Base
 from backend.app.models import User, Click, Impression
 from backend.app.services.ranking import apply_ranking_formula, bayesian_smoothed_ctr
-from backend.app.services.ctr import get_batch_ctr_data, register_click, register_impressions
+from backend.app.services.ctr import get_candidate_ctr_data, register_click, register_impressions
 
 
 @pytest.fixture(scope="module")
@@ -138,10 +138,10 @@ class TestDatabaseIntegration:
             session_id="test_session",
         )
 
-        ctr_data = await get_batch_ctr_data(db_session, "машинное обучение")
+        ctr_data = await get_candidate_ctr_data(db_session, "машинное обучение", ["doc_1", "doc_2", "doc_3"])
 
         assert "doc_1" in ctr_data
-        clicks, impressions = ctr_data["doc_1"]
+        clicks, impressions = ctr_data["doc_1"][:2]
         assert clicks >= 1
         assert impressions >= 1
 
@@ -166,10 +166,10 @@ class TestDatabaseIntegration:
         for _ in range(3):
             await register_click(db_session, query, doc_id, user.user_id, 1)
 
-        ctr_data = await get_batch_ctr_data(db_session, query)
+        ctr_data = await get_candidate_ctr_data(db_session, query, [doc_id])
 
         assert doc_id in ctr_data
-        clicks, impressions = ctr_data[doc_id]
+        clicks, impressions = ctr_data[doc_id][:2]
         assert clicks == 3
         assert impressions == 10
 
@@ -291,7 +291,7 @@ class TestEndToEndFlow:
 
         await register_click(db_session, query, unpopular_doc, user.user_id, 2)
 
-        ctr_data = await get_batch_ctr_data(db_session, query)
+        ctr_data = await get_candidate_ctr_data(db_session, query, [popular_doc, unpopular_doc])
 
         assert ctr_data[popular_doc][0] > ctr_data[unpopular_doc][0]
 
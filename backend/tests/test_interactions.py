@@ -1,4 +1,7 @@
 
+import gzip
+import json
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
@@ -117,6 +120,102 @@ class TestImpressionsEndpoint:
             assert response.status_code == 200
 
 
+class TestEventsEndpoint:
+
+    CLICK = {"type": "click", "query": "test", "document_id": "doc-1", "position": 1}
+    IMPRESSIONS = {"type": "impressions", "query": "test", "document_ids": ["doc-1", "doc-2"]}
+
+    async def _post(self, content, headers=None):
+        with patch("backend.app.api.interactions.AsyncSearchEngine") as MockEngine:
+            mock_engine = AsyncMock()
+            mock_engine.register_events.return_value = {"clicks": 1, "impressions": 1, "dropped": 1}
+            MockEngine.return_value = mock_engine
+
+            async with AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url="http://test"
+            ) as client:
+                response = await client.post("/api/v1/search/events", content=content, headers=headers or {})
+        return response, mock_engine
+
+    async def test_accepts_json_array_of_mixed_events(self):
+        response, mock_engine = await self._post(json.dumps([self.CLICK, self.IMPRESSIONS]))
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok", "accepted": 2, "rejected": 0, "dropped": 1, "errors": []}
+        clicks, impressions = mock_engine.register_events.await_args.args
+        assert [c.document_id for c in clicks] == ["doc-1"]
+        assert impressions[0].document_ids == ["doc-1", "doc-2"]
+
+    async def test_accepts_ndjson_sent_as_text_plain(self):
+        body = "\n".join(json.dumps(e) for e in [self.CLICK, self.CLICK, self.IMPRESSIONS]) + "\n"
+
+        response, mock_engine = await self._post(body, {"Content-Type": "text/plain"})
+
+        assert response.status_code == 200
+        assert response.json()["accepted"] == 3
+        mock_engine.register_events.assert_awaited_once()
+
+    async def test_accepts_gzip_with_or_without_content_encoding(self):
+        body = gzip.compress(json.dumps([self.CLICK]).encode())
+
+        with_header, _ = await self._post(body, {"Content-Encoding": "gzip"})
+        sniffed, _ = await self._post(body)
+
+        assert with_header.json()["accepted"] == 1
+        assert sniffed.json()["accepted"] == 1
+
+    async def test_reports_invalid_events_without_rejecting_the_batch(self):
+        body = "\n".join([
+            json.dumps(self.CLICK),
+            json.dumps({"type": "click", "query": "test", "document_id": "doc-1", "position": 0}),
+            json.dumps({"type": "hover", "query": "test"}),
+            "{not json",
+        ])
+
+        response, mock_engine = await self._post(body)
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["accepted"] == 1
+        assert data["rejected"] == 3
+        assert [e["index"] for e in data["errors"]] == [1, 2, 3]
+        clicks, impressions = mock_engine.register_events.await_args.args
+        assert len(clicks) == 1 and impressions == []
+
+    async def test_rejects_malformed_array(self):
+        response, mock_engine = await self._post("[{\"type\": \"click\"")
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "INVALID_EVENT_BATCH"
+        mock_engine.register_events.assert_not_called()
+
+    async def test_rejects_truncated_gzip(self):
+        body = gzip.compress(json.dumps([self.CLICK]).encode())[:-8]
+
+        response, _ = await self._post(body)
+
+        assert response.status_code == 400
+
+    async def test_rejects_oversized_batch(self):
+        with patch("backend.app.services.event_ingest.settings") as mock_settings:
+            mock_settings.events_max_batch = 2
+            mock_settings.events_max_body_bytes = 1_048_576
+
+            response, mock_engine = await self._post(json.dumps([self.CLICK] * 3))
+
+        assert response.status_code == 413
+        assert response.json()["detail"]["code"] == "BATCH_TOO_LARGE"
+        mock_engine.register_events.assert_not_called()
+
+    async def test_rejects_gzip_bomb(self):
+        body = gzip.compress(b" " * 2_000_000 + json.dumps([self.CLICK]).encode())
+
+        response, _ = await self._post(body)
+
+        assert response.status_code == 413
+
+
 class TestFiltersEndpoint:
 
     async def test_get_filters_success(self):
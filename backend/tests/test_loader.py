@@ -0,0 +1,140 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from opensearchpy import OpenSearch
+
+from scripts.load_books_to_opensearch import (
+    Deduplicator, Manifest, load_to_opensearch, parse_elib_document, parse_ruslan_document, promote_duplicates,
+)
+
+INDEX = "library_documents_v1"
+
+
+class FakeBulkClient(OpenSearch):
+    """Answers every bulk item with success and keeps the sent operations."""
+
+    def __init__(self):
+        super().__init__()
+        self.operations = []
+
+    def bulk(self, body, *args, **kwargs):
+        lines = [json.loads(line) for line in body.splitlines() if line]
+        items = []
+        position = 0
+        while position < len(lines):
+            op, meta = next(iter(lines[position].items()))
+            source = None if op == "delete" else lines[position + 1]
+            position += 1 if op == "delete" else 2
+            self.operations.append((op, meta["_id"], source))
+            items.append({op: {"_id": meta["_id"], "status": 201 if op == "index" else 200}})
+        return {"errors": False, "items": items}
+
+
+def _write(path, records):
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in records) + "\n", encoding="utf-8")
+    return path
+
+
+def _elib(i, **extra):
+    return {"record_key": f"elib\\{i}", "source": "elib", "title": f"Сборник задач по физике, часть {i}",
+            "authors": [f"Автор{i} А. А."], "year": 2000 + i % 20, **extra}
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = Manifest(tmp_path / "manifest.sqlite")
+    yield manifest
+    manifest.close()
+
+
+def _load(client, path, parser, source, manifest, **kwargs):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        return load_to_opensearch(client, INDEX, path, parser, source, pool, workers=2, threads=2, chunk_size=7,
+                                  manifest=manifest, **kwargs)
+
+
+class TestLoaderThroughParallelBulk:
+
+    def test_full_load_with_dedup(self, tmp_path, manifest):
+        deduplicator = Deduplicator(manifest)
+        client = FakeBulkClient()
+        elib = _write(tmp_path / "elib.jsonl", [_elib(i, card_url=f"http://elib/{i}") for i in range(50)])
+        ruslan = _write(tmp_path / "ruslan.jsonl", [{
+            "document_id": "ru_1", "source": "ruslan", "title": "Сборник задач по физике, часть 3",
+            "authors": ["Автор3 А. А."], "year": 2003, "pdf_url": "http://ruslan/1.pdf",
+        }])
+
+        elib_stats = _load(client, elib, parse_elib_document, "E-library", manifest, deduplicator=deduplicator)
+        ruslan_stats = _load(client, ruslan, parse_ruslan_document, "Ruslan", manifest, deduplicator=deduplicator)
+
+        assert elib_stats.success == 50
+        assert ruslan_stats.duplicates == 1
+        op, doc_id, source = client.operations[-1]
+        assert (op, doc_id) == ("update", "elib_3")
+        assert source["doc"] == {"pdf_url": "http://ruslan/1.pdf", "has_pdf": True}
+
+    def test_delta_load_sends_only_changes(self, tmp_path, manifest):
+        client = FakeBulkClient()
+        records = [_elib(i) for i in range(20)]
+        _load(client, _write(tmp_path / "elib.jsonl", records), parse_elib_document, "E-library", manifest)
+        manifest.activate(INDEX)
+        client.operations.clear()
+
+        records[4]["title"] = "Сборник задач по оптике"
+        changed = []
+        stats = _load(client, _write(tmp_path / "elib.jsonl", records + [_elib(20)]), parse_elib_document,
+                      "E-library", manifest, delta=True, changed=changed)
+
+        assert (stats.created, stats.updated, stats.unchanged) == (1, 1, 19)
+        assert sorted(doc_id for _, doc_id, _ in client.operations) == ["elib_20", "elib_4"]
+        assert sorted(doc["document_id"] for doc in changed) == ["elib_20", "elib_4"]
+        assert manifest.stale_ids() == []
+
+    def test_deleted_canonical_promotes_its_duplicate(self, tmp_path, manifest):
+        deduplicator = Deduplicator(manifest)
+        client = FakeBulkClient()
+        elib = _write(tmp_path / "elib.jsonl", [_elib(1, card_url="http://elib/1")])
+        ruslan = _write(tmp_path / "ruslan.jsonl", [
+            {"document_id": f"ru_{i}", "source": "ruslan", "title": "Сборник задач по физике, часть 1",
+             "authors": ["Автор1 А. А."], "year": 2001, "card_url": f"http://ruslan/{i}"}
+            for i in range(2)
+        ] + [{"document_id": "ks_9", "source": "kemsu", "title": "Сборник задач по физике, часть 1",
+              "authors": ["Автор1 А. А."], "year": 2001, "card_url": "http://kemsu/9"}])
+        _load(client, elib, parse_elib_document, "E-library", manifest, deduplicator=deduplicator)
+        _load(client, ruslan, parse_ruslan_document, "Ruslan", manifest, deduplicator=deduplicator)
+        manifest.flush()
+
+        changed = []
+        promote_duplicates(client, INDEX, deduplicator, manifest, ["elib_1"], changed)
+
+        op, doc_id, source = client.operations[-1]
+        assert (op, doc_id) == ("index", "ru_0")
+        assert source["alt_card_urls"] == ["http://ruslan/1", "http://kemsu/9"]
+        assert [doc["document_id"] for doc in changed] == ["ru_0"]
+        clusters = manifest.conn.execute("SELECT document_id, canonical_id FROM duplicates ORDER BY document_id")
+        assert clusters.fetchall() == [("ks_9", "ru_0"), ("ru_1", "ru_0")]
+
+    def test_volumes_and_short_titles_are_not_merged(self, tmp_path, manifest):
+        deduplicator = Deduplicator(manifest)
+        client = FakeBulkClient()
+        elib = _write(tmp_path / "elib.jsonl", [
+            {"record_key": "elib\\1", "source": "elib", "title": "Математический анализ. Часть 1",
+             "authors": ["Зорич В. А."], "year": 2002},
+            {"record_key": "elib\\2", "source": "elib", "title": "Физика. Том I", "year": 2002},
+            {"record_key": "elib\\3", "source": "elib", "title": "Физика", "year": 2002},
+        ])
+        ruslan = _write(tmp_path / "ruslan.jsonl", [
+            {"document_id": "ru_1", "source": "ruslan", "title": "Математический анализ. Часть 2",
+             "authors": ["Зорич В. А."], "year": 2002},
+            {"document_id": "ru_2", "source": "ruslan", "title": "Физика. Том II", "year": 2002},
+            {"document_id": "ru_3", "source": "ruslan", "title": "Физика", "year": 2002},
+        ])
+
+        _load(client, elib, parse_elib_document, "E-library", manifest, deduplicator=deduplicator)
+        stats = _load(client, ruslan, parse_ruslan_document, "Ruslan", manifest, deduplicator=deduplicator)
+
+        assert stats.duplicates == 0
+        assert sorted(doc_id for op, doc_id, _ in client.operations if doc_id.startswith("ru_")) == [
+            "ru_1", "ru_2", "ru_3",
+        ]
@@ -0,0 +1,28 @@
+
+from backend.app.core.query_fingerprint import canonicalize_query, query_fingerprint
+
+
+class TestCanonicalizeQuery:
+
+    def test_lowercases_and_collapses_whitespace(self):
+        assert canonicalize_query("  Квантовая\t МЕХАНИКА \n") == "квантовая механика"
+
+    def test_applies_nfkc(self):
+        assert canonicalize_query("ﬁзика") == canonicalize_query("fiзика")
+
+
+class TestQueryFingerprint:
+
+    def test_equivalent_queries_share_fingerprint(self):
+        assert query_fingerprint("Физика") == query_fingerprint(" физика  ")
+
+    def test_different_queries_differ(self):
+        assert query_fingerprint("физика") != query_fingerprint("химия")
+
+    def test_fits_signed_bigint(self):
+        for query in ("физика", "химия", "", "x" * 500):
+            fp = query_fingerprint(query)
+            assert -2 ** 63 <= fp < 2 ** 63
+
+    def test_is_stable_across_releases(self):
+        assert query_fingerprint("физика") == 4298820798761647272
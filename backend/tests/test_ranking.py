@@ -1,5 +1,8 @@
 
+import math
+
 import pytest
+from backend.app.services.ctr.ctr_decay import decay_rate
 from backend.app.services.ranking import (
     apply_ranking_formula,
     bayesian_smoothed_ctr,
@@ -161,3 +164,44 @@ class TestApplyRankingFormula:
         assert results[0]["position"] == 1
         assert results[1]["document_id"] == "doc_low_ctr"
         assert results[0]["smoothed_ctr"] > results[1]["smoothed_ctr"]
+
+    def test_decayed_counters_drive_ctr_when_half_life_set(self):
+        hits = [
+            {"_score": 10.0, "_source": {"document_id": "doc_stale", "title": "A"}},
+            {"_score": 10.0, "_source": {"document_id": "doc_fresh", "title": "B"}},
+        ]
+        ctr_data = {
+            "doc_stale": (50, 100, 0.5, 2.0),
+            "doc_fresh": (10, 100, 8.0, 20.0),
+        }
+
+        results = apply_ranking_formula(hits, ctr_data, None, False)
+
+        assert results[0]["document_id"] == "doc_fresh"
+        assert results[0]["decayed_clicks"] == 8.0
+
+    def test_zero_half_life_uses_cumulative_counters(self):
+        hits = [
+            {"_score": 10.0, "_source": {"document_id": "doc_stale", "title": "A"}},
+            {"_score": 10.0, "_source": {"document_id": "doc_fresh", "title": "B"}},
+        ]
+        ctr_data = {
+            "doc_stale": (50, 100, 0.5, 2.0),
+            "doc_fresh": (10, 100, 8.0, 20.0),
+        }
+
+        results = apply_ranking_formula(
+            hits, ctr_data, None, False, weights_override={"ctr_half_life_days": 0}
+        )
+
+        assert results[0]["document_id"] == "doc_stale"
+
+
+class TestDecayRate:
+
+    def test_halves_counters_after_one_half_life(self):
+        rate = decay_rate(30)
+        assert math.exp(-rate * 30 * 86400) == pytest.approx(0.5)
+
+    def test_zero_half_life_disables_decay(self):
+        assert decay_rate(0) == 0.0
@@ -0,0 +1,449 @@
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient
+
+from backend.app.core.cache import TTLCache
+from backend.app.services.async_search_engine import AsyncSearchEngine
+from opensearchpy import NotFoundError
+
+from backend.app.services.index_generation import IndexGeneration
+from backend.app.services.search_cache import candidate_cache, candidate_key, facet_cache
+from backend.app.services.warmup import warm_search_caches
+
+
+def _os_response(n):
+    return {
+        "hits": {
+            "total": {"value": n},
+            "hits": [
+                {"_score": float(n - i), "_source": {"document_id": f"doc_{i}", "title": f"Doc {i}"}}
+                for i in range(n)
+            ],
+        }
+    }
+
+
+class TestTTLCache:
+
+    def test_get_returns_stored_value(self):
+        cache = TTLCache("test", maxsize=10, ttl_seconds=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+    def test_expired_entries_are_misses(self):
+        cache = TTLCache("test", maxsize=10, ttl_seconds=60)
+        cache.set("a", 1, ttl_seconds=-1)
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache("test", maxsize=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_stats_track_hit_rate(self):
+        cache = TTLCache("test", maxsize=10, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["approx_bytes"] > 0
+
+
+@pytest.mark.asyncio
+class TestEngineCaching:
+
+    async def test_candidates_served_from_cache(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(5))
+        engine = AsyncSearchEngine(AsyncMock(), client)
+
+        await engine.fetch_candidates("физика", None, "all", "relevance", 5)
+        cached = await engine.fetch_candidates("физика", None, "all", "relevance", 3)
+
+        assert client.search.await_count == 1
+        assert len(cached["hits"]["hits"]) == 3
+
+    async def test_larger_window_refetches(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(5))
+        engine = AsyncSearchEngine(AsyncMock(), client)
+
+        await engine.fetch_candidates("физика", None, "all", "relevance", 5)
+        await engine.fetch_candidates("физика", None, "all", "relevance", 10)
+
+        assert client.search.await_count == 2
+
+    async def test_exhausted_result_set_satisfies_larger_window(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(2))
+        engine = AsyncSearchEngine(AsyncMock(), client)
+
+        await engine.fetch_candidates("физика", None, "all", "relevance", 5)
+        await engine.fetch_candidates("физика", None, "all", "relevance", 10)
+
+        assert client.search.await_count == 1
+
+    async def test_case_and_whitespace_variants_share_candidates(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(5))
+        engine = AsyncSearchEngine(AsyncMock(), client)
+
+        await engine.fetch_candidates("Квантовая механика", None, "all", "relevance", 5)
+        await engine.fetch_candidates("  квантовая   МЕХАНИКА ", None, "all", "relevance", 5)
+
+        assert client.search.await_count == 1
+
+    async def test_filters_are_part_of_key(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(5))
+        engine = AsyncSearchEngine(AsyncMock(), client)
+
+        await engine.fetch_candidates("физика", None, "all", "relevance", 5)
+        await engine.fetch_candidates("физика", {"language": "ru"}, "all", "relevance", 5)
+
+        assert client.search.await_count == 2
+
+    async def test_exact_total_is_part_of_key(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(5))
+        engine = AsyncSearchEngine(AsyncMock(), client)
+
+        await engine.fetch_candidates("физика", None, "all", "year_desc", 5)
+        await engine.fetch_candidates("физика", None, "all", "year_desc", 5, exact_total=True)
+
+        assert client.search.await_count == 2
+        assert client.search.await_args.kwargs["body"]["track_total_hits"] is True
+
+    async def test_facets_served_from_cache(self):
+        client = MagicMock()
+        client.search = AsyncMock(return_value={"hits": {"total": {"value": 0}}, "aggregations": {}})
+        engine = AsyncSearchEngine(AsyncMock(), client)
+
+        first = await engine.get_filter_options(query="физика")
+        second = await engine.get_filter_options(query="физика")
+
+        assert first == second
+        assert client.search.await_count == 1
+
+
+@pytest.mark.asyncio
+class TestWarmup:
+
+    async def test_warms_top_queries(self):
+        db = AsyncMock()
+        result = MagicMock()
+        result.fetchall.return_value = [("физика",), ("алгебра",)]
+        db.execute.return_value = result
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(3))
+
+        summary = await warm_search_caches(db, client, top_n=10, concurrency=2)
+
+        assert summary["queries"] == 2
+        assert summary["warmed"] == 2
+        assert summary["failed"] == 0
+        assert len(candidate_cache) == 2
+        assert len(facet_cache) == 3
+
+    async def test_query_log_failure_still_warms_default_facets(self):
+        from sqlalchemy.exc import OperationalError
+
+        db = AsyncMock()
+        db.execute.side_effect = OperationalError("", "", None)
+        client = MagicMock()
+        client.search = AsyncMock(return_value={"hits": {"total": {"value": 0}}, "aggregations": {}})
+
+        summary = await warm_search_caches(db, client, top_n=10, concurrency=2)
+
+        assert summary["queries"] == 0
+        assert len(facet_cache) == 1
+
+
+@pytest.mark.asyncio
+class TestAdminEndpoints:
+
+    async def test_disabled_without_configured_key(self, client: AsyncClient):
+        with patch("backend.app.core.auth.settings.admin_api_key", None):
+            response = await client.get("/api/v1/admin/caches")
+        assert response.status_code == 403
+        assert response.json()["detail"]["code"] == "ADMIN_DISABLED"
+
+    async def test_rejects_wrong_key(self, client: AsyncClient):
+        with patch("backend.app.core.auth.settings.admin_api_key", "secret"):
+            response = await client.get("/api/v1/admin/caches", headers={"X-Admin-Key": "wrong"})
+        assert response.status_code == 401
+
+    async def test_cache_stats(self, client: AsyncClient):
+        with patch("backend.app.core.auth.settings.admin_api_key", "secret"):
+            response = await client.get("/api/v1/admin/caches", headers={"X-Admin-Key": "secret"})
+        assert response.status_code == 200
+        names = {c["name"] for c in response.json()["caches"]}
+        assert {"candidates", "facets", "pages", "profiles"} <= names
+
+    @patch("backend.app.api.admin.run_warmup")
+    async def test_warmup_endpoint(self, mock_run_warmup, client: AsyncClient):
+        mock_run_warmup.return_value = {"queries": 1, "warmed": 1, "failed": 0}
+        with patch("backend.app.core.auth.settings.admin_api_key", "secret"):
+            response = await client.post("/api/v1/admin/warmup?top_n=5", headers={"X-Admin-Key": "secret"})
+        assert response.status_code == 200
+        assert response.json()["warmed"] == 1
+        assert mock_run_warmup.call_args.args[3] == 5
+
+
+def _profile(user_id, role="bachelor", specialization="Физика", interests=None):
+    return {"user_id": user_id, "username": f"user{user_id}", "role": role, "specialization": specialization,
+            "faculty": None, "course": 1, "interests": interests or []}
+
+
+@pytest.mark.asyncio
+class TestCohortPageCache:
+
+    def _engine(self, profiles):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(5))
+        db = AsyncMock()
+        db.execute.return_value = MagicMock()
+        engine = AsyncSearchEngine(db, client)
+        engine._get_user_profile = AsyncMock(side_effect=lambda uid: profiles[uid])
+        return engine, db
+
+    async def test_same_cohort_shares_ranked_page(self):
+        profiles = {1: _profile(1, interests=["оптика", "Квант"]), 2: _profile(2, interests=["квант", "оптика"])}
+        engine, db = self._engine(profiles)
+
+        first = await engine.search("физика", user_id=1)
+        calls_after_first = db.execute.await_count
+        second = await engine.search("физика", user_id=2)
+
+        assert db.execute.await_count == calls_after_first
+        assert [r["document_id"] for r in first["results"]] == [r["document_id"] for r in second["results"]]
+        assert second["user_profile"]["user_id"] == 2
+        assert second["personalized"] is True
+
+    async def test_different_cohort_is_ranked_separately(self):
+        profiles = {1: _profile(1), 2: _profile(2, role="phd")}
+        engine, db = self._engine(profiles)
+
+        await engine.search("физика", user_id=1)
+        calls_after_first = db.execute.await_count
+        await engine.search("физика", user_id=2)
+
+        assert db.execute.await_count > calls_after_first
+
+    async def test_weights_change_invalidates_page(self):
+        from backend.app.services.settings import settings_service
+
+        profiles = {1: _profile(1)}
+        engine, db = self._engine(profiles)
+        original = settings_service.get_weights()
+
+        await engine.search("физика", user_id=1)
+        calls_after_first = db.execute.await_count
+        try:
+            settings_service.set_weights(original.model_copy(update={"w_user": 2.0}))
+            await engine.search("физика", user_id=1)
+        finally:
+            settings_service.set_weights(original)
+
+        assert db.execute.await_count > calls_after_first
+
+    async def test_cohort_fingerprint_ignores_identity(self):
+        from backend.app.services.search_cache import cohort_fingerprint, ANONYMOUS_COHORT
+
+        assert cohort_fingerprint(_profile(1)) == cohort_fingerprint(_profile(2))
+        assert cohort_fingerprint(_profile(1)) != cohort_fingerprint(_profile(1, specialization="Химия"))
+        assert cohort_fingerprint(None) == ANONYMOUS_COHORT
+
+
+@pytest.mark.asyncio
+class TestCandidatePool:
+
+    def _engine(self, n=50):
+        client = MagicMock()
+        client.search = AsyncMock(return_value=_os_response(n))
+        db = AsyncMock()
+        db.execute.return_value = MagicMock()
+        return AsyncSearchEngine(db, client), client
+
+    async def test_pool_sets_rerank_window_independently_of_page(self):
+        engine, client = self._engine()
+
+        result = await engine.search("физика", per_page=5, enable_personalization=False, candidate_pool=40)
+
+        assert client.search.await_args.kwargs["size"] == 40
+        assert len(result["results"]) == 5
+
+    async def test_pages_within_pool_share_one_retrieval(self):
+        engine, client = self._engine()
+
+        first = await engine.search("физика", page=1, per_page=5, enable_personalization=False, candidate_pool=40)
+        second = await engine.search("физика", page=2, per_page=5, enable_personalization=False, candidate_pool=40)
+
+        assert client.search.await_count == 1
+        assert not {r["document_id"] for r in first["results"]} & {r["document_id"] for r in second["results"]}
+
+    async def test_pool_is_capped_by_config(self):
+        engine, client = self._engine()
+
+        with patch("backend.app.services.async_search_engine.settings.max_candidate_pool", 30):
+            await engine.search("физика", per_page=5, enable_personalization=False, candidate_pool=500)
+
+        assert client.search.await_args.kwargs["size"] == 30
+
+    async def test_page_beyond_pool_extends_window(self):
+        engine, client = self._engine()
+
+        await engine.search("физика", page=3, per_page=10, enable_personalization=False, candidate_pool=20)
+
+        assert client.search.await_args.kwargs["size"] == 30
+
+
+def _user_row(user_id=1, interests=None):
+    user = MagicMock()
+    user.user_id = user_id
+    user.username = f"user{user_id}"
+    user.email = f"user{user_id}@nsu.ru"
+    user.created_at = None
+    user.updated_at = None
+    user.role = "bachelor"
+    user.specialization = "Физика"
+    user.faculty = "ФФ"
+    user.course = 2
+    user.interests = interests or ["оптика"]
+    return user
+
+
+@pytest.mark.asyncio
+class TestProfileCache:
+
+    def _engine(self, user):
+        db = AsyncMock()
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = user
+        db.execute.return_value = result
+        return AsyncSearchEngine(db, MagicMock()), db
+
+    async def test_profile_loaded_once(self):
+        engine, db = self._engine(_user_row())
+
+        first = await engine._get_user_profile(1)
+        second = await engine._get_user_profile(1)
+
+        assert first == second
+        assert db.execute.await_count == 1
+
+    async def test_cached_profile_is_not_shared(self):
+        engine, _ = self._engine(_user_row())
+
+        first = await engine._get_user_profile(1)
+        first["interests"].append("мутация")
+        second = await engine._get_user_profile(1)
+
+        assert second["interests"] == ["оптика"]
+
+    async def test_missing_user_is_not_cached(self):
+        engine, db = self._engine(None)
+
+        await engine._get_user_profile(1)
+        await engine._get_user_profile(1)
+
+        assert db.execute.await_count == 2
+
+    async def test_interests_update_writes_through(self, client: AsyncClient, mock_async_session):
+        from backend.app.services.profile_cache import get_cached_profile, store_profile, user_to_profile
+
+        user = _user_row()
+        store_profile(user_to_profile(user))
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = user
+        mock_async_session.execute.return_value = result
+        mock_async_session.refresh = AsyncMock()
+
+        response = await client.patch("/api/v1/users/1/interests", json={"interests": ["алгебра"]})
+
+        assert response.status_code == 200
+        assert get_cached_profile(1)["interests"] == ["алгебра"]
+
+    async def test_publishes_change_when_channel_configured(self):
+        from backend.app.services.profile_cache import publish_profile_change
+
+        db = AsyncMock()
+        with patch("backend.app.services.profile_cache.settings.profile_notify_channel", "profiles"):
+            await publish_profile_change(db, 7)
+
+        assert db.execute.await_args.args[1] == {"channel": "profiles", "payload": "7"}
+
+    async def test_notification_invalidates_profile(self):
+        from backend.app.services.profile_cache import (
+            ProfileChangeListener, get_cached_profile, store_profile, user_to_profile,
+        )
+
+        store_profile(user_to_profile(_user_row(7)))
+        ProfileChangeListener("profiles")._on_notify(None, 1, "profiles", "7")
+
+        assert get_cached_profile(7) is None
+
+
+@pytest.mark.asyncio
+class TestIndexGeneration:
+
+    def _client(self, *indices):
+        client = MagicMock()
+        client.indices.get_alias = AsyncMock(side_effect=[{index: {"aliases": {}}} for index in indices])
+        return client
+
+    async def test_first_resolution_is_not_a_swap(self):
+        generation = IndexGeneration()
+
+        swapped = await generation.refresh(self._client("library_documents_v1"))
+
+        assert swapped is False
+        assert generation.get() == "library_documents_v1"
+
+    async def test_detects_alias_swap(self):
+        generation = IndexGeneration()
+        client = self._client("library_documents_v1", "library_documents_v1", "library_documents_v2")
+
+        assert await generation.refresh(client) is False
+        assert await generation.refresh(client) is False
+        assert await generation.refresh(client) is True
+        assert generation.get() == "library_documents_v2"
+
+    async def test_concrete_index_is_its_own_generation(self):
+        generation = IndexGeneration()
+        client = MagicMock()
+        client.indices.get_alias = AsyncMock(side_effect=NotFoundError(404, "alias missing"))
+
+        await generation.refresh(client)
+
+        assert generation.get() == "library_documents"
+
+    async def test_cache_keys_change_with_generation(self):
+        with patch("backend.app.services.search_cache.index_generation") as mock_generation:
+            mock_generation.get.return_value = "library_documents_v1"
+            before = candidate_key("физика", None, "all", "relevance")
+            mock_generation.get.return_value = "library_documents_v2"
+            after = candidate_key("физика", None, "all", "relevance")
+
+        assert before != after
+
+    async def test_admin_refresh_clears_caches_on_swap(self, client: AsyncClient):
+        candidate_cache.set("stale", (10, {}))
+        with patch("backend.app.core.auth.settings.admin_api_key", "secret"), \
+             patch("backend.app.api.admin.index_generation") as mock_generation:
+            mock_generation.refresh = AsyncMock(return_value=True)
+            mock_generation.get.return_value = "library_documents_v2"
+            response = await client.post("/api/v1/admin/index/refresh", headers={"X-Admin-Key": "secret"})
+
+        assert response.status_code == 200
+        assert response.json() == {"alias": "library_documents", "generation": "library_documents_v2", "swapped": True}
+        assert candidate_cache.peek("stale") is None
@@ -8,6 +8,7 @@ from backend.app.services.search_query_builder import (
     ELIB_DATABASE_KEY,
     FUZZY_PREFIX_LENGTH,
     EXACT_MATCH_BOOST,
+    SORTED_TOTAL_HITS_THRESHOLD,
 )
 
 
@@ -104,7 +105,13 @@ class TestFilterClauses:
 
         filters = result["query"]["bool"]["filter"]
         assert len(filters) == 1
-        assert filters[0] == {"term": {"collection.keyword": "Учебные издания"}}
+        assert filters[0] == {"term": {"collection_key": "Учебные издания"}}
+
+    def test_collection_filter_is_normalised(self):
+        result = build_search_query("физика", filters={"collection": "  Учебные   издания "})
+
+        filters = result["query"]["bool"]["filter"]
+        assert filters == [{"term": {"collection_key": "Учебные издания"}}]
 
     def test_language_filter(self):
         result = build_search_query("химия", filters={"language": "ru"})
@@ -128,7 +135,7 @@ class TestFilterClauses:
         result = build_search_query("экономика", filters={"knowledge_area": "Экономические науки"})
 
         filters = result["query"]["bool"]["filter"]
-        assert {"term": {"knowledge_area.keyword": "Экономические науки"}} in filters
+        assert {"term": {"knowledge_area_key": "Экономические науки"}} in filters
 
     def test_source_filter(self):
         result = build_search_query("право", filters={"source": "nsu"})
@@ -140,13 +147,13 @@ class TestFilterClauses:
         result = build_search_query("философия", filters={"has_pdf": True})
 
         filters = result["query"]["bool"]["filter"]
-        assert {"exists": {"field": "pdf_url"}} in filters
+        assert {"term": {"has_pdf": True}} in filters
 
     def test_has_pdf_false(self):
         result = build_search_query("социология", filters={"has_pdf": False})
 
         filters = result["query"]["bool"]["filter"]
-        assert {"bool": {"must_not": {"exists": {"field": "pdf_url"}}}} in filters
+        assert {"term": {"has_pdf": False}} in filters
 
     def test_has_pdf_none_not_added(self):
         result = build_search_query("психология", filters={"has_pdf": None})
@@ -164,10 +171,10 @@ class TestFilterClauses:
 
         filters = result["query"]["bool"]["filter"]
         assert len(filters) == 4
-        assert {"term": {"collection.keyword": "Научные издания"}} in filters
+        assert {"term": {"collection_key": "Научные издания"}} in filters
         assert {"term": {"language": "en"}} in filters
         assert {"term": {"source": "nsu"}} in filters
-        assert {"exists": {"field": "pdf_url"}} in filters
+        assert {"term": {"has_pdf": True}} in filters
 
 
 class TestDatabaseFilter:
@@ -176,55 +183,37 @@ class TestDatabaseFilter:
         result = build_search_query("физика", filters={"databases": ["BOOKS"]})
 
         clauses = result["query"]["bool"]["filter"]
-        assert len(clauses) == 1
-        assert clauses[0] == {
-            "bool": {
-                "should": [{"terms": {"database.keyword": ["BOOKS"]}}],
-                "minimum_should_match": 1,
-            }
-        }
+        assert clauses == [{"terms": {"database_key": ["BOOKS"]}}]
 
     def test_multiple_real_databases(self):
         result = build_search_query("физика", filters={"databases": ["BOOKS", "SERIAL"]})
 
         clauses = result["query"]["bool"]["filter"]
-        assert clauses[0]["bool"]["should"] == [
-            {"terms": {"database.keyword": ["BOOKS", "SERIAL"]}}
-        ]
+        assert clauses == [{"terms": {"database_key": ["BOOKS", "SERIAL"]}}]
 
     def test_only_elib(self):
         result = build_search_query("физика", filters={"databases": [ELIB_DATABASE_KEY]})
 
         clauses = result["query"]["bool"]["filter"]
-        assert clauses[0] == {
-            "bool": {
-                "should": [
-                    {"bool": {"must_not": {"exists": {"field": "database"}}}}
-                ],
-                "minimum_should_match": 1,
-            }
-        }
+        assert clauses == [{"terms": {"database_key": [ELIB_DATABASE_KEY]}}]
 
     def test_mixed_real_and_elib(self):
         result = build_search_query("физика", filters={"databases": ["BOOKS", ELIB_DATABASE_KEY]})
 
         clauses = result["query"]["bool"]["filter"]
-        should = clauses[0]["bool"]["should"]
-        assert {"terms": {"database.keyword": ["BOOKS"]}} in should
-        assert {"bool": {"must_not": {"exists": {"field": "database"}}}} in should
-        assert clauses[0]["bool"]["minimum_should_match"] == 1
+        assert clauses == [{"terms": {"database_key": ["BOOKS", ELIB_DATABASE_KEY]}}]
 
     def test_string_database_is_normalised(self):
         result = build_search_query("физика", filters={"databases": "BOOKS"})
 
         clauses = result["query"]["bool"]["filter"]
-        assert clauses[0]["bool"]["should"] == [{"terms": {"database.keyword": ["BOOKS"]}}]
+        assert clauses == [{"terms": {"database_key": ["BOOKS"]}}]
 
     def test_legacy_database_singular_key(self):
         result = build_search_query("физика", filters={"database": "BOOKS"})
 
         clauses = result["query"]["bool"]["filter"]
-        assert clauses[0]["bool"]["should"] == [{"terms": {"database.keyword": ["BOOKS"]}}]
+        assert clauses == [{"terms": {"database_key": ["BOOKS"]}}]
 
     def test_empty_databases_list_skipped(self):
         result = build_search_query("физика", filters={"databases": []})
@@ -238,7 +227,7 @@ class TestDatabaseFilter:
         )
 
         clauses = result["query"]["bool"]["filter"]
-        assert any("bool" in c and "should" in c["bool"] for c in clauses)
+        assert {"terms": {"database_key": ["BOOKS"]}} in clauses
         assert {"range": {"year": {"gte": 2010, "lte": 2020}}} in clauses
 
 
@@ -306,12 +295,12 @@ class TestBuildAggregationsQuery:
         assert aggs["sources"]["terms"]["size"] == 10
         assert aggs["databases"]["terms"]["size"] == 20
 
-    def test_databases_uses_missing_for_elib(self):
-        result = build_aggregations_query()
+    def test_facets_use_denormalized_keys(self):
+        aggs = build_aggregations_query()["aggs"]
 
-        databases_agg = result["aggs"]["databases"]
-        assert databases_agg["terms"]["field"] == "database.keyword"
-        assert databases_agg["terms"]["missing"] == ELIB_DATABASE_KEY
+        assert aggs["databases"]["terms"] == {"field": "database_key", "size": 20}
+        assert aggs["collections"]["terms"]["field"] == "collection_key"
+        assert aggs["knowledge_areas"]["terms"]["field"] == "knowledge_area_key"
 
     def test_year_stats_aggregation(self):
         result = build_aggregations_query()
@@ -324,7 +313,7 @@ class TestBuildAggregationsQuery:
 
         has_pdf_agg = result["aggs"]["has_pdf"]
         assert "filter" in has_pdf_agg
-        assert has_pdf_agg["filter"] == {"exists": {"field": "pdf_url"}}
+        assert has_pdf_agg["filter"] == {"term": {"has_pdf": True}}
 
     def test_default_query_is_match_all(self):
         result = build_aggregations_query()
@@ -355,7 +344,7 @@ class TestContextualFacets:
         databases = result["aggs"]["databases"]
         assert "filter" not in databases
         assert "terms" in databases
-        assert databases["terms"]["field"] == "database.keyword"
+        assert databases["terms"]["field"] == "database_key"
 
     def test_other_facets_apply_database_filter(self):
         result = build_aggregations_query(filters={"databases": ["BOOKS"]})
@@ -367,8 +356,7 @@ class TestContextualFacets:
         assert document_types["aggs"]["value"]["terms"]["field"] == "document_type"
 
         clauses = document_types["filter"]["bool"]["filter"]
-        db_clause = next(c for c in clauses if "bool" in c)
-        assert db_clause["bool"]["should"][0]["terms"]["database.keyword"] == ["BOOKS"]
+        assert {"terms": {"database_key": ["BOOKS"]}} in clauses
 
     def test_year_facet_excludes_year_filters(self):
         result = build_aggregations_query(filters={"year_from": 2020, "year_to": 2024})
@@ -389,16 +377,14 @@ class TestContextualFacets:
         result = build_aggregations_query(filters={"has_pdf": True})
 
         has_pdf = result["aggs"]["has_pdf"]
-        assert has_pdf == {"filter": {"exists": {"field": "pdf_url"}}}
+        assert has_pdf == {"filter": {"term": {"has_pdf": True}}}
 
     def test_other_facets_apply_has_pdf(self):
         result = build_aggregations_query(filters={"has_pdf": True})
 
         databases = result["aggs"]["databases"]
         assert "filter" in databases
-        assert databases["filter"]["bool"]["filter"] == [
-            {"exists": {"field": "pdf_url"}}
-        ]
+        assert databases["filter"]["bool"]["filter"] == [{"term": {"has_pdf": True}}]
 
     def test_combined_query_and_filters(self):
         result = build_aggregations_query(
@@ -413,7 +399,7 @@ class TestContextualFacets:
         assert "filter" in document_types
         clauses = document_types["filter"]["bool"]["filter"]
         assert any(c.get("range", {}).get("year") for c in clauses)
-        assert any("bool" in c for c in clauses)
+        assert {"terms": {"database_key": ["BOOKS"]}} in clauses
 
     def test_legacy_database_singular_excluded_by_databases_facet(self):
         result = build_aggregations_query(filters={"database": "BOOKS"})
@@ -443,18 +429,42 @@ class TestSortBy:
         assert "sort" in result
         first = result["sort"][0]
         assert first == {"year": {"order": "desc", "missing": "_last"}}
-        assert "_score" in result["sort"]
+        assert result["sort"][1] == "_score"
 
     def test_year_asc_sorts_by_year_ascending(self):
         result = build_search_query("физика", sort_by="year_asc")
         assert result["sort"][0] == {"year": {"order": "asc", "missing": "_last"}}
+        assert result["sort"][1] == "_score"
+
+    @pytest.mark.parametrize("sort_by", ["year_desc", "year_asc"])
+    def test_year_sorts_keep_scores(self, sort_by):
+        result = build_search_query("физика", sort_by=sort_by)
+        assert result["track_scores"] is True
 
-    def test_title_asc_sorts_by_title_keyword(self):
+    def test_title_asc_does_not_track_scores(self):
+        result = build_search_query("физика", sort_by="title_asc")
+        assert "track_scores" not in result
+
+    def test_title_asc_sorts_by_title_sort_key(self):
         result = build_search_query("физика", sort_by="title_asc")
         assert result["sort"] == [
-            {"title.keyword": {"order": "asc", "missing": "_last"}}
+            {"title_sort": {"order": "asc", "missing": "_last"}}
         ]
 
+    @pytest.mark.parametrize("sort_by", ["year_desc", "year_asc", "title_asc"])
+    def test_field_sorts_stop_counting_at_result_window(self, sort_by):
+        result = build_search_query("физика", sort_by=sort_by)
+        assert result["track_total_hits"] == SORTED_TOTAL_HITS_THRESHOLD
+
+    def test_exact_total_counts_every_match(self):
+        result = build_search_query("физика", sort_by="year_desc", exact_total=True)
+        assert result["track_total_hits"] is True
+
+    @pytest.mark.parametrize("sort_by", ["relevance", "popularity_desc"])
+    def test_reranked_sorts_keep_exact_totals(self, sort_by):
+        result = build_search_query("физика", sort_by=sort_by)
+        assert result["track_total_hits"] is True
+
     def test_unknown_sort_falls_back_to_relevance(self):
         result = build_search_query("физика", sort_by="bogus")
         assert "sort" not in result
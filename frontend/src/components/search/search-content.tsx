@@ -12,6 +12,7 @@ interface SearchContentProps {
   isLoading: boolean;
   hasSearched: boolean;
   totalResults: number;
+  totalIsLowerBound: boolean;
   page: number;
   totalPages: number;
   isPersonalized: boolean;
@@ -31,6 +32,7 @@ export default function SearchContent({
   isLoading,
   hasSearched,
   totalResults,
+  totalIsLowerBound,
   page,
   totalPages,
   isPersonalized,
@@ -61,6 +63,7 @@ export default function SearchContent({
         <div className="space-y-6">
           <ResultsHeader
             totalResults={totalResults}
+            totalIsLowerBound={totalIsLowerBound}
             page={page}
             totalPages={totalPages}
             isPersonalized={isPersonalized}
@@ -145,6 +148,7 @@ function NoResults({
 
 function ResultsHeader({
   totalResults,
+  totalIsLowerBound,
   page,
   totalPages,
   isPersonalized,
@@ -152,6 +156,7 @@ function ResultsHeader({
   onSortChange,
 }: {
   totalResults: number;
+  totalIsLowerBound: boolean;
   page: number;
   totalPages: number;
   isPersonalized: boolean;
@@ -171,6 +176,7 @@ function ResultsHeader({
         {t('search.foundLabel')}{' '}
         <span className="font-medium text-notion-text tabular-nums">
           {formatNumber(totalResults)}
+          {totalIsLowerBound && '+'}
         </span>{' '}
         {docNoun}
         {totalPages > 1 && (
@@ -17,6 +17,7 @@ export const WEIGHT_CONFIG: WeightConfigItem[] = [
   { key: 'beta_ctr', labelKey: 'weight.label.beta_ctr', descKey: 'weight.desc.beta_ctr', tipKey: 'weight.tip.beta_ctr', min: 0, max: 3, step: 0.1 },
   { key: 'ctr_alpha_prior', labelKey: 'weight.label.ctr_alpha_prior', descKey: 'weight.desc.ctr_alpha_prior', tipKey: 'weight.tip.ctr_alpha_prior', min: 0, max: 10, step: 0.5 },
   { key: 'ctr_beta_prior', labelKey: 'weight.label.ctr_beta_prior', descKey: 'weight.desc.ctr_beta_prior', tipKey: 'weight.tip.ctr_beta_prior', min: 1, max: 100, step: 1 },
+  { key: 'ctr_half_life_days', labelKey: 'weight.label.ctr_half_life_days', descKey: 'weight.desc.ctr_half_life_days', tipKey: 'weight.tip.ctr_half_life_days', min: 0, max: 365, step: 1 },
 ];
 
 export const PRESET_LABEL_KEYS: Record<WeightPreset, string> = {
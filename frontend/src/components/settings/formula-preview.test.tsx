@@ -13,6 +13,7 @@ describe('FormulaPreview', () => {
           beta_ctr: 0.5,
           ctr_alpha_prior: 1,
           ctr_beta_prior: 10,
+          ctr_half_life_days: 30,
         }}
       />,
     );
@@ -34,6 +35,7 @@ describe('FormulaPreview', () => {
           beta_ctr: 0.2,
           ctr_alpha_prior: 2,
           ctr_beta_prior: 20,
+          ctr_half_life_days: 30,
         }}
       />,
     );
@@ -47,6 +49,7 @@ describe('FormulaPreview', () => {
           beta_ctr: 1.0,
           ctr_alpha_prior: 2,
           ctr_beta_prior: 20,
+          ctr_half_life_days: 30,
         }}
       />,
     );
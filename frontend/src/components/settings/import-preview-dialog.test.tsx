@@ -8,6 +8,7 @@ const payload = {
   weights: {
     w_user: 1, alpha_type: 0.5, alpha_topic: 0.5,
     beta_ctr: 0.5, ctr_alpha_prior: 1, ctr_beta_prior: 10,
+    ctr_half_life_days: 30,
   },
   role_type_matrix: {
     bachelor: { textbook: 0.5, article: 0.5 },
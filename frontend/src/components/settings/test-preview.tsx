@@ -11,6 +11,11 @@ interface TestPreviewProps {
   baselineWeights?: RankingWeights | null;
 }
 
+// The CTR half-life is global and only changes on save, so previews rank with the stored one.
+function rankingOverride({ ctr_half_life_days: _, ...weights }: RankingWeights): Partial<RankingWeights> {
+  return weights;
+}
+
 interface PreviewResult {
   doc: DocumentResult;
   delta?: number | null;
@@ -65,7 +70,7 @@ export function TestPreview({ currentWeights, baselineWeights }: TestPreviewProp
           undefined,
           'all',
           'relevance',
-          { weightsOverride: currentWeights, signal: ctl.signal },
+          { weightsOverride: rankingOverride(currentWeights), signal: ctl.signal },
         ),
       ];
       if (showBaseline && baselineWeights) {
@@ -79,7 +84,7 @@ export function TestPreview({ currentWeights, baselineWeights }: TestPreviewProp
             undefined,
             'all',
             'relevance',
-            { weightsOverride: baselineWeights, signal: ctl.signal },
+            { weightsOverride: rankingOverride(baselineWeights), signal: ctl.signal },
           ),
         );
       }
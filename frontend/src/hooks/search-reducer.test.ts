@@ -67,6 +67,7 @@ describe('searchReducer', () => {
       const payload = {
         results: [mockDocument],
         total: 100,
+        totalIsLowerBound: false,
         page: 1,
         totalPages: 5,
         personalized: true,
@@ -77,6 +78,7 @@ describe('searchReducer', () => {
       expect(state.isLoading).toBe(false);
       expect(state.results).toEqual([mockDocument]);
       expect(state.totalResults).toBe(100);
+      expect(state.totalIsLowerBound).toBe(false);
       expect(state.page).toBe(1);
       expect(state.totalPages).toBe(5);
       expect(state.isPersonalized).toBe(true);
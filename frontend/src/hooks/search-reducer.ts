@@ -24,6 +24,7 @@ export function searchReducer(state: SearchState, action: SearchAction): SearchS
         isLoading: false,
         results: action.payload.results,
         totalResults: action.payload.total,
+        totalIsLowerBound: action.payload.totalIsLowerBound,
         page: action.payload.page,
         totalPages: action.payload.totalPages,
         isPersonalized: action.payload.personalized,
@@ -56,7 +57,7 @@ export function searchReducer(state: SearchState, action: SearchAction): SearchS
       return { ...state, error: translate('search.toast.empty.title'), errorCode: 'EMPTY_QUERY', isRetryable: false };
 
     case 'RESET':
-      return { ...state, query: '', results: [], isLoading: false, hasSearched: false, totalResults: 0, page: 1, totalPages: 1, isPersonalized: false, userProfile: null, stats: { totalResults: 0, avgCTR: 0, impressions: 0 }, error: null, errorCode: null, isRetryable: false, lastSearchParams: null };
+      return { ...state, query: '', results: [], isLoading: false, hasSearched: false, totalResults: 0, totalIsLowerBound: false, page: 1, totalPages: 1, isPersonalized: false, userProfile: null, stats: { totalResults: 0, avgCTR: 0, impressions: 0 }, error: null, errorCode: null, isRetryable: false, lastSearchParams: null };
 
     case 'INCREMENT_CLICK':
       return handleIncrementClick(state, action.payload);
@@ -40,6 +40,7 @@ export function createSearchAction({
         payload: {
           results: response.results,
           total: response.total,
+          totalIsLowerBound: response.total_relation === 'gte',
           page: response.page,
           totalPages: response.total_pages,
           personalized: response.personalized,
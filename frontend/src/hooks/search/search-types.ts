@@ -6,6 +6,7 @@ export interface SearchState {
   isLoading: boolean;
   hasSearched: boolean;
   totalResults: number;
+  totalIsLowerBound: boolean;
   page: number;
   totalPages: number;
   isPersonalized: boolean;
@@ -27,7 +28,7 @@ export interface SearchState {
 export type SearchAction =
   | { type: 'SET_QUERY'; payload: string }
   | { type: 'SEARCH_START' }
-  | { type: 'SEARCH_SUCCESS'; payload: { results: DocumentResult[]; total: number; page: number; totalPages: number; personalized: boolean; userProfile: UserProfile | null } }
+  | { type: 'SEARCH_SUCCESS'; payload: { results: DocumentResult[]; total: number; totalIsLowerBound: boolean; page: number; totalPages: number; personalized: boolean; userProfile: UserProfile | null } }
   | { type: 'SEARCH_ERROR'; payload: { error: string; errorCode: string; isRetryable: boolean } }
   | { type: 'SET_STATS'; payload: SearchStats }
   | { type: 'SET_IMPRESSIONS'; payload: number }
@@ -49,6 +50,7 @@ export const initialSearchState: SearchState = {
   isLoading: false,
   hasSearched: false,
   totalResults: 0,
+  totalIsLowerBound: false,
   page: 1,
   totalPages: 1,
   isPersonalized: false,
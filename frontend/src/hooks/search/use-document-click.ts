@@ -1,5 +1,5 @@
 import { useCallback } from 'react';
-import { registerClick } from '@/lib/api';
+import { queueClick } from '@/lib/api';
 import type { DocumentResult } from '@/lib/types';
 import type { SearchAction } from '../search-reducer';
 
@@ -19,13 +19,13 @@ export function useDocumentClickHandler(query: string, dispatch: React.Dispatch<
     }
 
     if (query) {
-      registerClick({
+      queueClick({
         query,
         user_id: userId ?? null,
         document_id: doc.document_id,
         position: doc.position,
-      }).then(result => {
-        if (result.success) {
+      }).then(sent => {
+        if (sent) {
           dispatch({ type: 'INCREMENT_CLICK', payload: doc.document_id });
         }
       });
@@ -18,6 +18,7 @@ const baseWeights = {
   beta_ctr: 0.5,
   ctr_alpha_prior: 1,
   ctr_beta_prior: 10,
+  ctr_half_life_days: 30,
 };
 
 const data: SettingsData = {
@@ -5,6 +5,7 @@ const baseSnapshot = {
   weights: {
     w_user: 1, alpha_type: 0.5, alpha_topic: 0.5,
     beta_ctr: 0.5, ctr_alpha_prior: 1, ctr_beta_prior: 10,
+    ctr_half_life_days: 30,
   },
   role_type_matrix: { bachelor: { textbook: 1 } },
   topic_scores: { direct_match: 1, keyword_match: 0.8 },
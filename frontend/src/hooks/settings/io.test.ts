@@ -7,6 +7,7 @@ const data: SettingsData = {
   weights: {
     w_user: 1.5, alpha_type: 0.4, alpha_topic: 0.6,
     beta_ctr: 0.5, ctr_alpha_prior: 1, ctr_beta_prior: 10,
+    ctr_half_life_days: 30,
   },
   originalWeights: null,
   presetMap: {},
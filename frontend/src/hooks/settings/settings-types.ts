@@ -7,6 +7,7 @@ export const DEFAULT_WEIGHTS: RankingWeights = {
   beta_ctr: 0.5,
   ctr_alpha_prior: 1.0,
   ctr_beta_prior: 10.0,
+  ctr_half_life_days: 30.0,
 };
 
 export interface UseSettingsReturn {
@@ -34,7 +34,7 @@ export function useSearch(options: { perPage?: number } = {}) {
 
   return {
     query: state.query, results: state.results, isLoading: state.isLoading, hasSearched: state.hasSearched,
-    totalResults: state.totalResults, page: state.page, totalPages: state.totalPages, isPersonalized: state.isPersonalized,
+    totalResults: state.totalResults, totalIsLowerBound: state.totalIsLowerBound, page: state.page, totalPages: state.totalPages, isPersonalized: state.isPersonalized,
     userProfile: state.userProfile, stats: state.stats, error: state.error, errorCode: state.errorCode, isRetryable: state.isRetryable,
     setQuery: useCallback((q: string) => dispatch({ type: 'SET_QUERY', payload: q }), []),
     search, handleDocumentClick, reset: useCallback(() => dispatch({ type: 'RESET' }), []), retry, goToPage,
@@ -0,0 +1,65 @@
+import type { ClickData } from '../types';
+import { API_BASE } from './client';
+
+const EVENTS_URL = `${API_BASE}/api/v1/search/events`;
+const FLUSH_DELAY_MS = 5000;
+const MAX_QUEUED_EVENTS = 50;
+
+type QueuedEvent = { type: 'click' } & ClickData;
+
+let queue: QueuedEvent[] = [];
+let waiting: Array<(sent: boolean) => void> = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+let listening = false;
+
+export function flushEvents(): void {
+  if (flushTimer !== null) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  if (queue.length === 0) {
+    return;
+  }
+
+  const body = queue.map(event => JSON.stringify(event)).join('\n');
+  const settle = waiting;
+  queue = [];
+  waiting = [];
+  // text/plain keeps the beacon a CORS-simple request; the backend reads the raw body as NDJSON.
+  const blob = new Blob([body], { type: 'text/plain' });
+  if (typeof navigator !== 'undefined' && navigator.sendBeacon?.(EVENTS_URL, blob)) {
+    settle.forEach(resolve => resolve(true));
+    return;
+  }
+  fetch(EVENTS_URL, { method: 'POST', body: blob, keepalive: true })
+    .then(response => response.ok, () => false)
+    .then(sent => settle.forEach(resolve => resolve(sent)));
+}
+
+function listenForPageHide(): void {
+  if (listening || typeof window === 'undefined') {
+    return;
+  }
+  listening = true;
+  window.addEventListener('pagehide', flushEvents);
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') {
+      flushEvents();
+    }
+  });
+}
+
+// Resolves once the batch holding the click is sent: true if the beacon was accepted
+// or the fallback request succeeded.
+export function queueClick(click: ClickData): Promise<boolean> {
+  listenForPageHide();
+  return new Promise(resolve => {
+    queue.push({ type: 'click', ...click });
+    waiting.push(resolve);
+    if (queue.length >= MAX_QUEUED_EVENTS) {
+      flushEvents();
+    } else if (flushTimer === null) {
+      flushTimer = setTimeout(flushEvents, FLUSH_DELAY_MS);
+    }
+  });
+}
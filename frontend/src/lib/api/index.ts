@@ -13,6 +13,8 @@ export {
   type SearchDocumentsOptions,
 } from './search';
 
+export { queueClick, flushEvents } from './events';
+
 export { getUsers, getUser, updateUserInterests } from './users';
 
 export {
@@ -235,18 +235,21 @@ export const en: TranslationDict = {
   'weight.label.beta_ctr': 'CTR (β)',
   'weight.label.ctr_alpha_prior': 'CTR α prior',
   'weight.label.ctr_beta_prior': 'CTR β prior',
+  'weight.label.ctr_half_life_days': 'CTR half-life',
   'weight.desc.w_user': 'Overall weight of personalization',
   'weight.desc.alpha_type': 'Weight of the document type',
   'weight.desc.alpha_topic': 'Weight of the topic',
   'weight.desc.beta_ctr': 'Weight of click-through rate',
   'weight.desc.ctr_alpha_prior': 'Pseudo-clicks',
   'weight.desc.ctr_beta_prior': 'Pseudo-impressions',
+  'weight.desc.ctr_half_life_days': 'Days until a click counts half',
   'weight.tip.w_user': 'Overall weight of personalization. The higher it is, the more the reader’s profile, specialization, and interests shape the ranking. Set it to 0 to turn personalization off entirely.',
   'weight.tip.alpha_type': 'How much document type contributes to personalization — that is, how strongly the type (textbook, article, monograph, …) is expected to match what readers in this role typically use. Ideally α₁ + α₂ = 1.',
   'weight.tip.alpha_topic': 'How much topic contributes to personalization — that is, how closely the document’s topic is expected to match the reader’s specialization and interests. Ideally α₁ + α₂ = 1.',
   'weight.tip.beta_ctr': 'Weight of the behavioral signal (CTR). The higher it is, the more weight goes to documents that have historically attracted more clicks for this query.',
   'weight.tip.ctr_alpha_prior': 'Pseudo-clicks used for Bayesian smoothing of CTR. The larger this value, the more stable CTR remains when impressions are sparse.',
   'weight.tip.ctr_beta_prior': 'Pseudo-impressions used for Bayesian smoothing of CTR. The larger this value, the stronger the prior — a document needs many real impressions before its CTR can move noticeably away from the baseline.',
+  'weight.tip.ctr_half_life_days': 'Clicks and impressions lose half their weight every this many days, so recent behavior matters more than old behavior. Set it to 0 to count all history equally. Changing it rebuilds the decayed counters right away. It is a global setting: searches cannot override it.',
 
   'preset.default': 'Default',
   'preset.high_personalization': 'High personalization',
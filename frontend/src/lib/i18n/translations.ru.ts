@@ -235,18 +235,21 @@ export const ru: TranslationDict = {
   'weight.label.beta_ctr': 'CTR (β)',
   'weight.label.ctr_alpha_prior': 'CTR α prior',
   'weight.label.ctr_beta_prior': 'CTR β prior',
+  'weight.label.ctr_half_life_days': 'Полураспад CTR',
   'weight.desc.w_user': 'Общий вес персонализации',
   'weight.desc.alpha_type': 'Вес типа документа',
   'weight.desc.alpha_topic': 'Вес темы',
   'weight.desc.beta_ctr': 'Вес кликабельности',
   'weight.desc.ctr_alpha_prior': 'Псевдо-клики',
   'weight.desc.ctr_beta_prior': 'Псевдо-показы',
+  'weight.desc.ctr_half_life_days': 'Дней до потери половины веса клика',
   'weight.tip.w_user': 'Общий вес персонализации. Чем выше, тем сильнее на ранжирование влияют профиль, специализация и интересы пользователя. 0 = выключить персонализацию.',
   'weight.tip.alpha_type': 'Доля типа документа в персонализации: насколько важно соответствие типа (учебник, статья, монография, ...) ожиданиям роли пользователя. Желательно α₁ + α₂ = 1.',
   'weight.tip.alpha_topic': 'Доля темы в персонализации: насколько важно совпадение темы документа со специализацией и интересами пользователя. Желательно α₁ + α₂ = 1.',
   'weight.tip.beta_ctr': 'Вес поведенческого сигнала (CTR). Чем выше, тем выше документы, которые исторически чаще кликают по этому запросу.',
   'weight.tip.ctr_alpha_prior': 'Псевдо-клики байесовского сглаживания CTR. Чем больше, тем устойчивее CTR при малом числе показов.',
   'weight.tip.ctr_beta_prior': 'Псевдо-показы байесовского сглаживания CTR. Чем больше, тем сильнее «прайор» (документ должен накопить много показов, чтобы CTR заметно отклонился).',
+  'weight.tip.ctr_half_life_days': 'Клики и показы теряют половину веса каждые столько дней: свежее поведение важнее старого. 0 = учитывать всю историю одинаково. После изменения счётчики пересчитываются сразу. Настройка глобальная: в отдельном поиске её не переопределить.',
 
   'preset.default': 'По умолчанию',
   'preset.high_personalization': 'Высокая персонализация',
@@ -80,6 +80,7 @@ export interface DocumentResult {
 export interface SearchResponse {
   query: string;
   total: number;
+  total_relation?: 'eq' | 'gte';
   page: number;
   per_page: number;
   total_pages: number;
@@ -102,6 +103,7 @@ export interface RankingWeights {
   beta_ctr: number;
   ctr_alpha_prior: number;
   ctr_beta_prior: number;
+  ctr_half_life_days: number;
 }
 
 export type WeightPreset = 'default' | 'high_personalization' | 'high_ctr' | 'bm25_only';
@@ -27,7 +27,7 @@ export default function Search() {
   const [sortBy, setSortBy] = useState<SortBy>(initialState.sortBy);
 
   const {
-    query, results, isLoading, hasSearched, totalResults,
+    query, results, isLoading, hasSearched, totalResults, totalIsLowerBound,
     page, totalPages, isPersonalized, userProfile,
     setQuery, search, handleDocumentClick, goToPage,
   } = useSearch();
@@ -144,6 +144,7 @@ export default function Search() {
               isLoading={isLoading}
               hasSearched={hasSearched}
               totalResults={totalResults}
+              totalIsLowerBound={totalIsLowerBound}
               page={page}
               totalPages={totalPages}
               isPersonalized={isPersonalized}
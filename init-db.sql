@@ -15,6 +15,7 @@ CREATE TABLE IF NOT EXISTS users (
 
 CREATE TABLE IF NOT EXISTS documents (
     document_id VARCHAR(50) PRIMARY KEY,
+    doc_key INTEGER GENERATED BY DEFAULT AS IDENTITY UNIQUE,
     title TEXT NOT NULL,
     authors TEXT[],
     document_type VARCHAR(50) NOT NULL,
@@ -32,60 +33,247 @@ CREATE TABLE IF NOT EXISTS search_queries (
     query_id SERIAL PRIMARY KEY,
     user_id INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
     query_text TEXT NOT NULL,
+    query_fp BIGINT NOT NULL,
     results_count INTEGER,
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     session_id VARCHAR(100)
 );
 
 CREATE TABLE IF NOT EXISTS clicks (
-    click_id SERIAL PRIMARY KEY,
+    click_id BIGSERIAL,
     query_id INTEGER REFERENCES search_queries(query_id) ON DELETE CASCADE,
     user_id INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
-    document_id VARCHAR(50) REFERENCES documents(document_id) ON DELETE CASCADE,
+    doc_key INTEGER REFERENCES documents(doc_key) ON DELETE CASCADE,
     query_text TEXT NOT NULL,
+    query_fp BIGINT NOT NULL,
     position INTEGER NOT NULL,
-    clicked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    clicked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     dwell_time INTEGER,
-    session_id VARCHAR(100)
-);
+    session_id VARCHAR(100),
+    PRIMARY KEY (click_id, clicked_at)
+) PARTITION BY RANGE (clicked_at);
 
 CREATE TABLE IF NOT EXISTS impressions (
-    impression_id SERIAL PRIMARY KEY,
+    impression_id BIGSERIAL,
     query_id INTEGER REFERENCES search_queries(query_id) ON DELETE CASCADE,
     user_id INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
-    document_id VARCHAR(50) REFERENCES documents(document_id) ON DELETE CASCADE,
+    doc_key INTEGER REFERENCES documents(doc_key) ON DELETE CASCADE,
     query_text TEXT NOT NULL,
+    query_fp BIGINT NOT NULL,
     position INTEGER NOT NULL,
-    shown_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    session_id VARCHAR(100)
+    shown_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    session_id VARCHAR(100),
+    PRIMARY KEY (impression_id, shown_at)
+) PARTITION BY RANGE (shown_at);
+
+-- Catch events outside the monthly partitions (e.g. when maintenance lapsed); ensure_event_partitions
+-- moves them into their month once it is created.
+CREATE TABLE IF NOT EXISTS clicks_default PARTITION OF clicks DEFAULT;
+CREATE TABLE IF NOT EXISTS impressions_default PARTITION OF impressions DEFAULT;
+
+-- Daily (query, doc) rollup of the raw event partitions; CTR reads never touch raw events.
+CREATE TABLE IF NOT EXISTS ctr_daily (
+    day DATE NOT NULL,
+    query_fp BIGINT NOT NULL,
+    doc_key INTEGER NOT NULL REFERENCES documents(doc_key) ON DELETE CASCADE,
+    query_text TEXT NOT NULL,
+    impressions INTEGER NOT NULL DEFAULT 0,
+    clicks INTEGER NOT NULL DEFAULT 0,
+    click_position_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, query_fp, doc_key)
+);
+
+-- Exponentially decayed (query, doc) counters, stored as of updated_at and rescaled in O(1) per event.
+CREATE TABLE IF NOT EXISTS ctr_decayed (
+    query_fp BIGINT NOT NULL,
+    doc_key INTEGER NOT NULL REFERENCES documents(doc_key) ON DELETE CASCADE,
+    clicks DOUBLE PRECISION NOT NULL DEFAULT 0,
+    impressions DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (query_fp, doc_key)
+);
+
+-- Half-life the ctr_decayed counters were accumulated with (single row).
+CREATE TABLE IF NOT EXISTS ctr_decay_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    half_life_days DOUBLE PRECISION NOT NULL
+);
+
+-- Running event totals served by the API instead of COUNT(*); reconciled periodically.
+CREATE TABLE IF NOT EXISTS event_counters (
+    name VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0,
+    reconciled_at TIMESTAMP
 );
 
+INSERT INTO event_counters (name) VALUES ('impressions'), ('clicks') ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION ctr_decay_factor(rate DOUBLE PRECISION, from_ts TIMESTAMP, to_ts TIMESTAMP)
+RETURNS DOUBLE PRECISION AS $$
+    SELECT exp(-rate * GREATEST(EXTRACT(EPOCH FROM to_ts - from_ts)::double precision, 0));
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Creates monthly partitions from start_month through months ahead, plus any earlier month that
+-- has rows in a default partition. Those rows are moved into their month before it is attached:
+-- creating the partition over them would fail and abort every later maintenance pass.
+-- Parents that are not partitioned yet (midway through maintain_events.py --migrate) are skipped.
+CREATE OR REPLACE FUNCTION ensure_event_partitions(start_month DATE, months INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    first_month DATE := date_trunc('month', start_month)::date;
+    last_month DATE := (date_trunc('month', start_month) + make_interval(months => months))::date;
+    oldest DATE;
+    month_start DATE;
+    month_end DATE;
+    parent TEXT;
+    ts_column TEXT;
+    part TEXT;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['impressions', 'clicks'] LOOP
+        CONTINUE WHEN to_regclass(parent || '_default') IS NULL;
+        ts_column := CASE parent WHEN 'impressions' THEN 'shown_at' ELSE 'clicked_at' END;
+        EXECUTE format('SELECT date_trunc(''month'', MIN(%I))::date FROM %I', ts_column, parent || '_default')
+            INTO oldest;
+        first_month := LEAST(first_month, oldest);
+    END LOOP;
+
+    FOREACH parent IN ARRAY ARRAY['impressions', 'clicks'] LOOP
+        CONTINUE WHEN NOT EXISTS (SELECT 1 FROM pg_class WHERE relname = parent AND relkind = 'p');
+        ts_column := CASE parent WHEN 'impressions' THEN 'shown_at' ELSE 'clicked_at' END;
+        month_start := first_month;
+        WHILE month_start <= last_month LOOP
+            month_end := (month_start + interval '1 month')::date;
+            part := parent || '_' || to_char(month_start, 'YYYY_MM');
+            IF to_regclass(part) IS NULL THEN
+                EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, parent);
+                IF to_regclass(parent || '_default') IS NOT NULL THEN
+                    EXECUTE format(
+                        'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                        'INSERT INTO %I SELECT * FROM moved',
+                        parent || '_default', ts_column, month_start, ts_column, month_end, part
+                    );
+                END IF;
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    parent, part, month_start, month_end
+                );
+            END IF;
+            month_start := month_end;
+        END LOOP;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recomputes whole days from lookback_days before the newest rolled-up day, so re-runs are idempotent.
+CREATE OR REPLACE FUNCTION rollup_ctr_daily(lookback_days INTEGER)
+RETURNS BIGINT AS $$
+DECLARE
+    since DATE;
+    impression_rows BIGINT;
+    click_rows BIGINT;
+BEGIN
+    SELECT COALESCE(MAX(day) - lookback_days, '-infinity'::date) INTO since FROM ctr_daily;
+
+    INSERT INTO ctr_daily (day, query_fp, doc_key, query_text, impressions)
+    SELECT shown_at::date, query_fp, doc_key, MIN(query_text), COUNT(*)
+    FROM impressions
+    WHERE shown_at >= since AND doc_key IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, query_fp, doc_key) DO UPDATE SET impressions = EXCLUDED.impressions;
+    GET DIAGNOSTICS impression_rows = ROW_COUNT;
+
+    INSERT INTO ctr_daily (day, query_fp, doc_key, query_text, clicks, click_position_sum)
+    SELECT clicked_at::date, query_fp, doc_key, MIN(query_text), COUNT(*), SUM(position)
+    FROM clicks
+    WHERE clicked_at >= since AND doc_key IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, query_fp, doc_key) DO UPDATE
+        SET clicks = EXCLUDED.clicks, click_position_sum = EXCLUDED.click_position_sum;
+    GET DIAGNOSTICS click_rows = ROW_COUNT;
+
+    RETURN impression_rows + click_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drops monthly partitions older than the retention window, but only once they are rolled up.
+CREATE OR REPLACE FUNCTION drop_expired_event_partitions(retention_months INTEGER)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', now()) - make_interval(months => retention_months))::date;
+    rolled_up DATE;
+    part RECORD;
+BEGIN
+    SELECT COALESCE(MAX(day), '-infinity'::date) INTO rolled_up FROM ctr_daily;
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits inh
+        JOIN pg_class c ON c.oid = inh.inhrelid
+        JOIN pg_class p ON p.oid = inh.inhparent
+        WHERE p.relname IN ('impressions', 'clicks') AND c.relname ~ '_[0-9]{4}_[0-9]{2}$'
+    LOOP
+        IF (to_date(right(part.relname, 7), 'YYYY_MM') + interval '1 month')::date <= LEAST(cutoff, rolled_up) THEN
+            EXECUTE format('DROP TABLE %I', part.relname);
+            RETURN NEXT part.relname;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rebuilds ctr_decayed from the daily rollups after a half-life change (events dated at midday).
+CREATE OR REPLACE FUNCTION rebuild_ctr_decayed(target_half_life_days DOUBLE PRECISION)
+RETURNS BIGINT AS $$
+DECLARE
+    rate DOUBLE PRECISION := CASE
+        WHEN target_half_life_days > 0 THEN ln(2) / (target_half_life_days * 86400) ELSE 0 END;
+    rebuilt BIGINT;
+BEGIN
+    DELETE FROM ctr_decayed;
+    INSERT INTO ctr_decayed (query_fp, doc_key, clicks, impressions, updated_at)
+    SELECT query_fp, doc_key,
+           SUM(clicks * ctr_decay_factor(rate, day + interval '12 hours', LOCALTIMESTAMP)),
+           SUM(impressions * ctr_decay_factor(rate, day + interval '12 hours', LOCALTIMESTAMP)),
+           LOCALTIMESTAMP
+    FROM ctr_daily
+    GROUP BY query_fp, doc_key
+    ON CONFLICT (query_fp, doc_key) DO UPDATE
+        SET clicks = EXCLUDED.clicks, impressions = EXCLUDED.impressions, updated_at = EXCLUDED.updated_at;
+    GET DIAGNOSTICS rebuilt = ROW_COUNT;
+
+    INSERT INTO ctr_decay_state (half_life_days) VALUES (target_half_life_days)
+    ON CONFLICT (id) DO UPDATE SET half_life_days = EXCLUDED.half_life_days;
+    RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_event_partitions((CURRENT_DATE - interval '7 months')::date, 9);
+
 CREATE MATERIALIZED VIEW IF NOT EXISTS ctr_stats AS
 SELECT
-    i.query_text,
-    i.document_id,
-    COUNT(DISTINCT i.impression_id) as impressions,
-    COUNT(DISTINCT c.click_id) as clicks,
+    query_fp,
+    MIN(query_text) as query_text,
+    doc_key,
+    SUM(impressions) as impressions,
+    SUM(clicks) as clicks,
     CASE
-        WHEN COUNT(DISTINCT i.impression_id) > 0
-        THEN CAST(COUNT(DISTINCT c.click_id) AS FLOAT) / COUNT(DISTINCT i.impression_id)
+        WHEN SUM(impressions) > 0
+        THEN CAST(SUM(clicks) AS FLOAT) / SUM(impressions)
         ELSE 0
     END as ctr,
-    AVG(c.position) as avg_click_position
-FROM impressions i
-LEFT JOIN clicks c ON
-    i.query_text = c.query_text AND
-    i.document_id = c.document_id
-GROUP BY i.query_text, i.document_id
-HAVING COUNT(DISTINCT i.impression_id) >= 3;
+    CAST(SUM(click_position_sum) AS FLOAT) / NULLIF(SUM(clicks), 0) as avg_click_position
+FROM ctr_daily
+GROUP BY query_fp, doc_key
+HAVING SUM(impressions) >= 3;
 
 CREATE INDEX IF NOT EXISTS idx_clicks_user_id ON clicks(user_id);
-CREATE INDEX IF NOT EXISTS idx_clicks_document_id ON clicks(document_id);
-CREATE INDEX IF NOT EXISTS idx_clicks_query_text ON clicks(query_text);
-CREATE INDEX IF NOT EXISTS idx_impressions_query_text ON impressions(query_text);
-CREATE INDEX IF NOT EXISTS idx_impressions_document_id ON impressions(document_id);
+CREATE INDEX IF NOT EXISTS idx_clicks_doc_key ON clicks(doc_key);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_search_queries_session_fp ON search_queries(session_id, query_fp);
+CREATE INDEX IF NOT EXISTS idx_clicks_query_fp ON clicks(query_fp);
+CREATE INDEX IF NOT EXISTS idx_impressions_query_fp ON impressions(query_fp);
+CREATE INDEX IF NOT EXISTS idx_impressions_doc_key ON impressions(doc_key);
 CREATE INDEX IF NOT EXISTS idx_documents_type ON documents(document_type);
 CREATE INDEX IF NOT EXISTS idx_documents_subject ON documents(subject);
 CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+CREATE INDEX IF NOT EXISTS idx_ctr_daily_doc_key ON ctr_daily(doc_key);
 
-CREATE UNIQUE INDEX IF NOT EXISTS idx_ctr_stats_unique ON ctr_stats(query_text, document_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ctr_stats_unique ON ctr_stats(query_fp, doc_key);
+CREATE INDEX IF NOT EXISTS idx_ctr_stats_doc_key ON ctr_stats(doc_key);
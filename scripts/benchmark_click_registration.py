@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Compare the ORM click path with the single-statement CTE path.
+
+Registers the same clicks three ways against a live database: the old
+ORM sequence (SELECT query row, INSERT + flush, INSERT click, decayed
+upsert, COMMIT), ``register_click`` (one CTE statement per click) and
+``register_clicks`` in batches. It reports clicks per second and SQL
+statements per click. Each run uses its own synthetic queries and
+sessions, and every row it writes is deleted afterwards.
+
+Example:
+
+    POSTGRES_PASSWORD=library_password python scripts/benchmark_click_registration.py --clicks 2000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.config import settings
+from backend.app.core.query_fingerprint import query_fingerprint
+from backend.app.models import Click, Document, SearchQuery
+from backend.app.schemas.search import ClickEvent
+from backend.app.services.ctr import register_click, register_clicks
+from backend.app.services.ctr.ctr_decay import DECAYED_UPSERT_SQL, decay_rate
+
+DEFAULT_CLICKS = 2000
+DEFAULT_BATCH_SIZE = 100
+QUERIES_PER_RUN = 50
+SESSIONS_PER_RUN = 200
+
+DECAYED_CLICK_SQL = text("""
+    WITH event AS (
+        SELECT CAST(:query_fp AS BIGINT) AS query_fp, d.doc_key, LOCALTIMESTAMP AS ts, 1 AS clicks, 0 AS impressions
+        FROM documents d
+        WHERE d.document_id = :doc_id
+    )
+""" + DECAYED_UPSERT_SQL)
+
+
+async def orm_register_click(db, query, document_id, user_id, position, session_id, dwell_time):
+    query_fp = query_fingerprint(query)
+    result = await db.execute(select(SearchQuery).where(
+        SearchQuery.query_fp == query_fp, SearchQuery.session_id == session_id
+    ))
+    query_obj = result.scalar_one_or_none()
+    if not query_obj:
+        query_obj = SearchQuery(user_id=user_id, query_text=query, query_fp=query_fp, session_id=session_id)
+        db.add(query_obj)
+        await db.flush()
+    db.add(Click(
+        query_id=query_obj.query_id, user_id=user_id,
+        doc_key=select(Document.doc_key).where(Document.document_id == document_id).scalar_subquery(),
+        query_text=query, query_fp=query_fp, position=position, session_id=session_id, dwell_time=dwell_time,
+    ))
+    await db.execute(DECAYED_CLICK_SQL, {"query_fp": query_fp, "doc_id": document_id, "decay_rate": decay_rate()})
+    await db.commit()
+
+
+def make_clicks(label, doc_ids, count, rng):
+    run = uuid.uuid4().hex[:8]
+    queries = [f"bench-{label}-{run}-{i}" for i in range(QUERIES_PER_RUN)]
+    sessions = [f"bench-{run}-{i}" for i in range(SESSIONS_PER_RUN)]
+    return [
+        ClickEvent(query=rng.choice(queries), document_id=rng.choice(doc_ids), position=rng.randint(1, 20),
+                   session_id=rng.choice(sessions), dwell_time=rng.randint(1000, 60000))
+        for _ in range(count)
+    ]
+
+
+async def run_orm(db, clicks, batch_size):
+    for c in clicks:
+        await orm_register_click(db, c.query, c.document_id, c.user_id, c.position, c.session_id, c.dwell_time)
+
+
+async def run_cte(db, clicks, batch_size):
+    for c in clicks:
+        await register_click(db, c.query, c.document_id, c.user_id, c.position, c.session_id, c.dwell_time)
+
+
+async def run_batched(db, clicks, batch_size):
+    for start in range(0, len(clicks), batch_size):
+        await register_clicks(db, clicks[start:start + batch_size])
+
+
+async def cleanup(db, clicks):
+    fps = list({query_fingerprint(c.query) for c in clicks})
+    await db.execute(text("DELETE FROM clicks WHERE query_fp = ANY(:fps)"), {"fps": fps})
+    await db.execute(text("DELETE FROM ctr_decayed WHERE query_fp = ANY(:fps)"), {"fps": fps})
+    await db.execute(text("DELETE FROM search_queries WHERE query_fp = ANY(:fps)"), {"fps": fps})
+    await db.commit()
+
+
+async def main_async(args):
+    engine = create_async_engine(settings.async_database_url, pool_size=1)
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(42)
+    async with session_factory() as db:
+        result = await db.execute(text("SELECT document_id FROM documents ORDER BY random() LIMIT 1000"))
+        doc_ids = [row[0] for row in result.fetchall()]
+        if not doc_ids:
+            sys.exit("documents table is empty; load documents first")
+
+        print(f"{'path':<22}{'clicks':>8}{'seconds':>10}{'clicks/s':>12}{'stmts/click':>14}")
+        for label, runner in (("orm", run_orm), ("cte", run_cte), ("cte-batched", run_batched)):
+            clicks = make_clicks(label, doc_ids, args.clicks, rng)
+            statements = 0
+            started = time.perf_counter()
+            try:
+                await runner(db, clicks, args.batch_size)
+                elapsed = time.perf_counter() - started
+                issued = statements
+            finally:
+                await cleanup(db, clicks)
+            name = f"{label} ({args.batch_size})" if label == "cte-batched" else label
+            print(f"{name:<22}{len(clicks):>8}{elapsed:>10.2f}{len(clicks) / elapsed:>12.0f}"
+                  f"{issued / len(clicks):>14.2f}")
+    await engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clicks", type=int, default=DEFAULT_CLICKS)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Compare size and query latency of two index generations.
+
+Meant for before/after checks of a mapping change: the loader keeps the
+previous generation around (``--keep-generations``), so the old and the
+new ``library_documents_v<N>`` can be measured side by side. For each
+index it reports primary store size, bytes per document, segment count
+and mapped field count. It then runs the API's own search and facet
+queries with the request cache off and reports p50/p95 of the server
+``took`` time.
+
+Example:
+
+    python scripts/benchmark_index_mapping.py library_documents_v3 library_documents_v4 --repeats 5
+"""
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+from opensearchpy import OpenSearch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.core.documents import count_fields
+from backend.app.services.search_query_builder import build_aggregations_query, build_search_query
+from scripts.benchmark_utils import load_queries, percentile
+
+OPENSEARCH_HOST = "localhost"
+OPENSEARCH_PORT = 9200
+DEFAULT_REPEATS = 3
+DEFAULT_QUERIES = [
+    "история", "физика", "математический анализ", "программирование", "экономика", "квантовая механика",
+    "органическая химия", "теория вероятностей", "лингвистика", "геология сибири", "право", "биология клетки",
+]
+MB = 1024 * 1024
+
+
+def index_footprint(client, index):
+    primaries = client.indices.stats(index=index, metric="store,docs,segments")["indices"][index]["primaries"]
+    mappings = client.indices.get_mapping(index=index)[index]["mappings"]
+    docs = primaries["docs"]["count"]
+    size = primaries["store"]["size_in_bytes"]
+    return {
+        "docs": docs,
+        "size": size,
+        "bytes_per_doc": size / max(docs, 1),
+        "segments": primaries["segments"]["count"],
+        "fields": count_fields(mappings.get("properties", {})),
+    }
+
+
+def time_queries(client, index, bodies, repeats):
+    for body in bodies:
+        client.search(index=index, body=body, request_cache=False)
+    took = []
+    for _ in range(repeats):
+        for body in bodies:
+            took.append(client.search(index=index, body=body, request_cache=False)["took"])
+    return statistics.median(took), percentile(took, 95)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("indices", nargs=2, help="baseline and candidate index names")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--queries-file", type=Path, help="JSONL with a \"query\" field per line")
+    args = parser.parse_args(argv)
+
+    client = OpenSearch(hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}], timeout=60)
+    queries = load_queries(args.queries_file, DEFAULT_QUERIES)
+    search_bodies = [{**build_search_query(q), "size": 100} for q in queries]
+    facet_bodies = [build_aggregations_query(q) for q in queries]
+
+    print(f"{'index':<28}{'docs':>10}{'store':>12}{'B/doc':>8}{'segs':>6}{'fields':>8}"
+          f"{'search p50/p95 ms':>20}{'facets p50/p95 ms':>20}")
+    for index in args.indices:
+        footprint = index_footprint(client, index)
+        search_p50, search_p95 = time_queries(client, index, search_bodies, args.repeats)
+        facet_p50, facet_p95 = time_queries(client, index, facet_bodies, args.repeats)
+        print(f"{index:<28}{footprint['docs']:>10}{footprint['size'] / MB:>9.1f} MB{footprint['bytes_per_doc']:>8.0f}"
+              f"{footprint['segments']:>6}{footprint['fields']:>8}"
+              f"{f'{search_p50:.0f}/{search_p95:.0f}':>20}{f'{facet_p50:.0f}/{facet_p95:.0f}':>20}")
+
+
+if __name__ == "__main__":
+    main()
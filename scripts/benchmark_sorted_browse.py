@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure sorted-browse latency with and without exact totals.
+
+Runs the API's own search query for every sort order against one or
+more indices, once with the default approximate total (early
+termination allowed) and once with ``exact_total``. Reports p50/p95 of
+the server ``took`` time with the request cache off. Compare a plain
+generation with one built by ``load_books_to_opensearch.py --sorted``
+on the full corpus to see what the index sort buys.
+
+Example:
+
+    python scripts/benchmark_sorted_browse.py library_documents_v4 library_documents_v5 --repeats 5
+"""
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+from opensearchpy import OpenSearch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app.services.search_query_builder import SORT_BY_OS_CLAUSES, build_search_query
+from scripts.benchmark_utils import load_queries, percentile
+
+OPENSEARCH_HOST = "localhost"
+OPENSEARCH_PORT = 9200
+DEFAULT_REPEATS = 3
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_QUERIES = ["история", "физика", "математика", "экономика", "право", "биология", "учебное пособие"]
+SORTS = [name for name, clauses in SORT_BY_OS_CLAUSES.items() if clauses] + ["relevance"]
+
+
+def time_sort(client, index, queries, sort_by, exact_total, size, repeats):
+    bodies = [{**build_search_query(q, sort_by=sort_by, exact_total=exact_total), "size": size} for q in queries]
+    for body in bodies:
+        client.search(index=index, body=body, request_cache=False)
+    took, relations = [], set()
+    for _ in range(repeats):
+        for body in bodies:
+            response = client.search(index=index, body=body, request_cache=False)
+            took.append(response["took"])
+            relations.add(response["hits"]["total"].get("relation", "eq"))
+    return statistics.median(took), percentile(took, 95), "/".join(sorted(relations))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("indices", nargs="+", help="index names to compare")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--size", type=int, default=DEFAULT_PAGE_SIZE, help="hits per request")
+    parser.add_argument("--queries-file", type=Path, help="JSONL with a \"query\" field per line")
+    args = parser.parse_args(argv)
+
+    client = OpenSearch(hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}], timeout=60)
+    queries = load_queries(args.queries_file, DEFAULT_QUERIES)
+
+    print(f"{'index':<28}{'sort':<16}{'approx p50/p95 ms':>20}{'total':>8}{'exact p50/p95 ms':>20}")
+    for index in args.indices:
+        index_sort = client.indices.get_settings(index=index)[index]["settings"]["index"].get("sort", {})
+        print(f"{index} (index sort: {index_sort.get('field') or 'none'})")
+        for sort_by in SORTS:
+            approx_p50, approx_p95, relation = time_sort(client, index, queries, sort_by, False, args.size,
+                                                         args.repeats)
+            exact_p50, exact_p95, _ = time_sort(client, index, queries, sort_by, True, args.size, args.repeats)
+            print(f"{'':<28}{sort_by:<16}{f'{approx_p50:.0f}/{approx_p95:.0f}':>20}{relation:>8}"
+                  f"{f'{exact_p50:.0f}/{exact_p95:.0f}':>20}")
+
+
+if __name__ == "__main__":
+    main()
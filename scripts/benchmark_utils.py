@@ -0,0 +1,15 @@
+"""Helpers shared by the OpenSearch benchmark scripts."""
+
+import json
+
+
+def load_queries(path, default):
+    if path is None:
+        return default
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["query"] for line in f if line.strip()]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
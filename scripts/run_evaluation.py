@@ -3,7 +3,10 @@
 
 Runs a fixed JSONL dataset of (query, user_id) pairs against the live API
 under several weight presets and reports nDCG@10, Precision@5, Precision@10,
-Recall@10, MAP and MRR averaged over the dataset.
+Recall@10, MAP and MRR averaged over the dataset. Each query is ranked under
+all presets from a single retrieval via ``/api/v1/search/compare``; with
+``--api-key`` the whole run goes through the rate-limit-exempt
+``/api/v1/search/batch`` endpoint instead.
 
 Two oracles are evaluated side by side:
 
@@ -26,11 +29,12 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import os
 import sys
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, Optional
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
 import requests
 
@@ -52,6 +56,9 @@ DEFAULT_API = "http://localhost:8000"
 DEFAULT_POOL_SIZE = 100
 DEFAULT_METRIC_K = 10
 DEFAULT_DELAY_SEC = 2.1  # backend rate-limits to 30 req/min
+BATCH_SIZE = 500
+MAX_PAGE_SIZE = 100  # SearchRequest.per_page upper bound; the whole pool is one page
+USERS_BATCH_SIZE = 200
 ORACLES = ("topical", "full")
 METRIC_KS = (5, 10)
 
@@ -104,61 +111,101 @@ def load_dataset(path: Path) -> List[QuerySpec]:
     return specs
 
 
-def fetch_user(api_base: str, user_id: int) -> Mapping[str, Any]:
-    resp = requests.get(f"{api_base}/api/v1/users/{user_id}", timeout=10)
-    resp.raise_for_status()
-    return resp.json()
+def fetch_users(api_base: str, user_ids: List[int]) -> Dict[int, Mapping[str, Any]]:
+    users: Dict[int, Mapping[str, Any]] = {}
+    for start in range(0, len(user_ids), USERS_BATCH_SIZE):
+        chunk = user_ids[start:start + USERS_BATCH_SIZE]
+        resp = requests.get(f"{api_base}/api/v1/users/", params={"ids": chunk}, timeout=10)
+        resp.raise_for_status()
+        users.update({u["user_id"]: u for u in resp.json()})
+    return users
 
 
 RATE_LIMIT_BACKOFF_SEC = 5.0
 RATE_LIMIT_MAX_RETRIES = 5
 
 
-def search(
+def compare_presets(
     api_base: str,
     query: str,
     user_id: Optional[int],
-    weights: Optional[Mapping[str, float]],
+    presets: List[str],
     top_k: int,
-) -> List[Mapping[str, Any]]:
+) -> Dict[str, List[Mapping[str, Any]]]:
     payload: Dict[str, Any] = {
         "query": query,
-        "top_k": top_k,
+        "per_page": top_k,
+        "candidate_pool": top_k,
+        "presets": list(presets),
         "enable_personalization": user_id is not None,
     }
     if user_id is not None:
         payload["user_id"] = user_id
-    if weights is not None:
-        payload["weights_override"] = dict(weights)
 
     for attempt in range(RATE_LIMIT_MAX_RETRIES):
-        resp = requests.post(f"{api_base}/api/v1/search/", json=payload, timeout=30)
+        resp = requests.post(f"{api_base}/api/v1/search/compare", json=payload, timeout=60)
         if resp.status_code == 429:
             wait = RATE_LIMIT_BACKOFF_SEC * (attempt + 1)
             print(f"  [rate-limited, sleeping {wait:.1f}s]", file=sys.stderr)
             time.sleep(wait)
             continue
         resp.raise_for_status()
-        return resp.json().get("results") or []
+        return resp.json().get("rankings") or {}
 
     raise requests.RequestException("rate-limited after max retries")
 
 
+def batch_search(
+    api_base: str,
+    api_key: str,
+    specs: List[QuerySpec],
+    presets: List[str],
+    top_k: int,
+) -> Iterator[Tuple[QuerySpec, str, List[Mapping[str, Any]]]]:
+    batch_specs: List[Dict[str, Any]] = []
+    keys: List[Tuple[QuerySpec, str]] = []
+    for spec in specs:
+        for preset in presets:
+            item: Dict[str, Any] = {
+                "id": f"{spec.id}:{preset}",
+                "query": spec.query,
+                "per_page": top_k,
+                "candidate_pool": top_k,
+                "enable_personalization": spec.user_id is not None,
+                "weights_override": WEIGHT_PRESETS[WeightPreset(preset)].model_dump(exclude={"ctr_half_life_days"}),
+            }
+            if spec.user_id is not None:
+                item["user_id"] = spec.user_id
+            batch_specs.append(item)
+            keys.append((spec, preset))
+
+    for start in range(0, len(batch_specs), BATCH_SIZE):
+        chunk = batch_specs[start:start + BATCH_SIZE]
+        resp = requests.post(
+            f"{api_base}/api/v1/search/batch",
+            json={"specs": chunk},
+            headers={"X-API-Key": api_key},
+            stream=True,
+            timeout=600,
+        )
+        resp.raise_for_status()
+        for line in resp.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            item = json.loads(line)
+            spec, preset = keys[start + item["index"]]
+            if item["status"] != 200:
+                print(f"  [skip] {spec.id} ({preset}): {item.get('error')}", file=sys.stderr)
+                continue
+            yield spec, preset, item["response"].get("results") or []
+
+
 def evaluate_one(
     spec: QuerySpec,
     preset_name: str,
-    weights: Optional[Mapping[str, float]],
-    api_base: str,
-    user_cache: Dict[int, Mapping[str, Any]],
-    pool_size: int,
+    docs: List[Mapping[str, Any]],
+    user: Optional[Mapping[str, Any]],
 ) -> QueryResult:
-    user = None
-    if spec.user_id is not None:
-        if spec.user_id not in user_cache:
-            user_cache[spec.user_id] = fetch_user(api_base, spec.user_id)
-        user = user_cache[spec.user_id]
-
-    docs = search(api_base, spec.query, spec.user_id, weights, pool_size)
     ranked = [d.get("document_id") for d in docs if d.get("document_id")]
 
     gains_topical = build_gain_map(docs, spec.query, user, oracle="topical")
@@ -277,7 +324,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         "--pool-size",
         type=int,
         default=DEFAULT_POOL_SIZE,
-        help="how many top results to fetch and label (relevance pool depth)",
+        help=f"how many top results to fetch and label (relevance pool depth, at most {MAX_PAGE_SIZE})",
     )
     parser.add_argument(
         "--delay",
@@ -285,6 +332,11 @@ def main(argv: Optional[List[str]] = None) -> int:
         default=DEFAULT_DELAY_SEC,
         help="seconds to sleep between API requests to avoid rate-limits",
     )
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("SEARCH_API_KEY"),
+        help="API key for /search/batch; when set, all queries run in batches without client-side delays",
+    )
     parser.add_argument(
         "--presets",
         nargs="+",
@@ -292,36 +344,51 @@ def main(argv: Optional[List[str]] = None) -> int:
         choices=[p.value for p in WeightPreset],
     )
     args = parser.parse_args(argv)
+    if not 1 <= args.pool_size <= MAX_PAGE_SIZE:
+        # The pool is fetched as a single page, and both endpoints cap per_page; a larger
+        # pool would be silently cut and under-count recall.
+        parser.error(f"--pool-size must be between 1 and {MAX_PAGE_SIZE}")
 
     specs = load_dataset(args.dataset)
 
     rows: List[QueryResult] = []
-    user_cache: Dict[int, Mapping[str, Any]] = {}
     started = time.perf_counter()
-
-    for preset_value in args.presets:
-        preset = WeightPreset(preset_value)
-        weights = WEIGHT_PRESETS[preset].model_dump()
-        print(f"== preset: {preset.value} ==", file=sys.stderr)
-        for spec in specs:
-            try:
-                row = evaluate_one(
-                    spec,
-                    preset.value,
-                    weights,
-                    args.api_base,
-                    user_cache,
-                    args.pool_size,
-                )
-            except requests.RequestException as exc:
-                print(f"  [skip] {spec.id}: {exc}", file=sys.stderr)
-                continue
+    user_ids = sorted({spec.user_id for spec in specs if spec.user_id is not None})
+    try:
+        user_cache = fetch_users(args.api_base, user_ids)
+    except requests.RequestException as exc:
+        raise SystemExit(f"failed to fetch user profiles: {exc}")
+    missing = [uid for uid in user_ids if uid not in user_cache]
+    if missing:
+        print(f"  [skip] unknown users: {missing}", file=sys.stderr)
+    specs = [spec for spec in specs if spec.user_id is None or spec.user_id in user_cache]
+
+    if args.api_key:
+        for spec, preset_value, docs in batch_search(args.api_base, args.api_key, specs, args.presets, args.pool_size):
+            user = user_cache.get(spec.user_id) if spec.user_id is not None else None
+            row = evaluate_one(spec, preset_value, docs, user)
             rows.append(row)
             print(
-                f"  {spec.id:<35} ndcg_topical@10={row.ndcg_topical_10:.3f} "
+                f"  {spec.id:<35} {preset_value:<22} ndcg_topical@10={row.ndcg_topical_10:.3f} "
                 f"ndcg_full@10={row.ndcg_full_10:.3f}",
                 file=sys.stderr,
             )
+    else:
+        for spec in specs:
+            user = user_cache.get(spec.user_id) if spec.user_id is not None else None
+            try:
+                rankings = compare_presets(args.api_base, spec.query, spec.user_id, args.presets, args.pool_size)
+            except requests.RequestException as exc:
+                print(f"  [skip] {spec.id}: {exc}", file=sys.stderr)
+                continue
+            for preset_value in args.presets:
+                row = evaluate_one(spec, preset_value, rankings.get(preset_value) or [], user)
+                rows.append(row)
+                print(
+                    f"  {spec.id:<35} {preset_value:<22} ndcg_topical@10={row.ndcg_topical_10:.3f} "
+                    f"ndcg_full@10={row.ndcg_full_10:.3f}",
+                    file=sys.stderr,
+                )
             if args.delay > 0:
                 time.sleep(args.delay)
 